@@ -1,5 +1,6 @@
 import streamlit as st
-from PIL import Image
+
+from utils.assets import load_logo
 
 
 
@@ -11,9 +12,8 @@ st.set_page_config(
 
 )
 
-image_path = 'logo.png'
-image = Image.open(image_path)
-st.sidebar.image(image, width=120)
+# logo decodificado uma vez por processo (ver utils/assets.py)
+st.sidebar.image(load_logo('logo.png'), width=120)
 
 
 
@@ -0,0 +1,177 @@
+"""
+API HTTP com as métricas do dashboard em JSON
+
+Serve os mesmos números das páginas (utils/metrics.py) sem passar pelo modelo
+de reruns do Streamlit. O servidor é assíncrono (tornado, que já é instalado
+junto com o Streamlit); os cálculos rodam em threads para não travar o loop.
+
+- Respostas em cache (LRU por número de itens e bytes), com a chave
+  (métrica, versão do dataset, data limite, tráfegos, modo de contagem distinta)
+- ETag derivado da mesma chave: um If-None-Match igual devolve 304 sem
+  recalcular nem serializar nada
+- Pedidos simultâneos da mesma resposta esperam um único cálculo
+
+Rotas:
+    GET /metrics                                   -> lista das métricas
+    GET /metrics/<nome>?until=2022-04-06&traffic=Low,Jam
+
+Uso:
+    python api.py --csv train.csv --port 8600
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils import config, metrics
+from utils.cube import filter_cube
+from utils.figure_cache import FigureCache, filter_key
+from utils.loader import load_cube, load_filtered
+
+
+TRAFFIC_LEVELS = ['Low', 'Medium', 'High', 'Jam']
+
+# Colunas usadas pelas métricas (união das colunas das três páginas)
+COLUNAS = ['Week_of_year', 'Order_Date', 'Road_traffic_density', 'City', 'Weatherconditions', 'Festival', 'Type_of_order',
+           'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition',
+           'Time_taken(min)', 'Distance', 'Delivery_location_latitude', 'Delivery_location_longitude']
+
+
+_responses = FigureCache()
+_pending = {}
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def _jsonable(value):
+    """ Converte o resultado de uma métrica (Dataframe, dicionário ou número) em tipos do json """
+    if isinstance(value, pd.DataFrame):
+        if value.index.name is not None:
+            value = value.reset_index()
+        return json.loads(value.to_json(orient='records', date_format='iso'))
+    if isinstance(value, dict):
+        return {name: _jsonable(item) for name, item in value.items()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def compute_metric(path, name, date_cutoff, traffic_options):
+    """
+    Calcula uma métrica com os filtros da barra lateral
+
+    Input: caminho do csv, nome da métrica (ver utils/metrics.METRICS), data limite e tráfegos
+    Output: corpo da resposta (JSON em bytes)
+    """
+    df1 = load_filtered(path, COLUNAS, date_cutoff, traffic_options)
+    cube = filter_cube(load_cube(path), date_cutoff, traffic_options)
+
+    result = metrics.METRICS[name](df1, cube)
+    return json.dumps(_jsonable(result), ensure_ascii=False).encode('utf-8')
+
+
+def response_key(path, name, date_cutoff, traffic_options):
+    """ Chave da resposta: métrica + estado dos filtros (ver filter_key) + modo de contagem distinta """
+    return (name, *filter_key(path, date_cutoff, traffic_options), config.DISTINCT_MODE, config.HLL_PRECISION)
+
+
+def etag(key):
+    """ ETag da resposta: muda junto com a versão do dataset ou com qualquer filtro """
+    return '"' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '"'
+
+
+async def cached_response(path, name, date_cutoff, traffic_options, key):
+    """
+    Devolve o corpo da resposta do cache ou calcula em uma thread
+
+    Pedidos simultâneos com a mesma chave aguardam o mesmo cálculo.
+    """
+    body = _responses.get(key)
+    if body is not None:
+        return body
+
+    future = _pending.get(key)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(None, compute_metric, path, name, date_cutoff, traffic_options)
+        _pending[key] = future
+        future.add_done_callback(lambda done: _store_response(key, done))
+
+    # shield: um cliente que desconecta não cancela o cálculo dos outros
+    return await asyncio.shield(future)
+
+
+def _store_response(key, future):
+    _pending.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        _responses.put(key, future.result())
+
+
+def parse_filters(until, traffic):
+    """
+    Lê os filtros da query string
+
+    until: data limite exclusiva (YYYY-MM-DD); sem valor = todos os pedidos
+    traffic: tráfegos separados por vírgula; sem valor = todos
+    """
+    date_cutoff = pd.Timestamp(until) if until else pd.Timestamp.max
+    traffic_options = [level for level in traffic.split(',') if level] if traffic else TRAFFIC_LEVELS
+    return date_cutoff, traffic_options
+
+
+def make_app(path='train.csv'):
+    """ Aplicação tornado com as rotas /metrics e /metrics/<nome> """
+    import tornado.web
+
+    class MetricListHandler(tornado.web.RequestHandler):
+        def get(self):
+            self.write({'metrics': sorted(metrics.METRICS)})
+
+    class MetricHandler(tornado.web.RequestHandler):
+
+        def compute_etag(self):
+            # o ETag é definido pela chave da resposta, não pelo hash do corpo
+            return None
+
+        async def get(self, name):
+            if name not in metrics.METRICS:
+                raise tornado.web.HTTPError(404, f'métrica desconhecida: {name}')
+            try:
+                date_cutoff, traffic_options = parse_filters(self.get_query_argument('until', None),
+                                                             self.get_query_argument('traffic', None))
+            except ValueError:
+                raise tornado.web.HTTPError(400, 'until deve estar no formato YYYY-MM-DD')
+
+            key = response_key(path, name, date_cutoff, traffic_options)
+            self.set_header('ETag', etag(key))
+            self.set_header('Cache-Control', 'no-cache')
+            if self.check_etag_header():
+                self.set_status(304)
+                return
+
+            body = await cached_response(path, name, date_cutoff, traffic_options, key)
+            self.set_header('Content-Type', 'application/json; charset=utf-8')
+            self.write(body)
+
+    return tornado.web.Application([
+        (r'/metrics/?', MetricListHandler),
+        (r'/metrics/([a-z_]+)', MetricHandler),
+    ])
+
+
+if __name__ == '__main__':
+    import tornado.ioloop
+
+    parser = argparse.ArgumentParser(description='API HTTP com as métricas do dashboard')
+    parser.add_argument('--csv', default='train.csv')
+    parser.add_argument('--port', type=int, default=8600)
+    args = parser.parse_args()
+
+    make_app(args.csv).listen(args.port)
+    print(f'servindo as métricas de {args.csv} em http://localhost:{args.port}/metrics')
+    tornado.ioloop.IOLoop.current().start()
@@ -0,0 +1 @@
+"""Scripts de benchmark do Growth Dashboard."""
@@ -0,0 +1,100 @@
+"""
+Benchmark da leitura + limpeza do dataset
+
+Compara o clean_code antigo (cinco máscaras em sequência, .apply por linha
+no tempo e astype depois da leitura) com o pipeline atual (read_orders com
+tipos declarados + clean_code vetorizado).
+
+Uso:
+    python -m benchmarks.bench_clean_code --rows 45000 10000000
+    python -m benchmarks.bench_clean_code --csv train.csv
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import write_orders_csv
+from utils.cleaning import clean_code, read_orders
+
+
+def legacy_clean_code(df1):
+    """ Cópia do clean_code original, mantida apenas para comparação """
+    df1 = df1.loc[df1['Delivery_person_Age'] != 'NaN ', :]
+    df1 = df1.loc[df1['Road_traffic_density'] != 'NaN ', :]
+    df1 = df1.loc[df1['City'] != 'NaN ', :]
+    df1 = df1.loc[df1['Festival'] != 'NaN ', :]
+    df1 = df1.loc[df1['multiple_deliveries'] != 'NaN ', :].copy()
+
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply( lambda x: x.split( '(min) ')[1] )
+
+    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype( int )
+    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype( int )
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype( int )
+    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype( float )
+    df1['Order_Date'] = pd.to_datetime( df1['Order_Date'], format='%d-%m-%Y' )
+
+    for col in ['ID', 'Delivery_person_ID', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle', 'City', 'Festival']:
+        df1.loc[:, col] = df1.loc[:, col].str.strip()
+
+    return df1
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_file(path):
+    """
+    Mede leitura e limpeza nos dois caminhos para um csv
+    
+    Output: dicionário com os tempos (s) de cada etapa
+    """
+    raw, t_read_legacy = _timed(pd.read_csv, path)
+    legacy, t_clean_legacy = _timed(legacy_clean_code, raw)
+    del raw
+
+    raw, t_read = _timed(read_orders, path)
+    cleaned, t_clean = _timed(clean_code, raw)
+    del raw
+
+    assert len(legacy) == len(cleaned), 'os dois caminhos devem manter as mesmas linhas'
+
+    return {
+        'rows': len(cleaned),
+        'legacy_read': t_read_legacy,
+        'legacy_clean': t_clean_legacy,
+        'read': t_read,
+        'clean': t_clean,
+    }
+
+
+def print_result(label, result):
+    legacy_total = result['legacy_read'] + result['legacy_clean']
+    total = result['read'] + result['clean']
+    print(f"{label}: {result['rows']:,} linhas limpas")
+    print(f"  antigo: leitura {result['legacy_read']:.3f}s + limpeza {result['legacy_clean']:.3f}s = {legacy_total:.3f}s")
+    print(f"  atual : leitura {result['read']:.3f}s + limpeza {result['clean']:.3f}s = {total:.3f}s")
+    print(f"  speedup da limpeza: {result['legacy_clean'] / result['clean']:.1f}x | total: {legacy_total / total:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark do clean_code')
+    parser.add_argument('--rows', type=int, nargs='*', default=[45_000, 10_000_000],
+                        help='tamanhos dos datasets sintéticos')
+    parser.add_argument('--csv', help='usa um csv existente (ex.: train.csv) em vez do sintético')
+    args = parser.parse_args()
+
+    if args.csv:
+        print_result(args.csv, bench_file(args.csv))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            for n_rows in args.rows:
+                path = os.path.join(tmp, f'orders_{n_rows}.csv')
+                write_orders_csv(path, n_rows)
+                print_result(f'sintético {n_rows:,}', bench_file(path))
+                os.remove(path)
@@ -0,0 +1,85 @@
+"""
+Benchmark da distância restaurante -> local de entrega
+
+Compara o caminho antigo (DataFrame.apply por linha chamando haversine())
+com o haversine_np vetorizado, e confere que os dois dão o mesmo resultado.
+
+Uso:
+    python -m benchmarks.bench_distance --rows 45000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from haversine import haversine
+
+from utils.geo import haversine_np
+
+
+COORD_COLUMNS = ['Delivery_location_latitude', 'Delivery_location_longitude', 'Restaurant_latitude', 'Restaurant_longitude']
+
+
+def make_coordinates(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    rest_lat = rng.uniform(-30.0, 30.0, n_rows)
+    rest_lon = rng.uniform(-179.0, 179.0, n_rows)
+    return pd.DataFrame({
+        'Restaurant_latitude': rest_lat,
+        'Restaurant_longitude': rest_lon,
+        'Delivery_location_latitude': rest_lat + rng.uniform(-1.0, 1.0, n_rows),
+        'Delivery_location_longitude': rest_lon + rng.uniform(-1.0, 1.0, n_rows),
+    })
+
+
+def distance_apply(df1):
+    """ Caminho antigo do distance(): uma chamada de haversine() por linha """
+    return df1.loc[:, COORD_COLUMNS].apply( lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
+                                                               (x['Delivery_location_latitude'], x['Delivery_location_longitude']) ), axis=1)
+
+
+def distance_vectorized(df1):
+    return haversine_np(df1['Restaurant_latitude'], df1['Restaurant_longitude'],
+                        df1['Delivery_location_latitude'], df1['Delivery_location_longitude'])
+
+
+def check_equivalence(n_rows=10_000, seed=1):
+    """
+    Confere numericamente o haversine_np contra o pacote haversine
+    
+    Inclui pontos repetidos, antípodas e coordenadas cruzando o meridiano 180.
+    """
+    df1 = make_coordinates(n_rows, seed)
+    extremos = pd.DataFrame({
+        'Restaurant_latitude': [0.0, 12.9716, 0.0, 89.9, -45.0],
+        'Restaurant_longitude': [0.0, 77.5946, 179.9, 10.0, -179.5],
+        'Delivery_location_latitude': [0.0, 12.9716, 0.0, -89.9, -45.0],
+        'Delivery_location_longitude': [0.0, 77.5946, -179.9, -170.0, 179.5],
+    })
+    df1 = pd.concat([df1, extremos], ignore_index=True)
+
+    expected = distance_apply(df1).to_numpy()
+    result = distance_vectorized(df1)
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-9)
+    return np.max(np.abs(result - expected))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark da distância (haversine)')
+    parser.add_argument('--rows', type=int, nargs='*', default=[45_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f'equivalência com o pacote haversine: ok (maior diferença {check_equivalence():.2e} km)')
+
+    for n_rows in args.rows:
+        df1 = make_coordinates(n_rows)
+
+        start = time.perf_counter()
+        distance_apply(df1)
+        t_apply = time.perf_counter() - start
+
+        start = time.perf_counter()
+        distance_vectorized(df1)
+        t_vec = time.perf_counter() - start
+
+        print(f'{n_rows:,} linhas: apply {t_apply:.3f}s | vetorizado {t_vec:.4f}s | speedup {t_apply / t_vec:.0f}x')
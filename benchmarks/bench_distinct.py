@@ -0,0 +1,63 @@
+"""
+Benchmark de precisão x velocidade da contagem de entregadores distintos
+
+Compara a contagem exata (nunique / groupby().nunique()) com o HyperLogLog
+(utils/hll.py) em diferentes precisões, para a contagem total e para a
+contagem por semana usada no order_share_by_week.
+
+Uso:
+    python -m benchmarks.bench_distinct --rows 45000 1000000 --precisions 10 12 14
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.hll import nunique, nunique_by
+
+
+def make_couriers(n_rows, seed=0):
+    """ Semanas e IDs de entregadores (texto, como no dataset bruto) para n_rows pedidos """
+    rng = np.random.default_rng(seed)
+    n_couriers = max(n_rows // 35, 10)
+    couriers = pd.Series(np.char.mod('COURIER%07d', rng.integers(0, n_couriers, n_rows)), name='Delivery_person_ID')
+    weeks = pd.Series(rng.integers(6, 14, n_rows).astype('int8'), name='Week_of_year')
+    return weeks, couriers
+
+
+def _best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark exato x HyperLogLog')
+    parser.add_argument('--rows', type=int, nargs='*', default=[45_000, 1_000_000])
+    parser.add_argument('--precisions', type=int, nargs='*', default=[10, 12, 14])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for n_rows, as_category in [(n, c) for n in args.rows for c in (False, True)]:
+        weeks, couriers = make_couriers(n_rows)
+        # no dataset limpo o Delivery_person_ID é categórico (ver utils/cleaning.py)
+        if as_category:
+            couriers = couriers.astype('category')
+        print(f"{n_rows:,} pedidos ({'categórico' if as_category else 'texto'})")
+
+        exact, t_exact = _best_time(lambda: nunique(couriers, mode='exact'), args.repeat)
+        exact_by, t_exact_by = _best_time(lambda: nunique_by(weeks, couriers, mode='exact'), args.repeat)
+        print(f'  exato      : total {exact:,} em {t_exact * 1000:.1f} ms | por semana em {t_exact_by * 1000:.1f} ms')
+
+        for p in args.precisions:
+            approx, t_hll = _best_time(lambda: nunique(couriers, mode='hll', precision=p), args.repeat)
+            approx_by, t_hll_by = _best_time(lambda: nunique_by(weeks, couriers, mode='hll', precision=p), args.repeat)
+
+            error = abs(approx - exact) / exact * 100
+            error_by = (np.abs(approx_by - exact_by) / exact_by * 100).max()
+            print(f'  hll p={p:<2}   : total {approx:,} (erro {error:.2f}%) em {t_hll * 1000:.1f} ms | '
+                  f'por semana erro máx {error_by:.2f}% em {t_hll_by * 1000:.1f} ms | sketch {2 ** p:,} bytes')
@@ -0,0 +1,64 @@
+"""
+Benchmark de escalabilidade da agregação paralela (utils/parallel.py)
+
+Gera um dataset sintético, limpa uma vez e mede o parallel_aggregates com
+1, 2, 4 e 8 processos para cada critério de partição, conferindo que o
+resultado é igual ao da execução em um processo.
+
+Uso:
+    python -m benchmarks.bench_parallel --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import write_orders_csv
+from utils.cleaning import clean_code, read_orders
+from utils.parallel import PARTITIONS, parallel_aggregates
+
+
+def _normalized(df_aux, keys):
+    """ Ordem de linhas/categorias não faz parte do resultado: compara como texto, ordenado pelas chaves """
+    df_aux = df_aux.astype({key: str for key in keys})
+    return df_aux.sort_values(keys, ignore_index=True)
+
+
+def _same_result(state, reference):
+    """ Compara as métricas das páginas de dois StreamAggregates """
+    keys = ['City', 'Road_traffic_density']
+    pd.testing.assert_frame_equal(_normalized(state.rollup(keys), keys),
+                                  _normalized(reference.rollup(keys), keys), check_exact=False)
+    pd.testing.assert_frame_equal(state.order_share_by_week(), reference.order_share_by_week(), check_exact=False)
+    return state.rows == reference.rows and state.delivery_unique() == reference.delivery_unique()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark da agregação paralela')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.csv')
+        write_orders_csv(path, args.rows)
+        df1 = clean_code(read_orders(path))
+    print(f'{len(df1):,} pedidos limpos | {os.cpu_count()} núcleos disponíveis')
+
+    for partition in PARTITIONS:
+        reference = None
+        print(f'partição por {partition}')
+        for workers in args.workers:
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                state = parallel_aggregates(df1, workers, partition)
+                best = min(best, time.perf_counter() - start)
+
+            if reference is None:
+                reference, base = state, best
+            ok = _same_result(state, reference)
+            print(f'  {workers} processo(s): {best * 1000:8.1f} ms | {len(df1) / best:12,.0f} pedidos/s | '
+                  f'speedup {base / best:4.2f}x | igual ao serial: {ok}')
@@ -0,0 +1,72 @@
+"""
+Benchmark do top_delivers (top 10 entregadores por cidade)
+
+Compara o caminho antigo (ordenação completa da tabela + um filtro por cidade
+fixa) com o top_k_per_group (seleção parcial por grupo) e confere que os dois
+escolhem os mesmos tempos.
+
+Uso:
+    python -m benchmarks.bench_top_delivers --couriers 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.topk import top_k_per_group
+
+
+CITIES = ['Metropolitian', 'Urban', 'Semi-Urban']
+
+
+def make_max_time_table(n_couriers, seed=0):
+    """ Tabela no formato do courier_max_time: uma linha por (City, Delivery_person_ID) """
+    rng = np.random.default_rng(seed)
+    couriers = np.char.mod('COURIER%06d', np.arange(n_couriers))
+    return pd.DataFrame({
+        'City': pd.Categorical(np.array(CITIES)[rng.integers(0, len(CITIES), n_couriers)]),
+        'Delivery_person_ID': pd.Categorical(couriers),
+        'Time_taken(min)': rng.integers(10, 55, n_couriers).astype('int16'),
+    })
+
+
+def legacy_top_delivers(df2, top_asc, k=10):
+    """ Caminho antigo: ordena tudo e filtra as três cidades fixas """
+    df2 = df2.sort_values(['City', 'Time_taken(min)'], ascending=top_asc)
+    parts = [df2.loc[df2['City'] == city, :].head(k) for city in CITIES]
+    return pd.concat(parts).reset_index(drop=True)
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark do top_delivers')
+    parser.add_argument('--couriers', type=int, nargs='*', default=[100_000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n_couriers in args.couriers:
+        df2 = make_max_time_table(n_couriers)
+        for top_asc in (True, False):
+            legacy_times, new_times = [], []
+            for _ in range(args.repeat):
+                legacy, t = _timed(legacy_top_delivers, df2, top_asc, args.k)
+                legacy_times.append(t)
+                new, t = _timed(top_k_per_group, df2, 'City', 'Time_taken(min)', args.k, ascending=top_asc)
+                new_times.append(t)
+
+            # os entregadores empatados podem variar, mas os tempos por cidade devem ser os mesmos
+            for city in CITIES:
+                expected = legacy.loc[legacy['City'] == city, 'Time_taken(min)'].to_numpy()
+                result = new.loc[new['City'] == city, 'Time_taken(min)'].to_numpy()
+                assert (expected == result).all(), city
+
+            label = 'mais rápidos' if top_asc else 'mais lentos'
+            print(f'{n_couriers:,} entregadores ({label}): antigo {min(legacy_times) * 1000:.1f} ms | '
+                  f'top-k {min(new_times) * 1000:.1f} ms | speedup {min(legacy_times) / min(new_times):.1f}x')
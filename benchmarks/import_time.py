@@ -0,0 +1,147 @@
+"""
+Custo de inicialização (imports) de cada página
+
+Para cada página (Home.py e pages/*.py), os imports de primeiro nível do
+script são executados em um interpretador novo com `python -X importtime`,
+que registra o tempo de cada módulo importado. O relatório mostra o tempo
+total de import da página e os módulos mais caros.
+
+Só os imports rodam (o corpo da página chama o Streamlit). Módulos que não
+estão instalados são listados e ficam fora da soma. Como no benchmarks/suite.py,
+os resultados podem ser gravados (--save) e comparados com um baseline
+(--baseline): páginas/módulos que ficaram mais lentos terminam com código 1.
+
+Uso:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 5 --save imports.json
+    python -m benchmarks.import_time --baseline imports.json
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.suite import compare
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ['Home.py'] + sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def page_imports(path):
+    """
+    Imports de primeiro nível de um script
+
+    Output: lista com o código de cada import (ex.: 'import pandas as pd')
+    """
+    with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+        source = f.read()
+    return [ast.get_source_segment(source, node) for node in ast.parse(source).body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def _snippet(statements):
+    """ Executa cada import separadamente; um módulo ausente não impede a medição dos demais """
+    lines = []
+    for statement in statements:
+        lines += ['try:', f'    {statement}', 'except ImportError as e:', '    print(e.name)']
+    return '\n'.join(lines)
+
+
+def parse_importtime(stderr):
+    """
+    Lê a saída do -X importtime
+
+    Output: dicionário módulo de primeiro nível -> segundos (cumulativo, incluindo os submódulos)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # os submódulos aparecem indentados sob o módulo que os importou
+        if not name[1:].startswith(' '):
+            modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+
+def _importtime(code):
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def measure_page(path):
+    """
+    Importa os módulos da página em um interpretador novo
+
+    Os módulos carregados na partida do próprio interpretador (site, encodings, ...)
+    não entram na conta.
+
+    Output: dicionário módulo -> segundos e lista de módulos não instalados
+    """
+    startup = parse_importtime(_importtime('pass').stderr)
+    result = _importtime(_snippet(page_imports(path)))
+    modules = {name: seconds for name, seconds in parse_importtime(result.stderr).items() if name not in startup}
+    return modules, sorted(set(result.stdout.split()))
+
+
+def run_pages(pages=PAGES, repeat=3):
+    """
+    Mede cada página `repeat` vezes e fica com a execução mais rápida
+
+    Output: dicionário página -> {'total' | 'import.<módulo>': {'seconds': ...}, 'missing': [...]}
+    """
+    results = {}
+    for path in pages:
+        runs = [measure_page(path) for _ in range(repeat)]
+        modules, missing = min(runs, key=lambda run: sum(run[0].values()))
+        results[path] = {'total': {'seconds': sum(modules.values())},
+                         **{f'import.{name}': {'seconds': seconds} for name, seconds in modules.items()},
+                         'missing': missing}
+    return results
+
+
+def print_results(path, stages, top=10):
+    missing = f" | não instalados: {', '.join(stages['missing'])}" if stages['missing'] else ''
+    print(f"{path}: {stages['total']['seconds'] * 1000:.1f} ms{missing}")
+    modules = sorted(((stage, stats['seconds']) for stage, stats in stages.items() if stage.startswith('import.')),
+                     key=lambda item: -item[1])
+    for stage, seconds in modules[:top]:
+        print(f'  {stage[len("import."):]:<48} {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tempo de import de cada página (python -X importtime)')
+    parser.add_argument('pages', nargs='*', default=PAGES, help='scripts das páginas (padrão: Home.py e pages/*.py)')
+    parser.add_argument('--repeat', type=int, default=3, help='execuções por página (fica a mais rápida)')
+    parser.add_argument('--top', type=int, default=10, help='módulos mais caros listados por página')
+    parser.add_argument('--save', help='grava os resultados neste json (baseline)')
+    parser.add_argument('--baseline', help='compara com um json gravado pelo --save')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='razão de tempo a partir da qual é regressão')
+    args = parser.parse_args()
+
+    current = run_pages(args.pages, args.repeat)
+    for path, stages in current.items():
+        print_results(path, stages, args.top)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        stages = {path: {stage: stats for stage, stats in page.items() if stage != 'missing'} for path, page in current.items()}
+        regressions = compare(stages, baseline, args.tolerance, min_seconds=0.01)
+        for path, stage, before, after in regressions:
+            print(f'REGRESSÃO {path} | {stage}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms')
+        if regressions:
+            sys.exit(1)
+        print('nenhuma regressão em relação ao baseline')
@@ -0,0 +1,60 @@
+"""
+Relatório de memória do dataset limpo
+
+Compara o memory_usage(deep=True) do dataset limpo no formato antigo
+(textos como object, int64/float64) com a representação compacta atual
+(categorias, int8/int16 e coordenadas float32).
+
+Uso:
+    python -m benchmarks.memory_report --csv train.csv
+    python -m benchmarks.memory_report --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.bench_clean_code import legacy_clean_code
+from benchmarks.synthetic import write_orders_csv
+from utils.cleaning import clean_code, read_orders
+
+
+def memory_report(path):
+    """
+    Monta a tabela de memória por coluna (em MB) antes e depois
+    
+    Input: caminho do csv
+    Output: Dataframe com as colunas before_mb, after_mb, before_dtype e after_dtype
+    """
+    before = legacy_clean_code(pd.read_csv(path))
+    after = clean_code(read_orders(path))
+
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'after_dtype': after.dtypes.astype(str),
+        'before_mb': before.memory_usage(deep=True, index=False) / 1024 ** 2,
+        'after_mb': after.memory_usage(deep=True, index=False) / 1024 ** 2,
+    })
+    report.loc['TOTAL', ['before_mb', 'after_mb']] = report[['before_mb', 'after_mb']].sum()
+    report['reduction'] = report['before_mb'] / report['after_mb']
+    return report
+
+
+def print_report(label, report):
+    print(label)
+    print(report.round(2).to_string())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Relatório de memória do dataset limpo')
+    parser.add_argument('--rows', type=int, default=45_000, help='tamanho do dataset sintético')
+    parser.add_argument('--csv', help='usa um csv existente (ex.: train.csv) em vez do sintético')
+    args = parser.parse_args()
+
+    if args.csv:
+        print_report(args.csv, memory_report(args.csv))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_orders_csv(os.path.join(tmp, 'orders.csv'), args.rows)
+            print_report(f'sintético {args.rows:,}', memory_report(path))
@@ -0,0 +1,197 @@
+"""
+Suíte de benchmarks do dashboard
+
+Gera datasets sintéticos no formato do train.csv (benchmarks/synthetic.py) e
+mede, para cada tamanho, o tempo e o pico de memória de cada etapa:
+
+- read: leitura do csv (read_orders)
+- clean: clean_code
+- snapshot_write / snapshot_read: snapshot Parquet (só com pyarrow)
+- shared_publish / shared_open: dataset compartilhado Arrow mapeado em memória (só com pyarrow)
+- index / cube: estruturas montadas uma vez por versão do dataset
+- filter: filtros da barra lateral no dataset (índice) e no cubo
+- metric.<nome>: cada métrica das páginas (utils/metrics.METRICS)
+- figure.<nome>: cada figura das páginas (utils/figures.FIGURES), incluindo a serialização
+
+O pico de memória é medido com tracemalloc em uma segunda execução da etapa,
+para que o custo do rastreamento não entre no tempo.
+
+Os resultados podem ser gravados como baseline (--save) e comparados com um
+baseline anterior (--baseline): etapas que ficaram mais lentas que a
+tolerância são listadas e o processo termina com código 1.
+
+Uso:
+    python -m benchmarks.suite --rows 10000 1000000 10000000 --save baseline.json
+    python -m benchmarks.suite --rows 10000 1000000 --baseline baseline.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import FIRST_DATE, N_DAYS, write_orders_csv
+from utils import shared, snapshot
+from utils.cleaning import clean_code, read_orders
+from utils.cube import build_cube, filter_cube
+from utils.figures import FIGURES
+from utils.index import OrdersIndex, filter_orders
+from utils.metrics import METRICS
+
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+
+# Filtros típicos da barra lateral: dois terços do período e três níveis de tráfego
+DATE_CUTOFF = FIRST_DATE + pd.Timedelta(days=N_DAYS * 2 // 3)
+TRAFFIC_OPTIONS = ['Low', 'Medium', 'Jam']
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def measure(func, *args, memory=True):
+    """
+    Executa func(*args) e mede tempo (s) e pico de memória alocada (MB)
+
+    Output: resultado da função e dicionário com seconds e peak_mb
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func(*args)
+    stats = {'seconds': time.perf_counter() - start}
+
+    if memory:
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = func(*args)
+        stats['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return result, stats
+
+
+def _render(fig):
+    """ Serialização da figura, como no cache de figuras (JSON do Plotly / HTML do Folium) """
+    if hasattr(fig, 'to_json'):
+        return fig.to_json()
+    import folium
+    return folium.Figure().add_child(fig).render()
+
+
+def run_suite(path, memory=True):
+    """
+    Mede todas as etapas para um csv
+
+    Input: caminho do csv e se deve medir a memória
+    Output: dicionário etapa -> {seconds, peak_mb}
+    """
+    results = {}
+
+    raw, results['read'] = measure(read_orders, path, memory=memory)
+    df1, results['clean'] = measure(clean_code, raw, memory=memory)
+    del raw
+
+    if snapshot.has_pyarrow():
+        parquet_path = snapshot.snapshot_path(path)
+        _, results['snapshot_write'] = measure(lambda: snapshot.build_snapshot(path, parquet_path, force=True), memory=memory)
+        df1, results['snapshot_read'] = measure(snapshot.read_snapshot, parquet_path, None, memory=memory)
+
+        arrow_path = shared.shared_path(path)
+        _, results['shared_publish'] = measure(lambda: shared.publish(path, arrow_path, force=True), memory=memory)
+        df1, results['shared_open'] = measure(shared.open_shared, arrow_path, None, memory=memory)
+        os.remove(parquet_path)
+
+    index, results['index'] = measure(OrdersIndex, df1, memory=memory)
+    cube, results['cube'] = measure(build_cube, df1, memory=memory)
+
+    def apply_filters():
+        return (filter_orders(df1, index, DATE_CUTOFF, TRAFFIC_OPTIONS),
+                filter_cube(cube, DATE_CUTOFF, TRAFFIC_OPTIONS))
+
+    (df_filtered, cube_filtered), results['filter'] = measure(apply_filters, memory=memory)
+
+    for name, func in METRICS.items():
+        _, results[f'metric.{name}'] = measure(func, df_filtered, cube_filtered, memory=memory)
+
+    # a primeira figura do processo carrega os templates do Plotly: aquece antes de medir
+    _render(next(iter(FIGURES.values()))(df_filtered, cube_filtered))
+    for name, func in FIGURES.items():
+        _, results[f'figure.{name}'] = measure(lambda: _render(func(df_filtered, cube_filtered)), memory=memory)
+
+    results['rows'] = len(df1)
+    return results
+
+
+def compare(current, baseline, tolerance=1.25, min_seconds=0.005):
+    """
+    Compara os tempos com um baseline
+
+    Uma etapa regrediu se ficou mais de `tolerance` vezes mais lenta e a
+    diferença passa de `min_seconds` (etapas muito curtas oscilam demais).
+
+    Output: lista de (tamanho, etapa, segundos do baseline, segundos atuais)
+    """
+    regressions = []
+    for size, stages in current.items():
+        for stage, stats in stages.items():
+            before = baseline.get(size, {}).get(stage)
+            if stage == 'rows' or before is None:
+                continue
+            if stats['seconds'] > before['seconds'] * tolerance and stats['seconds'] - before['seconds'] > min_seconds:
+                regressions.append((size, stage, before['seconds'], stats['seconds']))
+    return regressions
+
+
+def print_results(label, results, baseline=None):
+    print(f"{label}: {results['rows']:,} pedidos limpos")
+    for stage, stats in results.items():
+        if stage == 'rows':
+            continue
+        line = f"  {stage:<48} {stats['seconds'] * 1000:10.1f} ms"
+        if 'peak_mb' in stats:
+            line += f" | pico {stats['peak_mb']:9.1f} MB"
+        if baseline and stage in baseline:
+            line += f" | baseline {baseline[stage]['seconds'] * 1000:10.1f} ms ({stats['seconds'] / baseline[stage]['seconds']:.2f}x)"
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks do dashboard')
+    parser.add_argument('--rows', type=int, nargs='*', default=DEFAULT_ROWS, help='tamanhos dos datasets sintéticos')
+    parser.add_argument('--save', help='grava os resultados neste json (baseline)')
+    parser.add_argument('--baseline', help='compara com um json gravado pelo --save')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='razão de tempo a partir da qual é regressão')
+    parser.add_argument('--no-memory', action='store_true', help='não mede o pico de memória (roda cada etapa uma vez)')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    current = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = os.path.join(tmp, f'orders_{n_rows}.csv')
+            write_orders_csv(path, n_rows)
+            size = str(n_rows)
+            current[size] = run_suite(path, memory=not args.no_memory)
+            os.remove(path)
+            print_results(f'sintético {n_rows:,}', current[size], baseline.get(size))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(current, baseline, args.tolerance)
+        for size, stage, before, after in regressions:
+            print(f'REGRESSÃO {size} linhas | {stage}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms')
+        if regressions:
+            sys.exit(1)
+        print('nenhuma regressão em relação ao baseline')
@@ -0,0 +1,121 @@
+"""
+Gerador de datasets sintéticos com o mesmo formato do train.csv
+
+Reproduz as particularidades do arquivo original: valores vazios marcados
+como 'NaN ', espaços no final dos textos e o tempo no formato '(min) NN'.
+
+Uso:
+    python -m benchmarks.synthetic saida.csv --rows 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+CITY_CODES = ['INDO', 'BANG', 'COIMB', 'CHEN', 'HYD', 'RANCHI', 'MYS', 'DEH', 'KOC', 'PUNE', 'LUDH',
+              'KNP', 'MUM', 'KOL', 'JAP', 'SUR', 'GOA', 'AURG', 'AGR', 'VAD', 'ALH', 'BHP']
+WEATHER = ['Sunny', 'Stormy', 'Sandstorms', 'Cloudy', 'Fog', 'Windy']
+TRAFFIC = ['Low ', 'Medium ', 'High ', 'Jam ']
+ORDER_TYPES = ['Snack ', 'Meal ', 'Drinks ', 'Buffet ']
+VEHICLES = ['motorcycle ', 'scooter ', 'electric_scooter ', 'bicycle ']
+CITIES = ['Metropolitian ', 'Urban ', 'Semi-Urban ']
+FIRST_DATE = pd.Timestamp(2022, 2, 11)
+N_DAYS = 55
+
+
+def _with_nan(rng, values, frac):
+    """ Troca uma fração `frac` dos valores pelo marcador 'NaN ' """
+    values = values.astype(object)
+    values[rng.random(len(values)) < frac] = 'NaN '
+    return values
+
+
+def make_orders(n_rows, seed=0, start_id=0, n_couriers=None):
+    """
+    Gera `n_rows` pedidos sintéticos no formato bruto do train.csv
+    
+    Input: número de linhas, semente, primeiro ID e número de entregadores
+    Output: Dataframe bruto (todas as colunas como texto, igual ao csv)
+    """
+    rng = np.random.default_rng(seed)
+    if n_couriers is None:
+        n_couriers = max(n_rows // 35, 10)
+
+    ids = np.char.mod('0x%x ', np.arange(start_id, start_id + n_rows) + 0x4000)
+
+    courier = rng.integers(0, n_couriers, n_rows)
+    courier_city = np.array(CITY_CODES)[courier % len(CITY_CODES)]
+    # ex.: 'INDORES13DEL02 '
+    courier_ids = np.char.add(np.char.add(courier_city, 'RES'), np.char.mod('%02d', courier // 100))
+    courier_ids = np.char.add(np.char.add(courier_ids, 'DEL'), np.char.mod('%02d ', courier % 100))
+
+    # idade e avaliação ficam vazias juntas, como no dataset original
+    missing_person = rng.random(n_rows) < 0.04
+    age = rng.integers(20, 40, n_rows).astype(str).astype(object)
+    age[missing_person] = 'NaN '
+    ratings = np.round(rng.uniform(2.5, 5.0, n_rows), 1).astype(str).astype(object)
+    ratings[missing_person] = 'NaN '
+
+    rest_lat = rng.uniform(9.0, 31.0, n_rows)
+    rest_lon = rng.uniform(72.0, 88.0, n_rows)
+    deliv_lat = rest_lat + rng.uniform(0.01, 0.15, n_rows)
+    deliv_lon = rest_lon + rng.uniform(0.01, 0.15, n_rows)
+
+    dates = (FIRST_DATE + pd.to_timedelta(rng.integers(0, N_DAYS, n_rows), unit='D')).strftime('%d-%m-%Y')
+
+    hours = rng.integers(8, 24, n_rows)
+    minutes = rng.integers(0, 4, n_rows) * 15
+    time_ordered = np.char.add(np.char.mod('%02d:', hours), np.char.mod('%02d:00', minutes))
+    time_picked = np.char.add(np.char.mod('%02d:', hours), np.char.mod('%02d:00', (minutes + 10) % 60))
+
+    weather = np.char.add('conditions ', np.array(WEATHER + ['NaN'])[rng.integers(0, len(WEATHER) + 1, n_rows)])
+
+    return pd.DataFrame({
+        'ID': ids,
+        'Delivery_person_ID': courier_ids,
+        'Delivery_person_Age': age,
+        'Delivery_person_Ratings': ratings,
+        'Restaurant_latitude': np.round(rest_lat, 6),
+        'Restaurant_longitude': np.round(rest_lon, 6),
+        'Delivery_location_latitude': np.round(deliv_lat, 6),
+        'Delivery_location_longitude': np.round(deliv_lon, 6),
+        'Order_Date': dates,
+        'Time_Orderd': _with_nan(rng, time_ordered, 0.04),
+        'Time_Order_picked': time_picked,
+        'Weatherconditions': weather,
+        'Road_traffic_density': _with_nan(rng, np.array(TRAFFIC)[rng.integers(0, len(TRAFFIC), n_rows)], 0.01),
+        'Vehicle_condition': rng.integers(0, 4, n_rows),
+        'Type_of_order': np.array(ORDER_TYPES)[rng.integers(0, len(ORDER_TYPES), n_rows)],
+        'Type_of_vehicle': np.array(VEHICLES)[rng.integers(0, len(VEHICLES), n_rows)],
+        'multiple_deliveries': _with_nan(rng, rng.integers(0, 4, n_rows).astype(str), 0.02),
+        'Festival': _with_nan(rng, np.where(rng.random(n_rows) < 0.02, 'Yes ', 'No '), 0.005),
+        'City': _with_nan(rng, np.array(CITIES)[rng.integers(0, len(CITIES), n_rows)], 0.03),
+        'Time_taken(min)': np.char.mod('(min) %d', rng.integers(10, 55, n_rows)),
+    })
+
+
+def write_orders_csv(path, n_rows, seed=0, chunk_rows=1_000_000):
+    """
+    Escreve o csv sintético em blocos, para não precisar gerar tudo na memória
+    
+    Input: caminho de saída, número de linhas, semente e tamanho do bloco
+    Output: caminho do arquivo gerado
+    """
+    n_couriers = max(n_rows // 35, 10)
+    written = 0
+    while written < n_rows:
+        n = min(chunk_rows, n_rows - written)
+        chunk = make_orders(n, seed=seed + written, start_id=written, n_couriers=n_couriers)
+        chunk.to_csv(path, index=False, mode='w' if written == 0 else 'a', header=written == 0)
+        written += n
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera um csv sintético no formato do train.csv')
+    parser.add_argument('output', help='caminho do csv de saída')
+    parser.add_argument('--rows', type=int, default=45_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_orders_csv(args.output, args.rows, seed=args.seed)
@@ -1,122 +1,32 @@
 import pandas as pd
-import re
-import plotly.express as px
-import plotly.graph_objects as go
-from haversine import haversine 
-import folium
 
 import streamlit as st
-from PIL import Image
-from streamlit_folium import folium_static
 
-
-st.set_page_config(page_title='Visão Entregadores', layout='wide')
-
-#---------------------------------
-# Funções
-#---------------------------------
-
-def clean_code(df1):
-    """  Esta função tem a responsabilidade de limpar o dataframe
-    
-    Tipos de limpeza: 
-    1. Remoção dos dados NaN
-    2. Mudança do tipo da coluna de dados
-    3. Remoção dos espaços das variáveis de texto
-    4. Formatação da coluna de datas
-    5. Limpeza da coluna de tempo (remoção do texto da variável numérica)
-    
-    Input: Dataframe
-    Output: Dataframe       
-    
-    """
-    # Excluir as linhas com a idade dos entregadores vazia
-    linhas_vazias = df['Delivery_person_Age'] != 'NaN '
-    df1 = df1.loc[linhas_vazias, :]
-
-
-    # Excluir as linhas com a trafego  vazia
-    # ( Conceitos de seleção condicional )
-    linhas_vazias = df1['Road_traffic_density'] != 'NaN '
-    df1 = df1.loc[linhas_vazias, :]
-
-
-    # Excluir as linhas com a cidade  vazia
-    linhas_vazias = df1['City'] != 'NaN '
-    df1 = df1.loc[linhas_vazias, :]
-
-
-    # Excluir as linhas com o Festival  vazia
-    linhas_vazias = df['Festival'] != 'NaN '
-    df1 = df1.loc[linhas_vazias, :]
-    
-    # Remove as linhas da culuna multiple_deliveries igual a 'NaN '
-    linhas_vazias = df1['multiple_deliveries'] != 'NaN '
-    df1 = df1.loc[linhas_vazias, :]
-    
-    # Limpando a coluna de time_taken (min)
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply( lambda x: x.split( '(min) ')[1] )
-
-
-    # Conversao de texto/categoria/string para numeros inteiros
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype( int )
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype( int )
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype( int )
-    # Conversao de texto/categoria/strings para numeros decimais
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype( float )
-    # Conversao de texto para data
-    df1['Order_Date'] = pd.to_datetime( df1['Order_Date'], format='%d-%m-%Y' )
-
-
-    # Remover spaco da string
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip() 
-    df1.loc[:, 'Delivery_person_ID'] = df1.loc[:, 'Delivery_person_ID'].str.strip()
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:, 'Road_traffic_density'].str.strip() 
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip() 
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip() 
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip() 
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip() 
-
-    return df1
-
-
-            
-def top_delivers(df1, top_asc):
-    """ 
-    1. Recebe o dataset e o top_asc (ver 3.)
-    2. Retorna os 10 entregadores mais lentos ou rápidos por cidade
-    3. O top_asc define o ascending, se for False pega os últimos (ou seja, os entregadores que possuem os maiores tempos de entrega, que são os mais lentos). Se for True, pega os com o menor tempo (mais rápidos)   
-    """
-    
-    df2 = df1.loc[:, ['Delivery_person_ID', 'City', 'Time_taken(min)']].groupby( ['City', 'Delivery_person_ID'] ).max().sort_values(['City', 'Time_taken(min)'], ascending=top_asc).reset_index()
-
-    #encontra os top 10 de cada cidade
-    df_aux01 = df2.loc[df2['City'] == 'Metropolitian', :].head(10)
-    df_aux02 = df2.loc[df2['City'] == 'Urban', :].head(10)
-    df_aux03 = df2.loc[df2['City'] == 'Semi-Urban', :].head(10)
-
-    #concatena os top10 de cada cidade em uma única tabela
-    df3 =  pd.concat( [df_aux01, df_aux02, df_aux03] ).reset_index(drop=True)
-
-    return df3
+from utils import metrics
+from utils.assets import load_logo
+from utils.courier_index import HISTORY_COLUMNS, courier_history, courier_profile
+from utils.courier_table import courier_table, courier_table_view
+from utils.cube import filter_cube
+from utils.loader import load_courier_index, load_cube, load_data, load_filtered
+from utils.profiling import start_run, timing_panel
+from utils.sql_backend import pushdown
+from utils.tabs import lazy_tabs
 
 
+st.set_page_config(page_title='Visão Entregadores', layout='wide')
 
+# Tempo de cada etapa deste rerun (painel opcional na barra lateral, ver utils/profiling.py)
+timings = start_run('entregadores')
 
 #--------------- Início da Estrtutura Lógica do Código ----------------
   
 #---------------------------------
-# Import Dataset
+# Import Dataset + Limpando os dados
 #---------------------------------    
-    
-df = pd.read_csv('train.csv')
-
-#---------------------------------
-# Limpando os dados
-#---------------------------------
-
-df1 = clean_code(df)
 
+# Apenas as colunas usadas nesta página são lidas do snapshot
+COLUNAS = ['Order_Date', 'Road_traffic_density', 'City', 'Weatherconditions', 'Delivery_person_ID',
+           'Delivery_person_Age', 'Delivery_person_Ratings', 'Vehicle_condition', 'Time_taken(min)']
 
 
 
@@ -128,9 +38,8 @@ df1 = clean_code(df)
 #=====================================
 st.header('Markeplace - Visão Entregadores')
 
-image_path = 'logo.png'
-image = Image.open(image_path)
-st.sidebar.image(image, width=120)
+# logo decodificado uma vez por processo (ver utils/assets.py)
+st.sidebar.image(load_logo('logo.png'), width=120)
 
 st.sidebar.markdown('# Cury Company')
 st.sidebar.markdown('## Fastest Delivery in Town')
@@ -157,15 +66,6 @@ st.sidebar.markdown("""----""")
 st.sidebar.markdown('### Powered by DS')
 
 
-# Filtro de Data
-linhas_selecionadas = df1['Order_Date'] < date_slider
-df1 = df1.loc[linhas_selecionadas, :]
-
-
-# Filtro de transito
-linhas_selecionadas = df1['Road_traffic_density'].isin(traffic_options)
-df1 = df1.loc[linhas_selecionadas, :]
-
 
 
 
@@ -176,37 +76,46 @@ df1 = df1.loc[linhas_selecionadas, :]
 
 #=========================================================================
 
+# Só a aba ativa é executada (ver utils/tabs.py): o detalhe do entregador não lê o dataset filtrado
+aba = lazy_tabs(['Visão Gerencial', 'Detalhe do Entregador'], key='entregadores_aba')
+
+if aba == 'Visão Gerencial':
+    # Filtro de Data + Filtro de transito (busca binária no índice, sem varrer o dataset);
+    # o resultado é compartilhado entre as sessões que usam os mesmos filtros
+    df1 = load_filtered('train.csv', COLUNAS, date_slider, traffic_options)
 
-tab1, tab2, tab3 = st.tabs(['Visão Gerencial', ' ', ' '])
+    # Mesmos filtros aplicados no cubo pré-agregado
+    cube = filter_cube(load_cube('train.csv'), date_slider, traffic_options)
+
+    # Com CURRY_BACKEND=sqlite, os filtros e os agrupamentos abaixo rodam no SQLite (ver utils/sql_backend.py)
+    orders_sql = pushdown('train.csv', date_slider, traffic_options)
 
-with tab1:
     with st.container():
         st.markdown('## Overall Metrics')
         
         col1, col2, col3, col4 = st.columns(4, gap='large')
+
+        # Maior/menor idade e melhor/pior condição de veículo (ver utils/metrics.py)
+        extremes = metrics.courier_extremes(df1)
         
         with col1:
             # A Maior idade entre os entregadores         
-            maior_idade = df1.loc[:, 'Delivery_person_Age'].max()
-            col1.metric('Maior idade', maior_idade)
+            col1.metric('Maior idade', extremes['age_max'])
             
             
         with col2:
             #A Menor idade entre os entregadores            
-            menor_idade = df1.loc[:, 'Delivery_person_Age'].min()
-            col2.metric('Menor idade', menor_idade)
+            col2.metric('Menor idade', extremes['age_min'])
 
         
         with col3:
             # Veiculo com melhor condição
-            melhor_condicao_veiculo = df1.loc[:, 'Vehicle_condition'].max()
-            col3.metric('Melhor condição', melhor_condicao_veiculo)
+            col3.metric('Melhor condição', extremes['vehicle_max'])
             
         
         with col4:
             # Veiculo com pior condição
-            pior_condicao_veiculo = df1.loc[:, 'Vehicle_condition'].min()
-            col4.metric('Pior condição', pior_condicao_veiculo)
+            col4.metric('Pior condição', extremes['vehicle_min'])
             
     
     with st.container():
@@ -218,9 +127,8 @@ with tab1:
         with col1:            
             st.markdown('##### Avaliação média por entregador')
             
-            avaliacao_media_entregador = (df1.loc[:, ['Delivery_person_ID', 'Delivery_person_Ratings']].groupby( ['Delivery_person_ID'] ).mean().reset_index())
-            
-            st.dataframe(avaliacao_media_entregador)
+            # Tabela paginada no servidor: só a página visível é enviada ao navegador (ver utils/courier_table.py)
+            courier_table_view(courier_table('train.csv', date_slider, traffic_options), key='entregadores_tabela')
 
             
             
@@ -228,22 +136,12 @@ with tab1:
           
             st.markdown('##### Avaliação média por trânsito')
             
-            df_agg_rating_by_trafic = (df1.loc[:, ['Delivery_person_Ratings', 'Road_traffic_density']].groupby( 'Road_traffic_density' ).agg( {'Delivery_person_Ratings' : ['mean', 'std']} ) )
-
-            #mudança de nome das colunas
-            df_agg_rating_by_trafic.columns = ['Delivery_mean', 'Delivery_std']
-
-            #reset index
-            df_agg_rating_by_trafic.reset_index()
+            df_agg_rating_by_trafic = metrics.rating_by_traffic(orders_sql or cube)
             
             st.dataframe(df_agg_rating_by_trafic)
                       
             st.markdown('##### Avaliação média por clima')
-            df_agg_weather = (df1.loc[:, ['Delivery_person_Ratings', 'Weatherconditions']].groupby( 'Weatherconditions' ).agg( {'Delivery_person_Ratings' : ['mean', 'std']} ) )
-            #mudança de nome das colunas
-            df_agg_weather.columns = ['Weather_mean', 'Weather_std']
-            #reset index
-            df_agg_weather.reset_index()
+            df_agg_weather = metrics.rating_by_weather(orders_sql or cube)
             
             st.dataframe(df_agg_weather)
             
@@ -254,14 +152,57 @@ with tab1:
         st.markdown('## Velocidade de Entrega')
         
         col1, col2 = st.columns(2)
+
+        df_max_time = metrics.courier_max_time(df1)
         
         with col1:
-            df3 = top_delivers(df1, top_asc=True)
+            df3 = metrics.top_delivers(df_max_time, top_asc=True)
             st.markdown('##### Top entregadores mais rápidos')
             st.dataframe(df3)
 
             
         with col2:
-            df3 = top_delivers(df1, top_asc=False)
+            df3 = metrics.top_delivers(df_max_time, top_asc=False)
             st.markdown('##### Top entregadores mais lentos')         
-            st.dataframe(df3)
\ No newline at end of file
+            st.dataframe(df3)
+
+
+elif aba == 'Detalhe do Entregador':
+    st.markdown('## Histórico do entregador')
+    st.caption('Todos os pedidos do entregador, sem os filtros da barra lateral')
+
+    courier_id = st.text_input('Delivery_person_ID', key='entregador_detalhe').strip()
+    if courier_id:
+        # índice Delivery_person_ID -> linhas: só as linhas do entregador são lidas (ver utils/courier_index.py)
+        courier_index = load_courier_index('train.csv')
+
+        if courier_id not in courier_index:
+            st.warning(f'Entregador {courier_id} não encontrado')
+            sugestoes = courier_index.suggest(courier_id)
+            if sugestoes:
+                st.markdown('IDs parecidos: ' + ', '.join(sugestoes))
+
+        else:
+            history = courier_history(load_data('train.csv', columns=HISTORY_COLUMNS), courier_index, courier_id)
+            profile = courier_profile(history)
+
+            col1, col2, col3, col4 = st.columns(4, gap='large')
+            col1.metric('Pedidos', profile['orders'])
+            col2.metric('Avaliação média', f"{profile['rating_mean']:.2f} ± {profile['rating_std']:.2f}")
+            col3.metric('Tempo médio (min)', f"{profile['time_mean']:.1f} ± {profile['time_std']:.1f}")
+            col4.metric('Período', f"{profile['first_order']:%d/%m/%Y} - {profile['last_order']:%d/%m/%Y}")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown('##### Pedidos por cidade')
+                st.dataframe(profile['cities'])
+            with col2:
+                st.markdown('##### Pedidos por veículo')
+                st.dataframe(profile['vehicles'])
+
+            st.markdown('##### Pedidos')
+            st.dataframe(history.reset_index(drop=True), use_container_width=True)
+
+
+# Painel de tempos (opcional, desmarcado por padrão)
+timing_panel(timings)
@@ -0,0 +1,24 @@
+import io
+
+import pytest
+
+from benchmarks.synthetic import make_orders, write_orders_csv
+from utils.cleaning import clean_code, read_orders
+
+
+@pytest.fixture(scope='session')
+def raw_csv():
+    """ csv bruto sintético (com os 'NaN ', espaços e '(min) NN' do train.csv) em memória """
+    return make_orders(3000, seed=3).to_csv(index=False)
+
+
+@pytest.fixture(scope='session')
+def orders(raw_csv):
+    """ Dataset limpo pelo clean_code """
+    return clean_code(read_orders(io.StringIO(raw_csv)))
+
+
+@pytest.fixture
+def orders_csv(tmp_path):
+    """ train.csv sintético em um diretório temporário (os arquivos derivados ficam ao lado) """
+    return write_orders_csv(str(tmp_path / 'train.csv'), 3000, seed=5)
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+
+from api import compute_metric, make_app, parse_filters
+from utils import metrics
+
+
+def _serve(path, check):
+    """ Sobe a API do csv `path` em uma porta livre e roda `check(fetch)` no mesmo loop """
+    async def run():
+        sock, port = bind_unused_port()
+        server = HTTPServer(make_app(path))
+        server.add_sockets([sock])
+        client = AsyncHTTPClient()
+
+        async def fetch(url, **kwargs):
+            return await client.fetch(f'http://127.0.0.1:{port}{url}', raise_error=False, **kwargs)
+
+        try:
+            await check(fetch)
+        finally:
+            server.stop()
+            client.close()
+
+    asyncio.run(run())
+
+
+def test_metric_then_not_modified(orders_csv):
+    async def check(fetch):
+        url = '/metrics/orders_by_day?until=2022-03-20&traffic=Low,Jam'
+        response = await fetch(url)
+        assert response.code == 200
+        assert json.loads(response.body) == json.loads(compute_metric(orders_csv, 'orders_by_day',
+                                                                      *parse_filters('2022-03-20', 'Low,Jam')))
+
+        cached = await fetch(url, headers={'If-None-Match': response.headers['ETag']})
+        assert cached.code == 304
+        assert cached.body == b''
+
+        # outro filtro, outro ETag
+        other = await fetch('/metrics/orders_by_day?until=2022-03-20&traffic=Low')
+        assert other.code == 200
+        assert other.headers['ETag'] != response.headers['ETag']
+
+    _serve(orders_csv, check)
+
+
+def test_metric_list_and_errors(orders_csv):
+    async def check(fetch):
+        response = await fetch('/metrics')
+        assert response.code == 200
+        assert json.loads(response.body)['metrics'] == sorted(metrics.METRICS)
+
+        assert (await fetch('/metrics/unknown_metric')).code == 404
+        assert (await fetch('/metrics/orders_by_day?until=not-a-date')).code == 400
+
+    _serve(orders_csv, check)
@@ -0,0 +1,90 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from utils.cleaning import (CATEGORY_COLUMNS, REQUIRED_COLUMNS, _map_unique, clean_code, order_hours, period_column,
+                            read_orders, time_buckets)
+
+
+def test_map_unique_keeps_missing_values():
+    col = pd.Series(['Urban ', np.nan, 'Metropolitian ', 'Urban ', np.nan], index=[10, 11, 12, 13, 14])
+
+    result = _map_unique(col, lambda valores: valores.str.strip())
+
+    expected = pd.Series(['Urban', np.nan, 'Metropolitian', 'Urban', np.nan], index=col.index)
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_map_unique_numeric_result_with_missing_values():
+    col = pd.Series(['(min) 24', np.nan, '(min) 7'])
+
+    result = _map_unique(col, lambda valores: valores.str.extract(r'(\d+)$', expand=False).astype(int))
+
+    assert result.iloc[[0, 2]].tolist() == [24, 7]
+    assert np.isnan(result.iloc[1])
+
+
+def test_map_unique_without_missing_values_keeps_dtype():
+    col = pd.Series(['(min) 24', '(min) 7', '(min) 24'])
+
+    result = _map_unique(col, lambda valores: valores.str.extract(r'(\d+)$', expand=False).astype(int))
+
+    assert result.tolist() == [24, 7, 24]
+    assert result.dtype.kind == 'i'
+
+
+def test_map_unique_all_missing():
+    col = pd.Series([np.nan, np.nan], dtype='object')
+
+    assert _map_unique(col, lambda valores: valores.str.strip()).isna().all()
+
+
+def test_clean_code_on_raw_orders(orders):
+    for col in REQUIRED_COLUMNS:
+        assert orders[col].notna().all()
+    assert orders['Order_Date'].is_monotonic_increasing
+    assert orders['Time_taken(min)'].dtype == 'int16'
+    assert orders['Time_taken(min)'].between(10, 54).all()
+    assert not orders['City'].str.endswith(' ').any()
+    # Weatherconditions não é limpa e continua com o texto 'conditions NaN'
+    assert (orders['Weatherconditions'] == 'conditions NaN').any()
+    for col in CATEGORY_COLUMNS:
+        categories = orders[col].cat.categories
+        assert list(categories) == sorted(categories)
+
+
+def test_clean_code_keeps_missing_optional_values(raw_csv):
+    df = read_orders(io.StringIO(raw_csv))
+    complete = df.dropna(subset=REQUIRED_COLUMNS).index
+    # Type_of_order não é obrigatória: o valor vazio continua vazio depois do strip
+    df.loc[complete[:5], 'Type_of_order'] = np.nan
+
+    df1 = clean_code(df)
+
+    assert df1['Type_of_order'].isna().sum() == 5
+    assert set(df1['Type_of_order'].dropna().unique()) == {'Snack', 'Meal', 'Drinks', 'Buffet'}
+
+
+def test_time_buckets_match_strftime():
+    dates = pd.date_range('2019-01-01', '2026-12-31', freq='D')
+    buckets = time_buckets(dates)
+
+    np.testing.assert_array_equal(buckets['Week_of_year'], dates.strftime('%U').astype(int))
+    np.testing.assert_array_equal(buckets['Day_of_year'], dates.strftime('%j').astype(int))
+    np.testing.assert_array_equal(buckets['ISO_week'], dates.strftime('%V').astype(int))
+    np.testing.assert_array_equal(buckets['Month'], dates.month)
+
+
+def test_order_hours_with_missing_and_invalid_times():
+    hours = pd.Series(order_hours(pd.Series(['08:15:00', np.nan, '23:59:59', 'NaN', '08:30:00'], dtype='category')))
+
+    assert hours.tolist()[::2] == [8, 23, 8]
+    assert hours.isna().tolist() == [False, True, False, True, False]
+
+
+def test_period_column_without_precomputed_column(orders):
+    df1 = orders.loc[:, ['Order_Date', 'Time_Orderd']]
+
+    pd.testing.assert_series_equal(period_column(df1, 'Week_of_year'), orders['Week_of_year'])
+    pd.testing.assert_series_equal(period_column(df1, 'Order_hour'), orders['Order_hour'])
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.courier_index import CourierIndex, courier_history, courier_profile
+
+
+def test_courier_index_lookup(orders):
+    index = CourierIndex.from_frame(orders)
+    courier = orders['Delivery_person_ID'].iloc[10]
+
+    expected = orders[orders['Delivery_person_ID'] == courier]
+    pd.testing.assert_frame_equal(courier_history(orders, index, courier), expected)
+    assert index.rows == len(orders)
+    assert len(index) == orders['Delivery_person_ID'].nunique()
+    assert len(index.lookup('nao-existe')) == 0
+
+
+def test_courier_index_extend_matches_full_build(orders):
+    index = CourierIndex.from_frame(orders.iloc[:1200]).extend(CourierIndex.from_frame(orders.iloc[1200:], offset=1200))
+    full = CourierIndex.from_frame(orders)
+
+    assert index.rows == full.rows
+    assert index.positions.keys() == full.positions.keys()
+    for courier, positions in full.positions.items():
+        np.testing.assert_array_equal(index.lookup(courier), positions)
+
+
+def test_courier_index_skips_missing_ids():
+    df1 = pd.DataFrame({'Delivery_person_ID': ['A', np.nan, 'B', 'A']})
+    index = CourierIndex.from_frame(df1)
+
+    assert sorted(index.positions) == ['A', 'B']
+    np.testing.assert_array_equal(index.lookup('A'), [0, 3])
+    assert index.rows == 4
+
+
+def test_courier_index_suggest():
+    index = CourierIndex.from_frame(pd.DataFrame({'Delivery_person_ID': ['BANGRES01DEL02', 'CHENRES03DEL01']}))
+
+    assert index.suggest('bangres') == ['BANGRES01DEL02']
+    assert index.suggest('  ') == []
+
+
+def test_courier_profile(orders):
+    courier = orders['Delivery_person_ID'].iloc[0]
+    history = courier_history(orders, CourierIndex.from_frame(orders), courier)
+
+    profile = courier_profile(history)
+
+    assert profile['orders'] == len(history)
+    assert profile['first_order'] == history['Order_Date'].min()
+    assert profile['rating_mean'] == pytest.approx(history['Delivery_person_Ratings'].astype('float64').mean())
+    assert profile['cities'].sum() == len(history)
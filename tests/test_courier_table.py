@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import metrics
+from utils.courier_table import CourierTable, courier_table
+from utils.cube import COURIER_KEYS, build_cube
+from utils.loader import load_data
+
+
+@pytest.fixture(scope='module')
+def table(orders):
+    stats = metrics.courier_stats(build_cube(orders, COURIER_KEYS))
+    # entregadores com um único pedido não têm desvio padrão
+    stats.loc[::9, 'rating_std'] = np.nan
+    return CourierTable(stats)
+
+
+def test_pages_cover_every_courier_once(table):
+    pages = [table.page(page, 25)[0] for page in range(-(-len(table) // 25))]
+
+    assert all(len(frame) == 25 for frame in pages[:-1])
+    ids = pd.concat(pages)['Delivery_person_ID']
+    assert ids.tolist() == sorted(table.frame['Delivery_person_ID'])
+
+    frame, total = table.page(len(pages), 25)
+    assert len(frame) == 0 and total == len(table)
+
+
+@pytest.mark.parametrize('ascending', [True, False])
+def test_sort_keeps_missing_values_last(table, ascending):
+    frame, _ = table.page(0, len(table), sort_by='rating_std', ascending=ascending)
+    values = frame['rating_std']
+    present = values.dropna()
+
+    assert values.isna().sum() == table.frame['rating_std'].isna().sum() > 0
+    assert values.iloc[len(present):].isna().all()
+    assert present.tolist() == sorted(present, reverse=not ascending)
+
+
+def test_search_is_case_insensitive_and_keeps_order(table):
+    courier = table.frame['Delivery_person_ID'].iloc[0]
+    prefix = courier[:4]
+    expected = table.frame.loc[table.frame['Delivery_person_ID'].str.contains(prefix), :]
+
+    frame, total = table.page(0, 10, sort_by='orders', ascending=False, search=f'  {prefix.lower()} ')
+
+    assert total == len(expected)
+    assert set(frame['Delivery_person_ID']) <= set(expected['Delivery_person_ID'])
+    assert frame['orders'].is_monotonic_decreasing
+    assert table.page(0, 10, search='sem-entregador')[1] == 0
+
+
+def test_invalid_sort_column(table):
+    with pytest.raises(ValueError):
+        table.order('Delivery_person_Age')
+
+
+def test_courier_table_with_filters(orders_csv):
+    cutoff, traffic = pd.Timestamp(2022, 3, 20), ['Low', 'Jam']
+    df1 = load_data(orders_csv)
+    df1 = df1.loc[(df1['Order_Date'] < cutoff) & df1['Road_traffic_density'].isin(traffic)]
+
+    table = courier_table(orders_csv, cutoff, traffic)
+
+    assert courier_table(orders_csv, cutoff, list(reversed(traffic))) is table
+    assert len(table) == df1['Delivery_person_ID'].nunique()
+    assert table.frame['orders'].sum() == len(df1)
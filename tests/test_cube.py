@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cube import MEASURES, build_cube, filter_cube, merge_cubes, rollup
+
+
+def _expected(df1, by):
+    df_aux = df1.loc[:, by].copy()
+    for name, col in MEASURES.items():
+        df_aux[name] = df1[col].astype('float64')
+    grouped = df_aux.groupby(by, observed=True)
+    expected = grouped.size().rename('orders').to_frame()
+    for name in MEASURES:
+        expected[f'{name}_mean'] = grouped[name].mean()
+        expected[f'{name}_std'] = grouped[name].std()
+    return expected.sort_index().reset_index()
+
+
+@pytest.mark.parametrize('by', [['City'], ['Road_traffic_density'], ['City', 'Road_traffic_density'],
+                                ['Order_Date'], ['Weatherconditions', 'Festival']])
+def test_rollup_matches_groupby(orders, by):
+    pd.testing.assert_frame_equal(rollup(build_cube(orders), by), _expected(orders, by),
+                                  check_exact=False, check_categorical=False)
+
+
+def test_missing_measures_are_not_counted(orders):
+    df1 = orders.copy()
+    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].where(df1.index % 7 != 0)
+    cube = build_cube(df1)
+
+    assert cube['orders'].sum() == len(df1)
+    assert cube['rating_count'].sum() == df1['Delivery_person_Ratings'].notna().sum()
+    assert cube['rating_sum'].sum() == pytest.approx(df1['Delivery_person_Ratings'].astype('float64').sum())
+    pd.testing.assert_frame_equal(rollup(cube, ['City']), _expected(df1, ['City']),
+                                  check_exact=False, check_categorical=False)
+
+
+def test_merge_cubes_matches_single_cube(orders):
+    shuffled = orders.sample(frac=1, random_state=4).reset_index(drop=True)
+    merged = merge_cubes(build_cube(shuffled.iloc[:1000]), build_cube(shuffled.iloc[1000:]))
+
+    for by in (['City', 'Road_traffic_density'], ['Order_Date'], ['Type_of_vehicle']):
+        pd.testing.assert_frame_equal(rollup(merged, by), rollup(build_cube(orders), by),
+                                      check_exact=False, check_categorical=False)
+
+
+def test_rollup_in_key_order_regardless_of_row_order(orders):
+    shuffled = orders.sample(frac=1, random_state=9).reset_index(drop=True)
+    cube = merge_cubes(build_cube(shuffled.iloc[:500]), build_cube(shuffled.iloc[500:]))
+
+    for col in ('City', 'Road_traffic_density', 'Weatherconditions'):
+        assert list(cube[col].cat.categories) == sorted(cube[col].cat.categories)
+        assert rollup(cube, [col])[col].tolist() == sorted(orders[col].dropna().unique())
+
+
+def test_single_order_has_no_std():
+    df1 = pd.DataFrame({'City': ['Urban', 'Urban', 'Metropolitian'], 'Road_traffic_density': 'Low',
+                        'Order_Date': pd.Timestamp(2022, 3, 1), 'Festival': 'No', 'Type_of_order': 'Meal',
+                        'Weatherconditions': 'conditions Sunny', 'Type_of_vehicle': 'motorcycle',
+                        'Time_taken(min)': [10, 20, 30], 'Delivery_person_Ratings': [4.0, np.nan, 5.0],
+                        'Distance': [1.0, 2.0, 3.0]})
+
+    result = rollup(build_cube(df1), ['City']).set_index('City')
+
+    assert np.isnan(result.loc['Metropolitian', 'time_std'])
+    assert result.loc['Urban', 'time_std'] == pytest.approx(np.std([10, 20], ddof=1))
+    assert result.loc['Urban', 'rating_mean'] == 4.0
+    assert np.isnan(result.loc['Urban', 'rating_std'])
+
+
+def test_filter_cube(orders):
+    cutoff = pd.Timestamp(2022, 3, 15)
+    traffic = ['Low', 'Jam']
+    expected = orders[(orders['Order_Date'] < cutoff) & orders['Road_traffic_density'].isin(traffic)]
+
+    assert filter_cube(build_cube(orders), cutoff, traffic)['orders'].sum() == len(expected)
@@ -0,0 +1,27 @@
+import plotly.graph_objects as go
+
+from utils import figure_cache
+
+
+def _figure(data, fig=False):
+    return go.Figure(go.Pie(values=[1, 2]) if fig else go.Bar(y=[1, 2]))
+
+
+def test_cached_plotly_key_includes_kwargs():
+    figure_cache._cache.clear()
+    key = ('dataset', '2022-04-01T00:00:00', ('High',))
+
+    bar = figure_cache.cached_plotly(_figure, key, object())
+    pie = figure_cache.cached_plotly(_figure, key, object(), fig=True)
+
+    assert bar.data[0].type == 'bar'
+    assert pie.data[0].type == 'pie'
+    assert figure_cache.cached_plotly(_figure, key, object(), fig=True).data[0].type == 'pie'
+
+
+def test_cached_plotly_key_includes_scalar_args():
+    figure_cache._cache.clear()
+    key = ('dataset',)
+
+    assert figure_cache.cached_plotly(_figure, key, object(), False).data[0].type == 'bar'
+    assert figure_cache.cached_plotly(_figure, key, object(), True).data[0].type == 'pie'
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from utils.cube import build_cube, filter_cube
+from utils.figures import FIGURES
+from utils.index import OrdersIndex, filter_orders
+
+TRAFFIC = ['Low', 'Medium', 'High', 'Jam']
+
+# sem tráfego selecionado / data limite no primeiro dia do dataset: nenhuma linha
+EMPTY_FILTERS = [(pd.Timestamp(2022, 4, 6), []), (pd.Timestamp(2022, 2, 11), TRAFFIC)]
+
+
+@pytest.mark.parametrize('name', list(FIGURES))
+@pytest.mark.parametrize('date_cutoff, traffic', EMPTY_FILTERS)
+def test_figures_on_empty_filters(orders, name, date_cutoff, traffic):
+    df1 = filter_orders(orders, OrdersIndex(orders), date_cutoff, traffic)
+    cube = filter_cube(build_cube(orders), date_cutoff, traffic)
+    assert len(df1) == 0 and len(cube) == 0
+
+    assert FIGURES[name](df1, cube) is not None
+
+
+@pytest.mark.parametrize('name', list(FIGURES))
+def test_figures_on_some_traffic(orders, name):
+    date_cutoff, traffic = pd.Timestamp(2022, 3, 20), ['Jam']
+    df1 = filter_orders(orders, OrdersIndex(orders), date_cutoff, traffic)
+    cube = filter_cube(build_cube(orders), date_cutoff, traffic)
+
+    assert FIGURES[name](df1, cube) is not None
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from haversine import haversine
+
+from benchmarks.bench_distance import distance_apply, make_coordinates
+from utils.geo import haversine_np
+
+
+@pytest.fixture
+def coordinates():
+    # pontos repetidos, antípodas e coordenadas cruzando o meridiano 180
+    extremos = pd.DataFrame({
+        'Restaurant_latitude': [0.0, 12.9716, 0.0, 89.9, -45.0],
+        'Restaurant_longitude': [0.0, 77.5946, 179.9, 10.0, -179.5],
+        'Delivery_location_latitude': [0.0, 12.9716, 0.0, -89.9, -45.0],
+        'Delivery_location_longitude': [0.0, 77.5946, -179.9, -170.0, 179.5],
+    })
+    return pd.concat([make_coordinates(500, seed=2), extremos], ignore_index=True)
+
+
+def test_haversine_np_matches_haversine_per_row(coordinates):
+    result = haversine_np(coordinates['Restaurant_latitude'], coordinates['Restaurant_longitude'],
+                          coordinates['Delivery_location_latitude'], coordinates['Delivery_location_longitude'])
+
+    np.testing.assert_allclose(result, distance_apply(coordinates).to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_haversine_np_missing_coordinates():
+    result = haversine_np([12.97, np.nan], [77.59, 77.59], [13.0, 13.0], [np.nan, 77.6])
+
+    assert np.isnan(result).all()
+    assert haversine_np([12.97], [77.59], [13.0], [77.6])[0] == pytest.approx(haversine((12.97, 77.59), (13.0, 77.6)))
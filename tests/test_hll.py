@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.hll import HyperLogLog, approx_nunique_by, hash_values
+
+
+def test_count_close_to_exact():
+    values = pd.Series(np.arange(20_000)).astype(str)
+
+    # erro padrão ~1.6% com p=12: 5% é folga de mais de 3 desvios
+    assert HyperLogLog(12).add(values).count() == pytest.approx(20_000, rel=0.05)
+
+
+def test_small_cardinality_is_exact_enough():
+    assert HyperLogLog(12).add(['a', 'b', 'c', 'a']).count() == 3
+
+
+def test_missing_values_are_ignored():
+    values = pd.Series(['a', np.nan, 'b', None, 'a'])
+
+    assert len(hash_values(values)) == 3
+    assert HyperLogLog(10).add(values).count() == 2
+    assert HyperLogLog(10).add(values.astype('category')).count() == 2
+
+
+def test_category_and_text_hash_alike():
+    values = pd.Series(['x', 'y', 'x'])
+
+    np.testing.assert_array_equal(hash_values(values), hash_values(values.astype('category')))
+
+
+def test_merge_counts_union():
+    left = HyperLogLog(12).add([str(i) for i in range(3000)])
+    right = HyperLogLog(12).add([str(i) for i in range(2000, 5000)])
+
+    assert left.merge(right).count() == pytest.approx(5000, rel=0.05)
+
+
+def test_merge_requires_same_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_invalid_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+
+def test_approx_nunique_by_matches_exact_per_group():
+    rng = np.random.default_rng(0)
+    keys = pd.Series(rng.integers(0, 5, 10_000), name='Week_of_year')
+    values = pd.Series(rng.integers(0, 800, 10_000)).astype(str)
+    values[rng.random(10_000) < 0.05] = np.nan
+
+    result = approx_nunique_by(keys, values)
+    expected = values.groupby(keys).nunique()
+
+    assert result.index.name == 'Week_of_year'
+    np.testing.assert_allclose(result.sort_index().to_numpy(), expected.to_numpy(), rtol=0.05)
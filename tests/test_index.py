@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.index import OrdersIndex, filter_orders
+
+
+@pytest.mark.parametrize('traffic', [['Low', 'Medium', 'High', 'Jam'], ['Low', 'Jam'], ['High'], []])
+def test_orders_index_matches_boolean_filter(orders, traffic):
+    cutoff = pd.Timestamp(2022, 3, 20)
+    expected = orders[(orders['Order_Date'] < cutoff) & orders['Road_traffic_density'].isin(traffic)]
+
+    pd.testing.assert_frame_equal(filter_orders(orders, OrdersIndex(orders), cutoff, traffic), expected)
+
+
+def test_orders_index_all_traffic_is_a_slice(orders):
+    selection = OrdersIndex(orders).select(pd.Timestamp(2022, 3, 1), ['Low', 'Medium', 'High', 'Jam'])
+
+    assert selection == slice(0, int((orders['Order_Date'] < pd.Timestamp(2022, 3, 1)).sum()))
+
+
+def test_orders_index_skips_missing_traffic():
+    df1 = pd.DataFrame({'Order_Date': pd.to_datetime(['2022-03-01', '2022-03-02', '2022-03-03']),
+                        'Road_traffic_density': ['Low', np.nan, 'Low']})
+
+    selection = OrdersIndex(df1).select(pd.Timestamp(2022, 4, 1), ['Low'])
+
+    np.testing.assert_array_equal(selection, [0, 2])
+
+
+def test_orders_index_requires_sorted_dates():
+    df1 = pd.DataFrame({'Order_Date': pd.to_datetime(['2022-03-02', '2022-03-01']), 'Road_traffic_density': 'Low'})
+
+    with pytest.raises(ValueError):
+        OrdersIndex(df1)
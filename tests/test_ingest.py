@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_orders_csv
+from utils import ingest, metrics
+from utils.courier_index import CourierIndex
+from utils.cube import build_cube, filter_cube, rollup
+from utils.loader import default_store, load_courier_cube, load_courier_index, load_cube, load_data
+
+
+def test_ingest_batch_updates_dataset_and_cube(orders_csv, tmp_path):
+    base = load_data(orders_csv)
+    batch_csv = write_orders_csv(str(tmp_path / 'lote.csv'), 500, seed=11)
+    store = default_store(orders_csv)
+
+    rows = ingest.ingest_batch(batch_csv, store)
+
+    assert rows > 0
+    assert ingest.ingest_batch(batch_csv, store) == 0
+    assert sorted(ingest.read_aggregates(store)) == ['couriers', 'cube']
+
+    df1 = load_data(orders_csv)
+    assert len(df1) == len(base) + rows
+    assert df1['Order_Date'].is_monotonic_increasing
+
+    full = build_cube(df1)
+    for by in (['City'], ['Order_Date', 'Road_traffic_density']):
+        pd.testing.assert_frame_equal(rollup(load_cube(orders_csv), by), rollup(full, by),
+                                      check_exact=False, check_categorical=False)
+
+
+def test_courier_and_weekly_stats_after_ingest_match_full_scan(orders_csv, tmp_path):
+    load_courier_cube(orders_csv)
+    batch_csv = write_orders_csv(str(tmp_path / 'lote.csv'), 500, seed=13)
+    store = default_store(orders_csv)
+    ingest.ingest_batch(batch_csv, store)
+
+    df1 = load_data(orders_csv)
+    cutoff, traffic = pd.Timestamp(2022, 3, 20), ['Low', 'Jam']
+    filtered = df1.loc[(df1['Order_Date'] < cutoff) & df1['Road_traffic_density'].isin(traffic)]
+
+    expected = filtered.groupby('Delivery_person_ID', observed=True).agg(
+        orders=('Delivery_person_ID', 'size'),
+        rating_mean=('Delivery_person_Ratings', 'mean'),
+        rating_std=('Delivery_person_Ratings', 'std'),
+        time_mean=('Time_taken(min)', 'mean'),
+    ).sort_index().reset_index()
+    result = metrics.courier_stats(filter_cube(load_courier_cube(orders_csv), cutoff, traffic))
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, check_dtype=False, check_categorical=False)
+
+    weekly = metrics.orders_by_week(filter_cube(load_cube(orders_csv), cutoff, traffic))
+    expected = filtered.groupby('Week_of_year').size().rename('ID').reset_index()
+    pd.testing.assert_frame_equal(weekly, expected, check_dtype=False)
+
+    # store ingerido antes do cubo por entregador: calculado a partir dos lotes guardados
+    couriers = ingest.read_aggregates(store)['couriers']
+    os.remove(os.path.join(store, 'aggregates', 'couriers.parquet'))
+    pd.testing.assert_frame_equal(ingest.read_aggregates(store)['couriers'], couriers,
+                                  check_exact=False, check_dtype=False, check_categorical=False)
+
+
+def test_courier_index_after_ingest_matches_full_build(orders_csv, tmp_path):
+    load_courier_index(orders_csv)
+    batch_csv = write_orders_csv(str(tmp_path / 'lote.csv'), 500, seed=12)
+    ingest.ingest_batch(batch_csv, default_store(orders_csv))
+
+    index = load_courier_index(orders_csv)
+    full = CourierIndex.from_frame(load_data(orders_csv, columns=['Delivery_person_ID']))
+
+    assert index.positions.keys() == full.positions.keys()
+    for courier, positions in full.positions.items():
+        np.testing.assert_array_equal(index.lookup(courier), positions)
+
+
+def test_read_aggregates_without_batches(tmp_path):
+    assert ingest.read_aggregates(str(tmp_path / 'orders_store')) == {}
+    assert ingest.store_signature(str(tmp_path / 'orders_store')) is None
+    assert not os.path.exists(tmp_path / 'orders_store')
@@ -0,0 +1,27 @@
+import pytest
+
+from utils import metrics
+from utils.cube import build_cube
+
+
+@pytest.mark.parametrize('festival', ['Yes', 'No'])
+def test_restaurant_kpis_honor_festival_flag(orders, festival):
+    kpis = metrics.restaurant_kpis(orders, build_cube(orders))
+    times = orders.loc[orders['Festival'] == festival, 'Time_taken(min)']
+
+    # arredondado em 2 casas
+    assert metrics.avg_std_time_delivery(kpis, festival, 'avg_time') == pytest.approx(times.mean(), abs=0.006)
+    assert metrics.avg_std_time_delivery(kpis, festival, 'std_time') == pytest.approx(times.std(), abs=0.006)
+
+
+def test_restaurant_kpis_without_festival_orders(orders):
+    df1 = orders.loc[orders['Festival'] == 'No']
+    kpis = metrics.restaurant_kpis(df1, build_cube(df1))
+
+    assert metrics.avg_std_time_delivery(kpis, 'Yes', 'avg_time') is None
+    assert metrics.avg_std_time_delivery(kpis, 'No', 'avg_time') is not None
+
+    summary = metrics.restaurant_summary(df1, build_cube(df1))
+    assert summary['avg_time_festival_yes'] is None
+    assert summary['delivery_unique'] == df1['Delivery_person_ID'].nunique()
+    assert summary['avg_distance'] == pytest.approx(df1['Distance'].astype('float64').mean(), abs=0.006)
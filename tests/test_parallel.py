@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cube import build_cube, rollup
+from utils.parallel import parallel_aggregates, parallel_cube, partition_positions
+from utils.streaming import StreamAggregates
+
+
+@pytest.mark.parametrize('n_parts', [1, 2, 3, 4, 7])
+def test_date_partition_has_at_most_n_parts(orders, n_parts):
+    parts = partition_positions(orders, n_parts, 'date')
+    dates = orders['Order_Date']
+
+    assert 1 <= len(parts) <= n_parts
+    assert parts[0].start == 0 and parts[-1].stop == len(orders)
+    for part, following in zip(parts[:-1], parts[1:]):
+        # faixas contínuas, sem dividir um dia entre duas partes
+        assert part.stop == following.start
+        assert dates.iloc[part.stop - 1] < dates.iloc[following.start]
+
+
+def test_city_partition_covers_every_row(orders):
+    parts = partition_positions(orders, 2, 'city')
+
+    assert len(parts) == orders['City'].nunique()
+    np.testing.assert_array_equal(np.sort(np.concatenate(parts)), np.arange(len(orders)))
+
+
+@pytest.mark.parametrize('partition', ['date', 'city'])
+def test_parallel_cube_matches_serial(orders, partition):
+    cube = parallel_cube(orders, workers=2, partition=partition)
+
+    for by in (['City'], ['Order_Date', 'Road_traffic_density']):
+        pd.testing.assert_frame_equal(rollup(cube, by), rollup(build_cube(orders), by),
+                                      check_exact=False, check_categorical=False)
+
+
+@pytest.mark.parametrize('partition', ['date', 'city'])
+def test_parallel_aggregates_matches_serial(orders, partition):
+    state = parallel_aggregates(orders, workers=2, partition=partition)
+    serial = StreamAggregates.from_frame(orders)
+
+    assert state.rows == serial.rows
+    assert state.delivery_unique() == serial.delivery_unique()
+    pd.testing.assert_frame_equal(state.rollup(['City']), serial.rollup(['City']),
+                                  check_exact=False, check_categorical=False)
+    for name in ('order_share_by_week', 'courier_ratings', 'city_centers'):
+        pd.testing.assert_frame_equal(getattr(state, name)(), getattr(serial, name)(),
+                                      check_exact=False, check_dtype=False, check_categorical=False)
+
+
+def test_parallel_on_empty_frame(orders):
+    empty = orders.iloc[:0]
+
+    assert partition_positions(empty, 4, 'date') == []
+    assert parallel_aggregates(empty, workers=2).rows == 0
+    assert len(parallel_cube(empty, workers=2)) == 0
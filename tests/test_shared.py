@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from benchmarks.synthetic import write_orders_csv
+from utils import config, ingest, shared, snapshot
+from utils.loader import default_store, load_data
+
+COLUMN_SETS = [('Order_Date', 'City'), ('Order_Date', 'Road_traffic_density', 'Time_taken(min)'), None]
+
+
+def test_concurrent_cold_loads(orders_csv):
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        frames = list(executor.map(lambda i: load_data(orders_csv, COLUMN_SETS[i % 3]), range(15)))
+
+    assert len({len(df1) for df1 in frames}) == 1
+    assert [name for name in os.listdir(os.path.dirname(orders_csv)) if name.endswith('.tmp')] == []
+
+
+def test_open_shared_matches_snapshot(orders_csv):
+    df1 = shared.open_shared(shared.publish(orders_csv), ['Order_Date', 'City', 'Distance'])
+
+    pd.testing.assert_frame_equal(df1, snapshot.read_snapshot(snapshot.build_snapshot(orders_csv),
+                                                              ['Order_Date', 'City', 'Distance']))
+
+
+def test_published_file_includes_ingested_batches(orders_csv, tmp_path, monkeypatch):
+    store = default_store(orders_csv)
+    ingest.ingest_batch(write_orders_csv(str(tmp_path / 'lote.csv'), 400, seed=21), store)
+    columns = ['Order_Date', 'Road_traffic_density', 'Delivery_person_ID', 'Time_taken(min)']
+
+    df1 = load_data(orders_csv, columns)
+
+    assert shared.is_up_to_date(orders_csv, shared.shared_path(orders_csv), store)
+    pd.testing.assert_frame_equal(df1, shared.open_shared(shared.shared_path(orders_csv), columns))
+
+    # mesmo dataset do caminho em memória (snapshot + lotes); outra seleção de colunas para não cair no cache do loader
+    monkeypatch.setattr(config, 'SHARED_DATASET', False)
+    pd.testing.assert_frame_equal(load_data(orders_csv, columns + ['City']).loc[:, columns], df1,
+                                  check_categorical=False)
+
+
+def test_new_batch_republishes(orders_csv, tmp_path):
+    store = default_store(orders_csv)
+    rows = len(load_data(orders_csv, ['Order_Date']))
+
+    added = ingest.ingest_batch(write_orders_csv(str(tmp_path / 'lote.csv'), 300, seed=22), store)
+
+    assert not shared.is_up_to_date(orders_csv, shared.shared_path(orders_csv), store)
+    assert len(load_data(orders_csv, ['Order_Date'])) == rows + added
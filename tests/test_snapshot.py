@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils import snapshot
+from utils.cleaning import clean_code, read_orders
+
+
+def test_concurrent_builds(orders_csv):
+    parquet_path = snapshot.snapshot_path(orders_csv)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        paths = list(executor.map(lambda _: snapshot.build_snapshot(orders_csv), range(6)))
+
+    assert paths == [parquet_path] * 6
+    assert snapshot.is_up_to_date(orders_csv, parquet_path)
+    assert [name for name in os.listdir(os.path.dirname(parquet_path)) if name.endswith('.tmp')] == []
+
+
+def test_snapshot_matches_clean_code(orders_csv):
+    df1 = snapshot.read_snapshot(snapshot.build_snapshot(orders_csv), ['Order_Date', 'City', 'Time_taken(min)'])
+
+    pd.testing.assert_frame_equal(df1, clean_code(read_orders(orders_csv)).loc[:, ['Order_Date', 'City', 'Time_taken(min)']])
+
+
+def test_rebuilds_when_csv_changes(orders_csv):
+    parquet_path = snapshot.build_snapshot(orders_csv)
+    os.utime(orders_csv, ns=(0, 0))
+
+    assert not snapshot.is_up_to_date(orders_csv, parquet_path)
+    snapshot.build_snapshot(orders_csv)
+    assert snapshot.is_up_to_date(orders_csv, parquet_path)
+
+
+def test_write_atomic_cleans_up_on_error(tmp_path):
+    def fail(path):
+        raise RuntimeError('falhou')
+
+    try:
+        snapshot.write_atomic(str(tmp_path / 'x.parquet'), fail)
+    except RuntimeError:
+        pass
+
+    assert os.listdir(tmp_path) == []
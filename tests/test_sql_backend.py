@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from utils import metrics
+from utils.cube import COURIER_KEYS, build_cube, filter_cube, rollup
+from utils.loader import load_data, load_filtered
+from utils.sql_backend import select_orders
+
+CUTOFF = pd.Timestamp(2022, 3, 20)
+
+
+@pytest.mark.parametrize('traffic', [['Low', 'Medium', 'High', 'Jam'], ['High', 'Jam']])
+def test_sql_rollup_matches_cube(orders_csv, traffic):
+    selection = select_orders(orders_csv, CUTOFF, traffic)
+    cube = filter_cube(build_cube(load_data(orders_csv)), CUTOFF, traffic)
+
+    for by in (['City', 'Road_traffic_density'], ['Order_Date'], ['Weatherconditions']):
+        pd.testing.assert_frame_equal(selection.rollup(by), rollup(cube, by),
+                                      check_exact=False, check_dtype=False, check_categorical=False)
+
+
+def test_sql_metrics_match_pandas(orders_csv):
+    traffic = ['Low', 'Medium']
+    selection = select_orders(orders_csv, CUTOFF, traffic)
+    df1 = load_filtered(orders_csv, None, CUTOFF, traffic)
+
+    for metric in (metrics.courier_ratings, metrics.order_share_by_week):
+        pd.testing.assert_frame_equal(metric(selection), metric(df1),
+                                      check_exact=False, check_dtype=False, check_categorical=False)
+
+    cube = filter_cube(build_cube(load_data(orders_csv)), CUTOFF, traffic)
+    couriers = filter_cube(build_cube(load_data(orders_csv), COURIER_KEYS), CUTOFF, traffic)
+    for metric, source in ((metrics.orders_by_week, cube), (metrics.courier_stats, couriers)):
+        pd.testing.assert_frame_equal(metric(selection), metric(source),
+                                      check_exact=False, check_dtype=False, check_categorical=False)
+
+
+def test_sql_empty_selection(orders_csv):
+    result = select_orders(orders_csv, CUTOFF, []).rollup(['City'])
+
+    assert len(result) == 0
+    assert result['orders'].dtype == 'int64'
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils import metrics
+from utils.cube import build_cube, rollup
+from utils.loader import load_data
+from utils.streaming import EXTREMES, StreamAggregates, stream_aggregates
+
+CUTOFF = pd.Timestamp(2022, 3, 20)
+TRAFFIC = ['Low', 'Jam']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_stream_matches_in_memory_metrics(orders_csv):
+    state = stream_aggregates(orders_csv, CUTOFF, TRAFFIC, chunksize=700)
+    df1 = load_data(orders_csv)
+    df1 = df1.loc[(df1['Order_Date'] < CUTOFF) & df1['Road_traffic_density'].isin(TRAFFIC)].reset_index(drop=True)
+
+    assert state.rows == len(df1)
+    assert state.delivery_unique() == df1['Delivery_person_ID'].nunique()
+    for by in (['City'], ['Order_Date', 'Road_traffic_density']):
+        pd.testing.assert_frame_equal(state.rollup(by), rollup(build_cube(df1), by),
+                                      check_exact=False, check_categorical=False)
+    for name in ('order_share_by_week', 'courier_ratings'):
+        pd.testing.assert_frame_equal(getattr(state, name)(), getattr(metrics, name)(df1),
+                                      check_exact=False, check_dtype=False, check_categorical=False)
+
+    extremes = metrics.courier_extremes(df1)
+    for name in EXTREMES:
+        assert state.extreme(name) == extremes[name]
+
+
+def test_empty_state_returns_empty_results(orders_csv):
+    for state in (StreamAggregates(), stream_aggregates(orders_csv, pd.Timestamp(2000, 1, 1), chunksize=700)):
+        assert state.rows == 0
+        assert state.delivery_unique() == 0
+        assert len(state.order_share_by_week()) == 0
+        assert len(state.courier_ratings()) == 0
+        assert len(state.city_centers()) == 0
+        assert len(state.rollup(['City'])) == 0
+        assert all(np.isnan(state.extreme(name)) for name in EXTREMES)
+
+    # um estado vazio mesclado com outro devolve o outro
+    state = StreamAggregates().merge(stream_aggregates(orders_csv, CUTOFF, TRAFFIC))
+    assert state.rows > 0
+
+
+def test_cli_with_filters_leaving_no_rows(orders_csv):
+    result = subprocess.run([sys.executable, '-m', 'utils.streaming', orders_csv, '--until', '2000-01-01'],
+                            cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith('0 pedidos')
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from utils.topk import top_k_per_group
+
+
+def _expected(df, k, ascending):
+    return (df.dropna(subset=['time'])
+              .sort_values(['city', 'time'], ascending=[True, ascending], kind='stable')
+              .groupby('city').head(k))
+
+
+def test_top_k_matches_sort_and_head():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'city': rng.choice(['Urban', 'Metropolitian', 'Semi-Urban'], 500),
+                       'time': rng.permutation(500).astype('float64')})
+
+    for ascending in (True, False):
+        result = top_k_per_group(df, 'city', 'time', 7, ascending=ascending)
+        pd.testing.assert_frame_equal(result, _expected(df, 7, ascending))
+
+
+def test_small_groups_and_categories():
+    df = pd.DataFrame({'city': pd.Categorical(['b', 'a', 'b', 'a', 'a'], categories=['a', 'b', 'c']),
+                       'time': np.array([5, 3, 1, 4, 2], dtype='int16')})
+
+    result = top_k_per_group(df, 'city', 'time', 2, ascending=False)
+
+    assert result['city'].tolist() == ['a', 'a', 'b', 'b']
+    assert result['time'].tolist() == [4, 3, 5, 1]
+
+
+def test_missing_values_go_last():
+    df = pd.DataFrame({'city': ['a'] * 4, 'time': [np.nan, 3.0, 1.0, 2.0]})
+
+    assert top_k_per_group(df, 'city', 'time', 3)['time'].tolist() == [1.0, 2.0, 3.0]
+    assert top_k_per_group(df, 'city', 'time', 3, ascending=False)['time'].tolist() == [3.0, 2.0, 1.0]
+
+
+def test_empty_frame():
+    df = pd.DataFrame({'city': pd.Series([], dtype='object'), 'time': pd.Series([], dtype='float64')})
+
+    assert len(top_k_per_group(df, 'city', 'time', 3)) == 0
@@ -0,0 +1 @@
+"""Funções compartilhadas entre as páginas do Growth Dashboard da Cury Company."""
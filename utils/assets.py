@@ -0,0 +1,34 @@
+"""
+Arquivos estáticos das páginas (logo), carregados uma vez por processo
+
+O Streamlit reexecuta o script da página a cada interação; sem cache o
+logo.png seria aberto e decodificado pelo PIL em todo rerun, de todas as
+sessões. A imagem fica em cache pela assinatura do arquivo, então trocar o
+logo no disco continua valendo sem reiniciar o servidor.
+"""
+import os
+from functools import lru_cache
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+@lru_cache(maxsize=8)
+def _load_image(path, size, mtime_ns):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        # load() decodifica agora, para que o arquivo possa ser fechado
+        image.load()
+        return image.copy()
+
+
+def load_logo(path='logo.png'):
+    """
+    Devolve o logo decodificado (PIL.Image), compartilhado entre reruns e sessões
+
+    Input: caminho da imagem
+    Output: PIL.Image (não alterar in place)
+    """
+    stat = os.stat(path)
+    return _load_image(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
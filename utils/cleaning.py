@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+
+from utils.geo import haversine_np
+from utils.profiling import profiled
+
+
+# Tipos das colunas declarados já na leitura do csv
+RAW_DTYPES = {
+    'ID': 'object',
+    'Delivery_person_ID': 'object',
+    'Delivery_person_Age': 'float64',
+    'Delivery_person_Ratings': 'float64',
+    'Restaurant_latitude': 'float64',
+    'Restaurant_longitude': 'float64',
+    'Delivery_location_latitude': 'float64',
+    'Delivery_location_longitude': 'float64',
+    'Order_Date': 'object',
+    'Time_Orderd': 'object',
+    'Time_Order_picked': 'object',
+    'Weatherconditions': 'object',
+    'Road_traffic_density': 'object',
+    'Vehicle_condition': 'int64',
+    'Type_of_order': 'object',
+    'Type_of_vehicle': 'object',
+    'multiple_deliveries': 'float64',
+    'Festival': 'object',
+    'City': 'object',
+    'Time_taken(min)': 'object',
+}
+
+# O dataset marca os valores vazios com o texto 'NaN ' (com espaço)
+NA_VALUES = ['NaN ']
+
+# Linhas com qualquer uma destas colunas vazia são descartadas
+REQUIRED_COLUMNS = ['Delivery_person_Age', 'Road_traffic_density', 'City', 'Festival', 'multiple_deliveries']
+
+# Colunas de texto que vêm com espaço sobrando no final
+TEXT_COLUMNS = ['ID', 'Delivery_person_ID', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle', 'City', 'Festival']
+
+
+# Representação compacta do dataset limpo (menos memória por sessão do Streamlit)
+CATEGORY_COLUMNS = ['City', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle', 'Festival',
+                    'Weatherconditions', 'Delivery_person_ID', 'Time_Orderd', 'Time_Order_picked']
+
+INT_DTYPES = {
+    'Delivery_person_Age': 'int8',
+    'multiple_deliveries': 'int8',
+    'Vehicle_condition': 'int8',
+    'Time_taken(min)': 'int16',
+}
+
+# Colunas de período derivadas da data/hora do pedido (inteiros compactos, calculados uma vez no clean_code)
+TIME_BUCKETS = {
+    'Day_of_year': 'int16',
+    'Week_of_year': 'int8',     # semana do ano começando no domingo, igual ao strftime('%U')
+    'ISO_week': 'int8',
+    'Month': 'int8',
+    'Order_hour': 'Int8',       # hora do Time_Orderd (vazio quando o horário não existe)
+}
+
+FLOAT32_COLUMNS = ['Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude',
+                   'Distance']
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+@profiled()
+def read_orders(path, **kwargs):
+    """
+    Lê o csv de pedidos já com os tipos das colunas e os valores vazios ('NaN ') declarados
+    
+    Input: caminho (ou buffer) do csv + argumentos extras do pd.read_csv
+    Output: Dataframe bruto, pronto para o clean_code
+    """
+    return pd.read_csv(path, dtype=RAW_DTYPES, na_values=NA_VALUES, **kwargs)
+
+
+def _map_unique(col, func):
+    """
+    Aplica `func` apenas nos valores distintos da coluna e espalha o resultado
+    
+    Para colunas com poucos valores distintos (cidade, tráfego, tempo...) isso
+    troca milhões de operações de texto por algumas dezenas. Os valores vazios
+    continuam vazios.
+    """
+    codes, uniques = pd.factorize(col)
+    missing = codes < 0
+    if missing.all():
+        return col.copy()
+    # o factorize marca os vazios com o código -1: sem a máscara o take devolveria o último valor distinto
+    mapped = pd.Series(func(pd.Index(uniques)).take(np.where(missing, 0, codes)), index=col.index)
+    return mapped.where(~missing) if missing.any() else mapped
+
+
+@profiled()
+def clean_code(df1):
+    """  Esta função tem a responsabilidade de limpar o dataframe lido pelo read_orders
+    
+    Tipos de limpeza: 
+    1. Remoção dos dados NaN (uma única máscara para todas as colunas obrigatórias)
+    2. Mudança do tipo da coluna de dados (categorias e inteiros/floats compactos)
+    3. Remoção dos espaços das variáveis de texto (aplicada só nos valores distintos)
+    4. Formatação da coluna de datas
+    5. Limpeza da coluna de tempo (extração vetorizada do número)
+    6. Cálculo da distância restaurante -> entrega (coluna Distance, em km)
+    7. Ordenação das linhas por Order_Date
+    8. Colunas de período (Day_of_year, Week_of_year, ISO_week, Month e Order_hour)
+    
+    Input: Dataframe
+    Output: Dataframe       
+    
+    """
+    # Excluir as linhas com idade, tráfego, cidade, festival ou multiple_deliveries vazios
+    linhas_completas = np.logical_and.reduce([df1[col].notna().to_numpy() for col in REQUIRED_COLUMNS])
+    df1 = df1.loc[linhas_completas, :].copy()
+
+    # Remover spaco das strings (o ID é único por linha, então não compensa o factorize)
+    df1['ID'] = df1['ID'].str.strip()
+    for col in TEXT_COLUMNS[1:]:
+        df1[col] = _map_unique(df1[col], lambda valores: valores.str.strip())
+
+    # Limpando a coluna de time_taken (min): '(min) 24' -> 24
+    df1['Time_taken(min)'] = _map_unique(df1['Time_taken(min)'],
+                                         lambda valores: valores.str.extract(r'(\d+)$', expand=False).astype(int))
+
+    # Conversao de texto para data
+    df1['Order_Date'] = pd.to_datetime( df1['Order_Date'], format='%d-%m-%Y' )
+
+    # Distancia entre o restaurante e o local de entrega, calculada uma única vez
+    df1['Distance'] = haversine_np(df1['Restaurant_latitude'], df1['Restaurant_longitude'],
+                                   df1['Delivery_location_latitude'], df1['Delivery_location_longitude'])
+
+    # Ordenar por data: o filtro de data vira uma busca binária (ver utils/index.py)
+    df1 = df1.sort_values('Order_Date', kind='stable', ignore_index=True)
+
+    # Conversao para categorias e numeros menores (a leitura trouxe float por causa dos NaN)
+    df1 = to_compact_dtypes(df1)
+
+    # Dia, semana, mês e hora do pedido como inteiros (ver add_time_buckets; o Time_Orderd já é categórico aqui)
+    return add_time_buckets(df1)
+
+
+def time_buckets(dates):
+    """
+    Colunas de período de um conjunto de datas
+
+    Week_of_year segue o %U: (dia do ano - 1 + 7 - dia da semana com domingo = 0) // 7,
+    então os dias antes do primeiro domingo do ano ficam na semana 0.
+
+    Input: datas (Series, Index ou array datetime64)
+    Output: Dataframe com Day_of_year, Week_of_year, ISO_week e Month
+    """
+    dates = pd.DatetimeIndex(dates)
+    day_of_year = dates.dayofyear.to_numpy()
+    sunday_first = (dates.dayofweek.to_numpy() + 1) % 7
+
+    return pd.DataFrame({
+        'Day_of_year': day_of_year,
+        'Week_of_year': (day_of_year - 1 + 7 - sunday_first) // 7,
+        'ISO_week': dates.isocalendar().week.to_numpy(),
+        'Month': dates.month.to_numpy(),
+    }).astype({col: dtype for col, dtype in TIME_BUCKETS.items() if col != 'Order_hour'})
+
+
+def order_hours(times):
+    """
+    Hora do pedido a partir do texto do Time_Orderd ('HH:MM:SS'); vazio quando não dá para ler
+
+    O texto é convertido só nos valores distintos (poucas centenas de horários).
+    """
+    times = pd.Series(times)
+    if isinstance(times.dtype, pd.CategoricalDtype):
+        codes, uniques = times.cat.codes.to_numpy(), times.cat.categories.to_numpy()
+    else:
+        codes, uniques = pd.factorize(times)
+    hours = pd.to_datetime(pd.Series(uniques, dtype='object'), format='%H:%M:%S', errors='coerce').dt.hour
+    # o código -1 (valor vazio) pega o último item: um NaN extra no final
+    hours = np.append(hours.to_numpy(dtype='float64'), np.nan)
+    return pd.Series(hours[codes]).astype('Int8').array
+
+
+def add_time_buckets(df1):
+    """
+    Acrescenta as colunas de período (TIME_BUCKETS) que ainda não existem no dataset
+
+    As datas têm poucos valores distintos: os períodos são calculados uma vez
+    por data e espalhados pelas linhas. A hora só é calculada se houver Time_Orderd.
+
+    Input: Dataframe com Order_Date (e opcionalmente Time_Orderd)
+    Output: o mesmo Dataframe com as colunas novas
+    """
+    missing = [col for col in TIME_BUCKETS if col not in df1.columns and col != 'Order_hour']
+    if missing:
+        codes, uniques = pd.factorize(df1['Order_Date'])
+        buckets = time_buckets(uniques)
+        for col in missing:
+            df1[col] = buckets[col].to_numpy()[codes]
+
+    if 'Order_hour' not in df1.columns and 'Time_Orderd' in df1.columns:
+        df1['Order_hour'] = order_hours(df1['Time_Orderd'])
+
+    return df1
+
+
+def period_column(df1, bucket):
+    """
+    Coluna de período `bucket` do dataset (ver TIME_BUCKETS)
+
+    Usa a coluna pré-calculada no clean_code; se ela não foi lida (colunas
+    selecionadas sem ela), calcula a partir do Order_Date / Time_Orderd.
+    """
+    if bucket in df1.columns:
+        return df1[bucket]
+    source = df1.loc[:, [col for col in ['Order_Date', 'Time_Orderd'] if col in df1.columns]]
+    return add_time_buckets(source)[bucket]
+
+
+def to_compact_dtypes(df1):
+    """
+    Converte o dataset limpo para a representação compacta
+    
+    1. Textos de baixa cardinalidade -> category (categorias em ordem alfabética)
+    2. Inteiros -> int8/int16
+    3. Coordenadas -> float32
+    
+    Também serve para reaplicar os tipos depois de um pd.concat (categorias
+    diferentes entre os pedaços voltam como object).
+    
+    Input: Dataframe limpo
+    Output: o mesmo Dataframe, com os tipos compactos
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df1.columns:
+            df1[col] = df1[col].astype('category')
+    sort_categories(df1, CATEGORY_COLUMNS)
+
+    for col, dtype in INT_DTYPES.items():
+        if col in df1.columns:
+            df1[col] = df1[col].astype(dtype)
+
+    for col, dtype in TIME_BUCKETS.items():
+        if col in df1.columns:
+            df1[col] = df1[col].astype(dtype)
+
+    for col in FLOAT32_COLUMNS:
+        if col in df1.columns:
+            df1[col] = df1[col].astype('float32')
+
+    return df1
+
+
+def sort_categories(df1, cols):
+    """
+    Deixa as categorias das colunas `cols` em ordem alfabética (in place)
+
+    Agrupamentos com sort=False e arquivos gravados (parquet/arrow) podem trazer
+    as categorias na ordem em que apareceram nos dados; os groupby seguintes
+    ordenam pelos códigos, então a ordem dos resultados passaria a depender dos dados.
+
+    Input: Dataframe e colunas
+    Output: o mesmo Dataframe
+    """
+    for col in cols:
+        if col in df1.columns and isinstance(df1[col].dtype, pd.CategoricalDtype):
+            categories = df1[col].cat.categories
+            if not categories.is_monotonic_increasing:
+                df1[col] = df1[col].cat.reorder_categories(categories.sort_values())
+    return df1
+
+
+def drop_unused_categories(df1, cols):
+    """
+    Remove as categorias sem linhas das colunas `cols` (in place)
+
+    Resultados de agrupamentos guardam todas as categorias do dataset; com os
+    filtros selecionando poucas (ou nenhuma) linhas, o Plotly tentaria desenhar
+    as categorias que não aparecem no resultado.
+
+    Input: Dataframe e colunas
+    Output: o mesmo Dataframe
+    """
+    for col in cols:
+        if col in df1.columns and isinstance(df1[col].dtype, pd.CategoricalDtype):
+            df1[col] = df1[col].cat.remove_unused_categories()
+    return df1
@@ -0,0 +1,34 @@
+"""
+Configurações do dashboard, lidas de variáveis de ambiente
+
+CURRY_DISTINCT_MODE    'exact' (padrão) ou 'hll': contagem de entregadores distintos
+                       exata ou aproximada por HyperLogLog (utils/hll.py)
+CURRY_HLL_PRECISION    precisão p do HyperLogLog (4 a 18, padrão 12): 2^p registradores,
+                       erro padrão de ~1.04 / sqrt(2^p) (~1.6% com p=12)
+CURRY_WORKERS          processos usados na agregação paralela (utils/parallel.py);
+                       0 (padrão) = um por núcleo, 1 = sem processos extras; o cubo dos
+                       lotes ingeridos (utils/ingest.py) só usa processos com um valor > 1.
+                       As páginas nunca abrem processos (o fork a partir das threads das
+                       sessões do Streamlit pode travar)
+CURRY_PARTITION        como o dataset é dividido entre os processos: 'date' (padrão,
+                       faixas de datas) ou 'city'
+CURRY_PROFILE_DIR      se definido, cada etapa de primeiro nível das páginas é executada
+                       sob o cProfile e salva neste diretório (.prof + timings.jsonl),
+                       ver utils/profiling.py
+CURRY_SHARED_DATASET   '1' (padrão) lê o dataset limpo de um arquivo Arrow mapeado em memória,
+                       compartilhado entre sessões e processos (utils/shared.py); '0' lê o
+                       snapshot Parquet para a memória de cada processo
+CURRY_BACKEND          'pandas' (padrão) ou 'sqlite': com 'sqlite', os filtros e os agrupamentos
+                       do cubo, de pedidos por semana e das avaliações rodam em SQL em um
+                       banco ao lado do csv (utils/sql_backend.py)
+"""
+import os
+
+
+DISTINCT_MODE = os.environ.get('CURRY_DISTINCT_MODE', 'exact')
+HLL_PRECISION = int(os.environ.get('CURRY_HLL_PRECISION', 12))
+WORKERS = int(os.environ.get('CURRY_WORKERS', 0))
+PARTITION = os.environ.get('CURRY_PARTITION', 'date')
+PROFILE_DIR = os.environ.get('CURRY_PROFILE_DIR')
+SHARED_DATASET = os.environ.get('CURRY_SHARED_DATASET', '1') == '1'
+BACKEND = os.environ.get('CURRY_BACKEND', 'pandas')
@@ -0,0 +1,122 @@
+"""
+Índice de linhas por entregador (Delivery_person_ID -> posições no dataset)
+
+Para ver o histórico completo de um entregador sem varrer o dataset, o
+índice guarda, para cada Delivery_person_ID, as posições (em ordem crescente,
+ou seja, em ordem de data) das suas linhas no dataset limpo. A consulta de um
+entregador com k pedidos custa O(k): um acesso ao dicionário e um take das
+k linhas.
+
+O índice do histórico é montado uma vez por versão do csv; quando um lote é
+ingerido (utils/ingest.py) e as linhas novas ficam no fim do dataset, só as
+linhas do lote são indexadas e somadas ao índice existente (ver
+loader.load_courier_index).
+"""
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+
+# Colunas do histórico mostrado no detalhe do entregador
+HISTORY_COLUMNS = ['Order_Date', 'City', 'Road_traffic_density', 'Weatherconditions', 'Type_of_order', 'Type_of_vehicle',
+                   'Vehicle_condition', 'Festival', 'Delivery_person_Ratings', 'Time_taken(min)', 'Distance']
+
+
+class CourierIndex:
+    """
+    Posições das linhas de cada entregador
+
+    Input: dicionário Delivery_person_ID -> array ordenado de posições e número total de linhas indexadas
+    """
+
+    def __init__(self, positions, rows):
+        self.positions = positions
+        self.rows = rows
+        self._ids = None
+
+    @classmethod
+    def from_frame(cls, df1, offset=0):
+        """
+        Monta o índice a partir da coluna Delivery_person_ID
+
+        Input: Dataframe (na mesma ordem de linhas do dataset) e posição da primeira linha no dataset
+        Output: CourierIndex
+        """
+        col = df1['Delivery_person_ID'].astype('category')
+        codes = col.cat.codes.to_numpy()
+        # argsort estável: dentro de cada entregador as posições continuam em ordem crescente
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(col.cat.categories) + 1))
+        order = order + offset
+        positions = {courier: order[bounds[i]:bounds[i + 1]]
+                     for i, courier in enumerate(col.cat.categories) if bounds[i + 1] > bounds[i]}
+        return cls(positions, offset + len(df1))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, courier_id):
+        return courier_id in self.positions
+
+    def extend(self, other):
+        """
+        Índice com as linhas de `other` somadas (linhas novas depois das já indexadas)
+
+        Só os entregadores presentes em `other` têm as posições refeitas; este índice não é alterado.
+        """
+        positions = dict(self.positions)
+        for courier, new in other.positions.items():
+            old = positions.get(courier)
+            positions[courier] = new if old is None else np.concatenate([old, new])
+        return CourierIndex(positions, other.rows)
+
+    def lookup(self, courier_id):
+        """ Posições das linhas do entregador (array vazio se não existir) """
+        return self.positions.get(courier_id, np.empty(0, dtype='int64'))
+
+    def suggest(self, text, k=10):
+        """ Até k IDs que contêm `text` (sem diferenciar maiúsculas), para quando o ID digitado não existe """
+        if self._ids is None:
+            self._ids = pd.Series(list(self.positions), dtype='object')
+        text = text.strip().lower()
+        if not text:
+            return []
+        return self._ids[self._ids.str.lower().str.contains(text, regex=False)].head(k).tolist()
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+@profiled()
+def courier_history(df1, index, courier_id):
+    """
+    Histórico completo de um entregador, em ordem de data
+
+    Input: Dataframe limpo (mesma ordem de linhas usada no índice), CourierIndex e Delivery_person_ID
+    Output: Dataframe com as linhas do entregador
+    """
+    return df1.take(index.lookup(courier_id))
+
+
+@profiled()
+def courier_profile(history):
+    """
+    Resumo do histórico de um entregador
+
+    Output: dicionário com orders, first_order, last_order, rating_mean, rating_std,
+            time_mean, time_std, e as contagens de pedidos por cidade e por tipo de veículo
+    """
+    ratings = history['Delivery_person_Ratings'].astype('float64')
+    times = history['Time_taken(min)'].astype('float64')
+    return {
+        'orders': len(history),
+        'first_order': history['Order_Date'].min(),
+        'last_order': history['Order_Date'].max(),
+        'rating_mean': ratings.mean(),
+        'rating_std': ratings.std(),
+        'time_mean': times.mean(),
+        'time_std': times.std(),
+        'cities': history['City'].value_counts(sort=True).loc[lambda counts: counts > 0],
+        'vehicles': history['Type_of_vehicle'].value_counts(sort=True).loc[lambda counts: counts > 0],
+    }
@@ -0,0 +1,145 @@
+"""
+Tabela de entregadores paginada no servidor
+
+Com centenas de milhares de entregadores, mandar a tabela inteira para o
+navegador (st.dataframe) a cada rerun pesa mais que calcular as métricas.
+Aqui os indicadores por entregador (metrics.courier_stats) saem do cubo por
+entregador (loader.load_courier_cube, atualizado a cada lote ingerido sem
+varrer o histórico), uma vez por estado dos filtros, e são guardados em um
+CourierTable, com as ordenações de cada coluna e os IDs em minúsculas já
+prontos. Cada rerun só busca,
+ordena (reaproveitando a ordenação pronta) e corta a página visível: apenas
+essas linhas são serializadas.
+"""
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils import metrics
+from utils.cube import filter_cube
+from utils.loader import dataset_version, load_courier_cube
+from utils.profiling import profiled
+from utils.sql_backend import pushdown
+
+
+SORT_COLUMNS = ['Delivery_person_ID', 'orders', 'rating_mean', 'rating_std', 'time_mean']
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Buscas recentes guardadas por tabela (a mesma busca se repete a cada troca de página)
+MAX_SEARCHES = 32
+
+
+class CourierTable:
+    """
+    Indicadores por entregador + índices para paginar, ordenar e buscar sem refazer o agrupamento
+
+    Compartilhado entre sessões (threads): os índices montados sob demanda ficam atrás de um lock.
+
+    Input: Dataframe do metrics.courier_stats
+    """
+
+    def __init__(self, stats):
+        self.frame = stats.reset_index(drop=True)
+        self.frame['Delivery_person_ID'] = self.frame['Delivery_person_ID'].astype(str)
+        self._ids = self.frame['Delivery_person_ID'].str.lower()
+        self._orders = {}
+        self._searches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def order(self, sort_by, ascending=True):
+        """ Posições das linhas ordenadas por `sort_by` (vazios no fim), calculadas uma vez por coluna e sentido """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f'ordenação deve ser uma de {SORT_COLUMNS}')
+        key = (sort_by, ascending)
+        with self._lock:
+            if key not in self._orders:
+                values = self.frame[sort_by].sort_values(ascending=ascending, kind='stable', na_position='last')
+                self._orders[key] = values.index.to_numpy()
+            return self._orders[key]
+
+    def matches(self, search):
+        """ Máscara das linhas cujo Delivery_person_ID contém `search` (sem diferenciar maiúsculas) """
+        search = search.strip().lower()
+        with self._lock:
+            if search not in self._searches:
+                self._searches[search] = self._ids.str.contains(search, regex=False).to_numpy()
+                if len(self._searches) > MAX_SEARCHES:
+                    self._searches.popitem(last=False)
+            self._searches.move_to_end(search)
+            return self._searches[search]
+
+    def positions(self, sort_by='Delivery_person_ID', ascending=True, search=''):
+        """
+        Posições das linhas encontradas, já na ordem pedida
+
+        1. Pega a ordenação pronta da coluna
+        2. Se houver busca, mantém só as posições que batem com ela (a ordem é preservada)
+        """
+        positions = self.order(sort_by, ascending)
+        if search.strip():
+            positions = positions[self.matches(search)[positions]]
+        return positions
+
+    def page(self, page=0, page_size=PAGE_SIZES[0], sort_by='Delivery_person_ID', ascending=True, search=''):
+        """
+        Uma página da tabela
+
+        Input: número da página (a partir de 0), linhas por página, coluna e sentido da ordenação e texto da busca
+        Output: Dataframe da página e total de linhas encontradas
+        """
+        positions = self.positions(sort_by, ascending, search)
+        start = page * page_size
+        return self.frame.iloc[positions[start:start + page_size]], len(positions)
+
+
+@lru_cache(maxsize=16)
+def _courier_table(path, version, date_cutoff, traffic_options):
+    source = pushdown(path, date_cutoff, traffic_options) or filter_cube(load_courier_cube(path), date_cutoff, list(traffic_options))
+    return CourierTable(metrics.courier_stats(source))
+
+
+@profiled()
+def courier_table(path, date_cutoff, traffic_options):
+    """
+    CourierTable dos filtros da barra lateral, compartilhado entre sessões e reruns
+
+    Input: caminho do csv, data limite e tráfegos selecionados
+    Output: CourierTable (não alterar in place)
+    """
+    return _courier_table(path, dataset_version(path), pd.Timestamp(date_cutoff), tuple(sorted(traffic_options)))
+
+
+def courier_table_view(table, key):
+    """
+    Controles (busca, ordenação, tamanho e número da página) e a página visível da tabela
+
+    Os valores dos controles ficam no session_state pela `key`.
+
+    Input: CourierTable e prefixo das chaves dos controles
+    """
+    import streamlit as st
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    search = col1.text_input('Buscar entregador', key=f'{key}_search')
+    sort_by = col2.selectbox('Ordenar por', SORT_COLUMNS, key=f'{key}_sort')
+    ascending = col3.checkbox('Crescente', value=True, key=f'{key}_asc')
+
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox('Linhas por página', PAGE_SIZES, key=f'{key}_size')
+    n_pages = max(int(np.ceil(len(table.positions(sort_by, ascending, search)) / page_size)), 1)
+    # uma busca nova pode deixar menos páginas que a página guardada: volta para a primeira
+    if st.session_state.get(f'{key}_page', 1) > n_pages:
+        st.session_state[f'{key}_page'] = 1
+    page = col2.number_input(f'Página (de {n_pages})', min_value=1, max_value=n_pages, step=1, key=f'{key}_page')
+
+    start = (int(page) - 1) * page_size
+    df_aux, total = table.page(int(page) - 1, page_size, sort_by, ascending, search)
+    st.dataframe(df_aux.reset_index(drop=True), use_container_width=True)
+    st.caption(f'{min(start + 1, total):,}–{start + len(df_aux):,} de {total:,} entregadores')
@@ -0,0 +1,114 @@
+"""
+Cubo pré-agregado das entregas
+
+Em vez de varrer as linhas do dataset a cada rerun, as métricas dos filtros
+da barra lateral (data e tráfego) são respondidas a partir de um cubo com
+uma linha por combinação das dimensões abaixo, guardando contagem, soma e
+soma dos quadrados de cada medida. Média e desvio padrão de qualquer
+agrupamento dessas dimensões saem dessas somas.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cleaning import drop_unused_categories, sort_categories
+from utils.profiling import profiled
+
+
+CUBE_KEYS = ['Order_Date', 'Road_traffic_density', 'City', 'Festival', 'Type_of_order', 'Weatherconditions', 'Type_of_vehicle']
+
+# Cubo por entregador (mesmas somas): base da tabela de entregadores, com as dimensões dos filtros
+COURIER_KEYS = ['Order_Date', 'Road_traffic_density', 'Delivery_person_ID']
+
+# nome da medida no cubo -> coluna do dataset
+MEASURES = {
+    'time': 'Time_taken(min)',
+    'rating': 'Delivery_person_Ratings',
+    'distance': 'Distance',
+}
+
+CUBE_COLUMNS = CUBE_KEYS + list(MEASURES.values())
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+@profiled()
+def build_cube(df1, keys=CUBE_KEYS):
+    """
+    Agrega o dataset limpo no cubo
+    
+    1. Para cada medida cria as colunas _count (valores não vazios), _sum e _sumsq
+    2. Soma tudo por combinação das `keys` (orders = número de pedidos)
+    
+    Input: Dataframe limpo (precisa das `keys` e das colunas das MEASURES) e dimensões do cubo
+    Output: Dataframe do cubo (uma linha por combinação observada)
+    """
+    df_aux = df1.loc[:, keys].copy()
+    df_aux['orders'] = 1
+
+    for name, col in MEASURES.items():
+        # float64 antes de elevar ao quadrado: as colunas compactas (int16/float32) estourariam ou perderiam precisão
+        values = df1[col].astype('float64')
+        df_aux[f'{name}_count'] = values.notna().astype('int64')
+        df_aux[f'{name}_sum'] = values
+        df_aux[f'{name}_sumsq'] = values * values
+
+    # o sort=False deixa as categorias na ordem de aparição: volta para a ordem alfabética
+    return sort_categories(df_aux.groupby(keys, observed=True, sort=False).sum().reset_index(), keys)
+
+
+@profiled()
+def filter_cube(cube, date_cutoff, traffic_options):
+    """
+    Aplica os filtros da barra lateral no cubo (pedidos antes de date_cutoff e tráfego selecionado)
+    
+    Input: cubo, data limite e lista de condições de trânsito
+    Output: cubo filtrado
+    """
+    linhas_selecionadas = (cube['Order_Date'] < date_cutoff) & cube['Road_traffic_density'].isin(traffic_options)
+    return cube.loc[linhas_selecionadas, :]
+
+
+def rollup(cube, by):
+    """
+    Agrupa o cubo pelas dimensões `by` e calcula as métricas de cada medida
+    
+    Output: Dataframe ordenado por `by`, com as colunas de `by`, orders e, para cada medida,
+            {medida}_mean e {medida}_std (desvio padrão amostral, igual ao pandas)
+    """
+    # com observed=True o pandas devolve os grupos na ordem de aparição: o sort_index volta para a ordem das chaves
+    sums = cube.groupby(by, observed=True).sum(numeric_only=True).sort_index()
+
+    df_aux = sums[['orders']].copy()
+    for name in MEASURES:
+        n = sums[f'{name}_count']
+        total = sums[f'{name}_sum']
+        var = (sums[f'{name}_sumsq'] - total * total / n) / (n - 1)
+
+        df_aux[f'{name}_mean'] = total / n
+        # o clip evita raiz de números levemente negativos por arredondamento; n <= 1 não tem desvio
+        df_aux[f'{name}_std'] = np.sqrt(var.clip(lower=0)).where(n > 1)
+
+    # só as categorias presentes no resultado (sem pedidos nos filtros, nenhuma)
+    return drop_unused_categories(df_aux.reset_index(), by)
+
+
+def merge_sums(frames, keys):
+    """
+    Junta tabelas de somas (cubos ou outros agregados aditivos) somando as linhas com as mesmas chaves
+    
+    Input: lista de Dataframes com as colunas `keys` + colunas numéricas somáveis
+    Output: Dataframe com uma linha por combinação de chaves
+    """
+    frames = [frame for frame in frames if frame is not None]
+    df_aux = pd.concat(frames, ignore_index=True)
+    # categorias diferentes entre as partes voltam como object no concat
+    for col in keys:
+        if df_aux[col].dtype == object:
+            df_aux[col] = df_aux[col].astype('category')
+    return sort_categories(df_aux.groupby(keys, observed=True, sort=False).sum().reset_index(), keys)
+
+
+def merge_cubes(*cubes):
+    """ Soma cubos montados a partir de partes diferentes do dataset (ex.: histórico + lotes novos) """
+    return merge_sums(cubes, CUBE_KEYS)
@@ -0,0 +1,142 @@
+"""
+Cache de figuras (Plotly e Folium) compartilhado entre sessões
+
+As figuras são guardadas já serializadas (JSON do Plotly / HTML do Folium),
+com a chave (função, versão do dataset, data limite, tráfegos selecionados e
+argumentos simples da chamada, como fig=True).
+Trocar de aba ou abrir a mesma página com os mesmos filtros reaproveita a
+figura pronta em vez de refazer os agrupamentos e a serialização.
+
+O cache é um LRU limitado tanto em número de figuras quanto em bytes.
+"""
+import inspect
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.loader import dataset_version
+from utils.profiling import timed
+
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 ** 2
+
+
+class FigureCache:
+    """
+    LRU de figuras serializadas (str), limitado por número de itens e por tamanho total
+    
+    Seguro para uso entre sessões: o Streamlit roda cada sessão em uma thread.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is not None:
+                self._items.move_to_end(key)
+            return payload
+
+    def put(self, key, payload):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= len(self._items.pop(key))
+
+            self._items[key] = payload
+            self.nbytes += size
+
+            # remove as figuras usadas há mais tempo até caber nos limites
+            while len(self._items) > self.max_entries or self.nbytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.nbytes -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+_cache = FigureCache()
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def filter_key(path, date_cutoff, traffic_options):
+    """
+    Chave do estado dos filtros: versão do dataset + data limite + tráfegos (a ordem da seleção não importa)
+    """
+    return (dataset_version(path), pd.Timestamp(date_cutoff).isoformat(), tuple(sorted(traffic_options)))
+
+
+def _func_key(func):
+    # funções das páginas vivem no __main__ do Streamlit, então o arquivo entra na chave
+    # (unwrap: o arquivo da função original, não o do decorator @profiled)
+    func = inspect.unwrap(func)
+    return (func.__code__.co_filename, func.__qualname__)
+
+
+# Argumentos que entram na chave do cache; os demais (df1, cubo, SqlSelection) são descritos pela chave dos filtros
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _args_key(args, kwargs):
+    """ Argumentos simples da chamada (ex.: fig=True, map_mode) que mudam a figura """
+    return (tuple(arg for arg in args if isinstance(arg, _SCALAR_TYPES)),
+            tuple(sorted((name, value) for name, value in kwargs.items() if isinstance(value, _SCALAR_TYPES))))
+
+
+def _cached(func, key, serialize, args, kwargs):
+    cache_key = _func_key(func) + tuple(key) + _args_key(args, kwargs)
+    payload = _cache.get(cache_key)
+    if payload is None:
+        result = func(*args, **kwargs)
+        with timed('figure_cache.serialize'):
+            payload = serialize(result)
+        _cache.put(cache_key, payload)
+    return payload
+
+
+def cached_plotly(func, key, *args, **kwargs):
+    """
+    Devolve a figura Plotly de func(*args, **kwargs), reaproveitando o JSON em cache
+    
+    Os argumentos simples (textos, números, booleanos) entram na chave junto com a dos filtros.
+
+    Input: função que gera a figura, chave dos filtros (ver filter_key) e argumentos da função
+    Output: figura Plotly
+    """
+    import plotly.io as pio
+
+    payload = _cached(func, key, lambda fig: fig.to_json(), args, kwargs)
+    with timed('figure_cache.from_json'):
+        return pio.from_json(payload)
+
+
+def cached_folium_html(func, key, *args, **kwargs):
+    """
+    Devolve o HTML do mapa Folium de func(*args, **kwargs), reaproveitando o HTML em cache
+    
+    Input: função que gera o folium.Map, chave dos filtros (ver filter_key) e argumentos da função
+    Output: HTML do mapa, pronto para o st.components.v1.html
+    """
+    import folium
+
+    def render(map):
+        return folium.Figure().add_child(map).render()
+
+    return _cached(func, key, render, args, kwargs)
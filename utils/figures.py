@@ -0,0 +1,198 @@
+"""
+Figuras do dashboard (Plotly e Folium)
+
+Cada função recebe o dataset e/ou o cubo já filtrados, busca os números em
+utils/metrics.py e só monta a figura. As páginas usam estas funções com o
+cache de figuras (utils/figure_cache.py) e o benchmark (benchmarks/suite.py)
+mede a construção de cada uma.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils import metrics
+from utils.geo import bin_points
+from utils.profiling import profiled
+
+
+MAP_MODES = ['Centro por cidade e tráfego', 'Mapa de calor - entregas', 'Mapa de calor - restaurantes']
+
+# Limite de pontos desenhados nos mapas de calor (células da grade)
+MAX_MAP_POINTS = 2000
+
+
+#---------------------------------
+# Visão Empresa
+#---------------------------------
+@profiled()
+def order_metric(cube):
+    """
+    Recebe o cubo filtrado, executa, gera uma figura e retorna a figura
+    
+    1. Gera gráfico de BARRAS
+    2. Total de pedidos por dia
+    """
+    df_aux = metrics.orders_by_day(cube)
+
+    #desenhando gráfico barras
+    fig = px.bar(df_aux, x='Order_Date', y='ID')
+
+    return fig
+
+
+@profiled()
+def traffic_order_share(cube):
+    """
+    Recebe o cubo filtrado, executa, gera uma figura e retorna a figura
+    
+    1. Gera gráfico Pizza
+    2. Total de pedidos por densidade de tráfego
+    
+    """
+    #pedidos e porcentagem de entrega por tráfego (ver utils/metrics.py)
+    df_aux = metrics.traffic_order_share(cube)
+    #desenhando gráfico pizza
+    fig = px.pie(df_aux, values='Delivery_perc', names='Road_traffic_density')
+    return fig
+
+
+
+@profiled()
+def traffic_order_city(cube):
+    """
+    Recebe o cubo filtrado, executa, gera uma figura e retorna a figura
+    
+    1. Gera gráfico com Pontos
+    2. Total de pedidos por cidade e por densidade de tráfego
+    
+    """
+    df_aux = metrics.traffic_order_city(cube)
+    #desenhando gráfico 
+    fig = px.scatter(df_aux, x='City', y='Road_traffic_density', size='ID', color='City')
+    return fig
+
+
+
+@profiled()
+def order_by_week(cube):
+    """
+    Recebe o cubo filtrado, executa, gera uma figura e retorna a figura
+    
+    1. Gera gráfico de Linhas
+    2. Agrupa os pedidos por dia do cubo em semanas (separando o ano em 52 semanas)  
+    3. Total de pedidos por semana
+    
+    """
+    df_aux = metrics.orders_by_week(cube)
+    #desenhando gráfico linhas
+    fig = px.line(df_aux, x='Week_of_year', y='ID')
+    return fig
+
+
+@profiled()
+def order_share_by_week(df1):
+    """
+    Recebe o dataframe, executa, gera uma figura e retorna a figura
+    
+    1. Gera gráfico de Linhas
+    2. Total de pedidos por entregador por semana
+    
+    """
+    df_aux = metrics.order_share_by_week(df1)
+
+    fig = px.line(df_aux, x='Week_of_year', y='Order_by_delivery')
+    
+    return fig
+
+
+@profiled()
+def country_maps(df1, mode=MAP_MODES[0]):
+    """
+    Recebe o dataframe, executa, gera um mapa e retorna o mapa
+    
+    1. Gera um mapa
+    2. MAP_MODES[0]: localização central de cada cidade por tipo de tráfego.
+    3. Demais modos: mapa de calor dos locais de entrega ou dos restaurantes.
+       Os pontos são agregados no servidor em uma grade (no máximo MAX_MAP_POINTS
+       células), então o tamanho do mapa não cresce com o número de pedidos.
+    
+    O folium (import lento) só é carregado quando a aba do mapa é aberta.
+    """
+    import folium
+    from folium.plugins import HeatMap
+
+    map = folium.Map()
+
+    if mode == MAP_MODES[0]:
+        df_aux = metrics.city_centers(df1)
+
+        for city, traffic, lat, lon in zip(df_aux['City'], df_aux['Road_traffic_density'],
+                                           df_aux['Delivery_location_latitude'], df_aux['Delivery_location_longitude']):
+            folium.Marker([lat, lon], popup=f'{city} - {traffic}').add_to(map)
+
+    else:
+        prefix = 'Delivery_location' if mode == MAP_MODES[1] else 'Restaurant'
+        bins = bin_points(df1[f'{prefix}_latitude'], df1[f'{prefix}_longitude'], MAX_MAP_POINTS)
+
+        HeatMap(bins.loc[:, ['latitude', 'longitude', 'count']].to_numpy().tolist(), radius=12).add_to(map)
+        if len(bins):
+            map.fit_bounds([[bins['latitude'].min(), bins['longitude'].min()],
+                            [bins['latitude'].max(), bins['longitude'].max()]])
+    
+    return map
+
+
+#---------------------------------
+# Visão Restaurantes
+#---------------------------------
+@profiled()
+def distance(df1, fig):
+    """
+    Usa a coluna Distance (calculada uma única vez no carregamento dos dados)
+    
+    1. fig=False: retorna a distância média entre restaurantes e locais de entrega
+    2. fig=True: retorna o gráfico de pizza com a distância média por cidade
+    """
+    if fig == False:
+        avg_distance = np.round(df1['Distance'].mean(), 2)
+        return avg_distance
+    
+    else:
+        avg_distance = metrics.distance_by_city(df1)
+        fig = go.Figure(data=[go.Pie(labels=avg_distance['City'], values=avg_distance['Distance'], pull=[0, 0.1, 0])])
+        return fig
+
+
+@profiled()
+def avg_std_time_graph(cube):  
+    """
+    Esta função calcula o tempo médio e o desvio padrão de entrega por cidade (a partir do cubo filtrado)
+    """  
+    df_aux = metrics.time_by_city(cube)
+    fig = go.Figure()
+    fig.add_trace(go.Bar( name='Control', x=df_aux['City'], y=df_aux['avg_time'], error_y=dict(type='data', array=df_aux['std_time'])))
+    fig.update_layout(barmode='group')
+    return fig
+
+
+
+@profiled()
+def avg_std_time_on_traffic(cube):
+    df_aux = metrics.time_by_city_traffic(cube)
+
+    fig = px.sunburst(df_aux, path=['City', 'Road_traffic_density'], values='avg_time', color='std_time', color_continuous_scale='RdBu', color_continuous_midpoint=np.average(df_aux['std_time']) )
+    return fig
+
+
+# Todas as figuras das páginas com a mesma assinatura: nome -> função(df1, cube)
+FIGURES = {
+    'order_metric': lambda df1, cube: order_metric(cube),
+    'traffic_order_share': lambda df1, cube: traffic_order_share(cube),
+    'traffic_order_city': lambda df1, cube: traffic_order_city(cube),
+    'order_by_week': lambda df1, cube: order_by_week(cube),
+    'order_share_by_week': lambda df1, cube: order_share_by_week(df1),
+    **{f'country_maps[{mode}]': (lambda df1, cube, mode=mode: country_maps(df1, mode)) for mode in MAP_MODES},
+    'distance': lambda df1, cube: distance(df1, fig=True),
+    'avg_std_time_graph': lambda df1, cube: avg_std_time_graph(cube),
+    'avg_std_time_on_traffic': lambda df1, cube: avg_std_time_on_traffic(cube),
+}
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+# Mesmo raio médio da Terra usado pelo pacote haversine (em km)
+EARTH_RADIUS_KM = 6371.0088
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def haversine_np(lat1, lon1, lat2, lon2):
+    """
+    Distância de grande círculo (em km) entre dois conjuntos de coordenadas
+    
+    Versão vetorizada do haversine(): recebe arrays/Series de latitudes e
+    longitudes em graus e calcula todas as distâncias de uma vez com NumPy.
+    
+    Input: lat1, lon1, lat2, lon2
+    Output: array com as distâncias em km
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype='float64')) for x in (lat1, lon1, lat2, lon2))
+
+    d = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(d))
+
+
+def grid_bins(lat, lon, cell_deg):
+    """
+    Agrupa pontos em uma grade regular de `cell_deg` graus
+    
+    Input: arrays de latitude e longitude e o tamanho da célula (graus)
+    Output: Dataframe com latitude/longitude do centróide e a quantidade de pontos de cada célula ocupada
+    """
+    lat = np.asarray(lat, dtype='float64')
+    lon = np.asarray(lon, dtype='float64')
+    valid = np.isfinite(lat) & np.isfinite(lon)
+    lat, lon = lat[valid], lon[valid]
+
+    cell_lat = np.floor(lat / cell_deg).astype('int64')
+    cell_lon = np.floor(lon / cell_deg).astype('int64')
+    # uma chave inteira por célula: (linha, coluna) da grade
+    n_cols = int(np.ceil(360 / cell_deg)) + 2
+    cells = cell_lat * n_cols + cell_lon
+
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    return pd.DataFrame({
+        'latitude': np.bincount(inverse, weights=lat) / counts,
+        'longitude': np.bincount(inverse, weights=lon) / counts,
+        'count': counts,
+    })
+
+
+def bin_points(lat, lon, max_points, cell_deg=0.01):
+    """
+    Reduz qualquer quantidade de pontos a no máximo `max_points` células
+    
+    Começa com células de `cell_deg` graus e dobra o tamanho da célula até o
+    número de células ocupadas caber no limite, mantendo o HTML do mapa pequeno.
+    
+    Output: Dataframe do grid_bins
+    """
+    bins = grid_bins(lat, lon, cell_deg)
+    while len(bins) > max_points:
+        cell_deg *= 2
+        bins = grid_bins(lat, lon, cell_deg)
+    return bins
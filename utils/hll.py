@@ -0,0 +1,169 @@
+"""
+HyperLogLog para contagem aproximada de valores distintos
+
+Usado como alternativa à contagem exata de entregadores distintos
+(nunique / len(unique())). Cada sketch ocupa 2^p bytes independente do número
+de valores, e sketches de dias/semanas/lotes diferentes podem ser mesclados
+(máximo registrador a registrador) sem perder precisão.
+"""
+import numpy as np
+import pandas as pd
+
+from utils import config
+
+
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def hash_values(values):
+    """
+    Hash de 64 bits estável (mesmo resultado em qualquer processo) de cada valor
+    
+    Categóricas e textos com o mesmo conteúdo geram o mesmo hash.
+    """
+    series = pd.Series(values)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # hash só das categorias, espalhado pelos códigos (valores vazios são ignorados)
+        codes = series.cat.codes.to_numpy()
+        hashes = pd.util.hash_pandas_object(pd.Series(series.cat.categories), index=False).to_numpy()
+        return hashes[codes[codes >= 0]]
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+
+
+def _bit_length(x):
+    """ bit_length de cada elemento de um array uint64 (exato: cada metade de 32 bits cabe no float64) """
+    hi = (x >> np.uint64(32)).astype('float64')
+    lo = (x & np.uint64(0xFFFFFFFF)).astype('float64')
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+def register_ranks(hashes, precision):
+    """
+    Separa cada hash em (registrador, posição do primeiro bit 1)
+    
+    Output: arrays idx (registrador, p bits mais altos) e rank (1 + zeros à esquerda do resto)
+    """
+    p = np.uint64(precision)
+    idx = (hashes >> (np.uint64(64) - p)).astype('int64')
+    rest = hashes << p
+    rank = np.minimum(64 - _bit_length(rest) + 1, 64 - precision + 1)
+    return idx, rank.astype('uint8')
+
+
+def estimate(registers, precision):
+    """
+    Estimativa de cardinalidade a partir dos registradores (um sketch por linha se for 2D)
+    
+    Usa a correção de contagem linear para cardinalidades pequenas.
+    """
+    registers = np.atleast_2d(registers)
+    m = 1 << precision
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype('float64')), axis=1)
+    zeros = np.sum(registers == 0, axis=1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class HyperLogLog:
+    """
+    Sketch HyperLogLog com precisão `precision` (2^precision registradores de 1 byte)
+    """
+
+    def __init__(self, precision=12):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f'precision deve estar entre {MIN_PRECISION} e {MAX_PRECISION}')
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype='uint8')
+
+    def add(self, values):
+        """ Adiciona os valores (array, Series ou lista) ao sketch """
+        if len(values):
+            idx, rank = register_ranks(hash_values(values), self.precision)
+            np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        """ Mescla outro sketch (mesma precisão) neste: o resultado conta a união dos dois """
+        if other.precision != self.precision:
+            raise ValueError('só é possível mesclar sketches com a mesma precisão')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """ Quantidade aproximada de valores distintos """
+        return int(round(estimate(self.registers, self.precision)[0]))
+
+
+def registers_by(keys, values, precision=12):
+    """
+    Registradores HyperLogLog de cada grupo, no formato longo (chave, idx, rank)
+    
+    Só os registradores não vazios aparecem. Dois resultados (ex.: de blocos ou
+    dias diferentes) são mesclados com um groupby(['key', 'idx']).max().
+    
+    Input: Series das chaves, Series dos valores e precisão
+    Output: Dataframe com as colunas key, idx e rank
+    """
+    keys = pd.Series(keys).reset_index(drop=True)
+    values = pd.Series(values).reset_index(drop=True)
+    valid = values.notna().to_numpy()
+
+    idx, rank = register_ranks(hash_values(values), precision)
+    df_aux = pd.DataFrame({'key': keys.to_numpy()[valid], 'idx': idx, 'rank': rank})
+    return df_aux.groupby(['key', 'idx'], sort=False)['rank'].max().reset_index()
+
+
+def estimate_by(registers, precision=12):
+    """
+    Estimativa por grupo a partir do formato longo do registers_by
+    
+    Output: Series indexada pela chave com a contagem aproximada
+    """
+    matrix = (registers.set_index(['key', 'idx'])['rank']
+                       .unstack(fill_value=0)
+                       .reindex(columns=range(1 << precision), fill_value=0))
+    counts = np.round(estimate(matrix.to_numpy(), precision)).astype('int64')
+    return pd.Series(counts, index=matrix.index)
+
+
+def approx_nunique_by(keys, values, precision=12):
+    """
+    Quantidade aproximada de valores distintos de `values` para cada valor de `keys`
+    
+    Equivale a um groupby(keys)[values].nunique(), mas com um HyperLogLog por
+    grupo calculado de forma vetorizada (sem laço por grupo).
+    
+    Input: Series das chaves, Series dos valores e precisão
+    Output: Series indexada pelas chaves com a contagem aproximada
+    """
+    counts = estimate_by(registers_by(keys, values, precision), precision)
+    return counts.rename_axis(getattr(keys, 'name', None))
+
+
+def nunique(values, mode=None, precision=None):
+    """
+    Quantidade de valores distintos, exata ou aproximada conforme CURRY_DISTINCT_MODE (utils/config.py)
+    """
+    mode = mode or config.DISTINCT_MODE
+    if mode == 'hll':
+        return HyperLogLog(precision or config.HLL_PRECISION).add(values).count()
+    return pd.Series(values).nunique()
+
+
+def nunique_by(keys, values, mode=None, precision=None):
+    """
+    Quantidade de valores distintos por grupo, exata ou aproximada conforme CURRY_DISTINCT_MODE
+    
+    Output: Series indexada pelas chaves
+    """
+    mode = mode or config.DISTINCT_MODE
+    if mode == 'hll':
+        return approx_nunique_by(keys, values, precision or config.HLL_PRECISION)
+    return pd.Series(values).groupby(keys, observed=True).nunique()
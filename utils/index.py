@@ -0,0 +1,75 @@
+"""
+Índice de linhas para os filtros da barra lateral
+
+O dataset limpo fica ordenado por Order_Date, então o filtro "até qual data"
+vira uma busca binária que devolve o fim de um intervalo contínuo de linhas.
+Para o tráfego, o índice guarda as posições (já ordenadas) das linhas de cada
+nível, e a seleção é feita cortando essas listas na mesma posição da data.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+
+class OrdersIndex:
+    """
+    Índice por data (busca binária) + posições por nível de tráfego
+    
+    Input: Dataframe limpo ordenado por Order_Date (precisa de Order_Date e Road_traffic_density)
+    """
+
+    def __init__(self, df1):
+        self.dates = df1['Order_Date'].to_numpy()
+        if len(self.dates) and not (self.dates[1:] >= self.dates[:-1]).all():
+            raise ValueError('OrdersIndex espera o dataset ordenado por Order_Date')
+
+        traffic = df1['Road_traffic_density'].astype('category')
+        codes = traffic.cat.codes.to_numpy()
+        # argsort estável: dentro de cada nível as posições continuam em ordem crescente (= ordem de data)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(traffic.cat.categories) + 1))
+        self.traffic_positions = {level: order[bounds[i]:bounds[i + 1]]
+                                  for i, level in enumerate(traffic.cat.categories)}
+        # linhas sem tráfego (código -1) não passam em nenhum filtro de tráfego
+        self.has_missing_traffic = bool(len(codes) and codes[order[0]] < 0)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def date_stop(self, date_cutoff):
+        """ Número de linhas com Order_Date < date_cutoff (busca binária) """
+        return int(np.searchsorted(self.dates, pd.Timestamp(date_cutoff).to_datetime64(), side='left'))
+
+    def select(self, date_cutoff, traffic_options):
+        """
+        Seleciona as linhas dos filtros da barra lateral
+        
+        Output: slice(0, stop) quando todos os níveis de tráfego estão selecionados e nenhuma
+                linha está sem tráfego (intervalo contínuo, sem cópia), ou um array ordenado com as posições
+        """
+        stop = self.date_stop(date_cutoff)
+        levels = [level for level in self.traffic_positions if level in set(traffic_options)]
+
+        if len(levels) == len(self.traffic_positions) and not self.has_missing_traffic:
+            return slice(0, stop)
+
+        parts = [positions[:np.searchsorted(positions, stop)] for positions in
+                 (self.traffic_positions[level] for level in levels)]
+        if not parts:
+            return np.empty(0, dtype='int64')
+        return np.sort(np.concatenate(parts))
+
+
+@profiled()
+def filter_orders(df1, index, date_cutoff, traffic_options):
+    """
+    Aplica os filtros de data e de tráfego usando o índice
+    
+    Input: Dataframe limpo (mesma ordem de linhas usada para montar o índice), índice, data limite e tráfegos
+    Output: Dataframe filtrado (fatia sem cópia quando possível)
+    """
+    selection = index.select(date_cutoff, traffic_options)
+    if isinstance(selection, slice):
+        return df1.iloc[selection]
+    return df1.take(selection)
@@ -0,0 +1,205 @@
+"""
+Ingestão incremental de novos lotes de pedidos
+
+Cada lote (um csv diário no mesmo formato do train.csv) passa pelo mesmo
+read_orders + clean_code do dataset principal e é guardado em Parquet no
+diretório do store. Os agregados dos lotes (o cubo e o cubo por entregador,
+ver utils/cube.py) são atualizados somando apenas os do lote novo, sem
+reprocessar o histórico.
+
+O store guarda somente o que foi ingerido; o loader junta com o dataset
+principal (train.csv) na leitura.
+
+Uso:
+    python -m utils.ingest pedidos_2022-04-07.csv
+    python -m utils.ingest lote1.csv lote2.csv --store orders_store
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from utils import config, snapshot
+from utils.cleaning import TIME_BUCKETS, add_time_buckets, clean_code, read_orders
+from utils.cube import COURIER_KEYS, CUBE_COLUMNS, CUBE_KEYS, build_cube, merge_sums
+from utils.parallel import parallel_cube
+
+
+# agregado -> chaves do agrupamento
+AGGREGATE_KEYS = {
+    'cube': CUBE_KEYS,
+    'couriers': COURIER_KEYS,
+}
+
+AGGREGATE_COLUMNS = list(dict.fromkeys(CUBE_COLUMNS + COURIER_KEYS))
+
+MANIFEST = 'manifest.json'
+
+
+#---------------------------------
+# Agregados
+#---------------------------------
+def compute_aggregates(df1, parallel=False):
+    """
+    Calcula os agregados aditivos de um pedaço do dataset limpo
+    
+    1. cube: o cubo das métricas filtradas (ver utils/cube.py); com parallel=True
+       é montado em vários processos (utils/parallel.parallel_cube)
+    2. couriers: o cubo por entregador (COURIER_KEYS), base da tabela de entregadores
+    
+    As demais métricas das páginas e da API são calculadas no df1 filtrado ou no SQLite.
+    O loader (threads do Streamlit) chama sem processos; só a ingestão usa o parallel.
+    
+    Input: Dataframe limpo (precisa das AGGREGATE_COLUMNS) e se pode usar vários processos
+    Output: dicionário nome -> Dataframe
+    """
+    return {
+        'cube': parallel_cube(df1) if parallel else build_cube(df1),
+        'couriers': build_cube(df1, COURIER_KEYS),
+    }
+
+
+def merge_aggregates(*parts):
+    """
+    Soma agregados de partes diferentes do dataset (ex.: histórico + lote novo)
+    
+    Input: dicionários do compute_aggregates (None é ignorado)
+    Output: dicionário nome -> Dataframe com as somas combinadas
+    """
+    parts = [part for part in parts if part]
+    return {name: merge_sums([part.get(name) for part in parts], keys)
+            for name, keys in AGGREGATE_KEYS.items()
+            if any(name in part for part in parts)}
+
+
+#---------------------------------
+# Store
+#---------------------------------
+def _read_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {'batches': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def store_signature(store_dir):
+    """
+    Assinatura do store (muda a cada lote ingerido), ou None se ainda não há lotes
+    """
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def read_batches(store_dir, columns=None):
+    """
+    Lê os lotes ingeridos, na ordem de ingestão
+    
+    Input: diretório do store e lista de colunas (None = todas)
+    Output: lista de Dataframes limpos
+    """
+    manifest = _read_manifest(store_dir)
+    return [_read_batch(os.path.join(store_dir, 'batches', batch['file']), columns)
+            for batch in manifest['batches']]
+
+
+def _read_batch(path, columns):
+    # lotes ingeridos antes das colunas de período (TIME_BUCKETS) não as têm: calcula na leitura
+    names = set(snapshot.pq.read_schema(path).names)
+    wanted = list(columns) if columns is not None else None
+    missing = [col for col in (wanted or TIME_BUCKETS) if col not in names]
+    if not missing:
+        return snapshot.read_snapshot(path, wanted)
+
+    sources = [col for col in ['Order_Date', 'Time_Orderd'] if col in names]
+    read_columns = None if wanted is None else [col for col in wanted if col in names] + sources
+    df1 = add_time_buckets(snapshot.read_snapshot(path, list(dict.fromkeys(read_columns)) if read_columns else None))
+    return df1 if wanted is None else df1.loc[:, wanted]
+
+
+def read_aggregates(store_dir):
+    """
+    Lê os agregados dos lotes ingeridos
+    
+    Agregados que ainda não existiam quando os lotes foram ingeridos são
+    calculados a partir dos lotes guardados (e gravados no próximo ingest_batch).
+    
+    Output: dicionário nome -> Dataframe (vazio se ainda não há lotes)
+    """
+    aggregates = {}
+    for name in AGGREGATE_KEYS:
+        path = os.path.join(store_dir, 'aggregates', f'{name}.parquet')
+        if os.path.exists(path):
+            aggregates[name] = pd.read_parquet(path)
+
+    missing = [name for name in AGGREGATE_KEYS if name not in aggregates]
+    if aggregates and missing:
+        computed = compute_aggregates(pd.concat(read_batches(store_dir, AGGREGATE_COLUMNS), ignore_index=True))
+        aggregates.update({name: computed[name] for name in missing})
+    return aggregates
+
+
+def ingest_batch(csv_path, store_dir):
+    """
+    Ingere um novo lote de pedidos no store
+    
+    1. Ignora o lote se o mesmo arquivo (nome, tamanho e mtime) já foi ingerido
+    2. Lê e limpa o lote com as mesmas regras do clean_code
+    3. Guarda o lote limpo em Parquet
+    4. Soma os agregados do lote aos agregados já guardados
+    5. Registra o lote no manifest (por último: até aqui, o lote não é visível para o loader)
+    
+    Input: caminho do csv do lote e diretório do store
+    Output: número de pedidos limpos ingeridos (0 se o lote já tinha sido ingerido)
+    """
+    if not snapshot.has_pyarrow():
+        raise ImportError('pyarrow é necessário para a ingestão incremental')
+
+    stat = os.stat(csv_path)
+    source = {'source': os.path.basename(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    manifest = _read_manifest(store_dir)
+    if any({key: batch[key] for key in source} == source for batch in manifest['batches']):
+        return 0
+
+    df1 = clean_code(read_orders(csv_path))
+
+    os.makedirs(os.path.join(store_dir, 'batches'), exist_ok=True)
+    os.makedirs(os.path.join(store_dir, 'aggregates'), exist_ok=True)
+
+    batch_file = f"{len(manifest['batches']):06d}_{os.path.splitext(source['source'])[0]}.parquet"
+    snapshot.write_atomic(os.path.join(store_dir, 'batches', batch_file),
+                  lambda path: df1.to_parquet(path, index=False))
+
+    aggregates = merge_aggregates(read_aggregates(store_dir), compute_aggregates(df1, parallel=config.WORKERS > 1))
+    for name, df_aux in aggregates.items():
+        snapshot.write_atomic(os.path.join(store_dir, 'aggregates', f'{name}.parquet'),
+                      lambda path: df_aux.to_parquet(path, index=False))
+
+    manifest['batches'].append(dict(source, file=batch_file, rows=len(df1)))
+    snapshot.write_atomic(os.path.join(store_dir, MANIFEST), lambda path: _write_json(path, manifest))
+
+    return len(df1)
+
+
+if __name__ == '__main__':
+    from utils.loader import default_store
+
+    parser = argparse.ArgumentParser(description='Ingere novos lotes de pedidos no store incremental')
+    parser.add_argument('batches', nargs='+', help='csvs dos lotes, no formato do train.csv')
+    parser.add_argument('--store', default=default_store('train.csv'),
+                        help='diretório do store (padrão: orders_store ao lado do train.csv)')
+    args = parser.parse_args()
+
+    for csv_path in args.batches:
+        rows = ingest_batch(csv_path, args.store)
+        print(f'{csv_path}: {rows:,} pedidos ingeridos' if rows else f'{csv_path}: já ingerido, ignorado')
@@ -0,0 +1,236 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils import config, ingest, shared, snapshot
+from utils.cleaning import clean_code, read_orders, to_compact_dtypes
+from utils.courier_index import CourierIndex
+from utils.cube import merge_sums
+from utils.index import OrdersIndex, filter_orders
+from utils.profiling import profiled
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def file_signature(path):
+    """
+    Retorna a assinatura (caminho, tamanho, mtime) do arquivo.
+    
+    Qualquer alteração no arquivo muda a assinatura, e com isso a chave do cache.
+    """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def default_store(path):
+    """ Diretório do store de lotes incrementais (utils/ingest.py) do dataset: orders_store ao lado do csv """
+    return os.path.join(os.path.dirname(os.path.abspath(path)), 'orders_store')
+
+
+def dataset_version(path):
+    """
+    Versão do dataset: assinatura do csv principal + assinatura do store de lotes ingeridos
+    
+    Muda quando o csv muda ou quando um novo lote é ingerido.
+    """
+    return (file_signature(path), ingest.store_signature(default_store(path)))
+
+
+@lru_cache(maxsize=4)
+def _load_csv(path, size, mtime_ns):
+    df = read_orders(path)
+    return clean_code(df)
+
+
+@lru_cache(maxsize=8)
+def _load_snapshot(path, size, mtime_ns, columns):
+    parquet_path = snapshot.build_snapshot(path)
+    return snapshot.read_snapshot(parquet_path, columns)
+
+
+@lru_cache(maxsize=8)
+def _load_shared(version, columns):
+    signature, store_signature = version
+    store_dir = os.path.dirname(store_signature[0]) if store_signature else None
+    return shared.open_shared(shared.publish(signature[0], store_dir=store_dir), columns)
+
+
+def _load_base(signature, columns):
+    """ Dataset principal (train.csv), sem os lotes ingeridos """
+    if snapshot.has_pyarrow():
+        return _load_snapshot(*signature, columns)
+
+    df1 = _load_csv(*signature)
+    return df1 if columns is None else df1.loc[:, list(columns)]
+
+
+def _read_base(signature, columns):
+    """
+    Dataset principal sem os lotes, lido sem cache: só serve para montar o cubo e o
+    índice de entregadores do histórico, que ficam em cache no lugar dele
+    """
+    if snapshot.has_pyarrow():
+        return snapshot.read_snapshot(snapshot.build_snapshot(signature[0]), columns)
+    return _load_base(signature, columns)
+
+
+@lru_cache(maxsize=8)
+def _load_data(version, columns):
+    # o arquivo compartilhado já tem os lotes ingeridos: todas as seleções de colunas mapeiam o mesmo arquivo
+    if snapshot.has_pyarrow() and config.SHARED_DATASET:
+        return _load_shared(version, columns)
+
+    signature, store_signature = version
+    df1 = _load_base(signature, columns)
+    if store_signature is None:
+        return df1
+
+    # lotes ingeridos: junta ao histórico e mantém a ordenação por data (o OrdersIndex depende dela)
+    if columns is not None and 'Order_Date' not in columns:
+        return _load_data(version, columns + ('Order_Date',)).drop(columns='Order_Date')
+
+    batches = ingest.read_batches(os.path.dirname(store_signature[0]), columns)
+    df1 = to_compact_dtypes(pd.concat([df1, *batches], ignore_index=True))
+    return df1.sort_values('Order_Date', kind='stable', ignore_index=True)
+
+
+@profiled()
+def load_data(path='train.csv', columns=None):
+    """
+    Lê e limpa o dataset uma única vez por processo
+    
+    1. Calcula a versão do dataset (caminho, tamanho e mtime do csv + lotes ingeridos)
+    2. Se nada mudou, devolve o dataframe limpo que já está em cache
+    3. Se mudou (ou é a primeira chamada), publica o dataset limpo, já com os lotes ingeridos
+       (utils/ingest.py), no arquivo Arrow compartilhado (utils/shared.py) e mapeia dele
+       apenas as colunas pedidas
+    4. Com CURRY_SHARED_DATASET=0, lê do snapshot Parquet (sem pyarrow, lê o csv e roda o
+       clean_code) e junta os lotes ingeridos em memória
+    
+    Input: caminho do csv e lista de colunas usadas pela página (None = todas)
+    Output: Dataframe limpo (compartilhado entre reruns - não alterar in place)
+    """
+    columns = tuple(columns) if columns is not None else None
+    return _load_data(dataset_version(path), columns)
+
+
+@lru_cache(maxsize=4)
+def _base_aggregates(signature):
+    return ingest.compute_aggregates(_read_base(signature, tuple(ingest.AGGREGATE_COLUMNS)))
+
+
+@lru_cache(maxsize=8)
+def _load_aggregate(version, name):
+    signature, store_signature = version
+    aggregate = _base_aggregates(signature)[name]
+    if store_signature is None:
+        return aggregate
+
+    # só os agregados dos lotes são somados aos do histórico, que continuam em cache
+    batches = ingest.read_aggregates(os.path.dirname(store_signature[0]))[name]
+    return merge_sums([aggregate, batches], ingest.AGGREGATE_KEYS[name])
+
+
+@profiled()
+def load_cube(path='train.csv'):
+    """
+    Devolve o cubo pré-agregado do dataset (ver utils/cube.py), montado uma vez por versão do arquivo
+    
+    Input: caminho do csv
+    Output: Dataframe do cubo (compartilhado entre reruns - não alterar in place)
+    """
+    return _load_aggregate(dataset_version(path), 'cube')
+
+
+@profiled()
+def load_courier_cube(path='train.csv'):
+    """
+    Devolve o cubo por entregador (utils/cube.COURIER_KEYS), montado uma vez por versão do dataset
+
+    Como o cubo, a cada lote ingerido só as somas do lote são acrescentadas.
+    Os filtros da barra lateral são aplicados com o utils/cube.filter_cube.
+
+    Input: caminho do csv
+    Output: Dataframe do cubo por entregador (compartilhado entre reruns - não alterar in place)
+    """
+    return _load_aggregate(dataset_version(path), 'couriers')
+
+
+@lru_cache(maxsize=4)
+def _load_index(version):
+    return OrdersIndex(_load_data(version, ('Order_Date', 'Road_traffic_density')))
+
+
+@profiled()
+def load_index(path='train.csv'):
+    """
+    Devolve o índice de data/tráfego do dataset (ver utils/index.py), montado uma vez por versão do dataset
+    
+    Todas as colunas lidas pelo load_data seguem a mesma ordem de linhas, então
+    o mesmo índice serve para qualquer seleção de colunas.
+    """
+    return _load_index(dataset_version(path))
+
+
+COURIER_INDEX_COLUMNS = ('Order_Date', 'Delivery_person_ID')
+
+
+@lru_cache(maxsize=4)
+def _base_courier_index(signature):
+    return CourierIndex.from_frame(_read_base(signature, COURIER_INDEX_COLUMNS))
+
+
+@lru_cache(maxsize=4)
+def _load_courier_index(version):
+    signature, store_signature = version
+    index = _base_courier_index(signature)
+    if store_signature is None:
+        return index
+
+    df1 = _load_data(version, COURIER_INDEX_COLUMNS)
+    base_dates = _read_base(signature, ('Order_Date',))['Order_Date'].to_numpy()
+    dates = df1['Order_Date'].to_numpy()
+
+    # a ordenação por data é estável e o histórico vem antes dos lotes: se nenhum pedido dos lotes
+    # é anterior à última data do histórico, as linhas do histórico não mudam de posição e só os
+    # lotes (no fim do dataset) são indexados
+    if len(base_dates) == 0 or np.searchsorted(dates, base_dates[-1]) == np.searchsorted(base_dates, base_dates[-1]):
+        return index.extend(CourierIndex.from_frame(df1.iloc[index.rows:], offset=index.rows))
+    return CourierIndex.from_frame(df1)
+
+
+@profiled()
+def load_courier_index(path='train.csv'):
+    """
+    Devolve o índice Delivery_person_ID -> posições das linhas (ver utils/courier_index.py)
+
+    Montado uma vez por versão do csv; a cada lote ingerido, só as linhas do lote são
+    indexadas (ou o índice é refeito, se o lote tiver pedidos anteriores ao histórico).
+    Vale para qualquer seleção de colunas do load_data, que segue a mesma ordem de linhas.
+    """
+    return _load_courier_index(dataset_version(path))
+
+
+@lru_cache(maxsize=16)
+def _load_filtered(version, columns, date_cutoff, traffic_options):
+    return filter_orders(_load_data(version, columns), _load_index(version), date_cutoff, list(traffic_options))
+
+
+@profiled()
+def load_filtered(path, columns, date_cutoff, traffic_options):
+    """
+    Dataset com os filtros da barra lateral, compartilhado entre sessões e reruns
+
+    Com todos os níveis de tráfego o resultado é uma fatia (sem cópia) do dataset;
+    com um subconjunto, as linhas selecionadas são copiadas uma única vez por
+    combinação de filtros e o mesmo dataframe serve a todas as sessões que usam
+    essa combinação.
+
+    Input: caminho do csv, colunas da página, data limite e tráfegos selecionados
+    Output: Dataframe filtrado (compartilhado - não alterar in place)
+    """
+    columns = tuple(columns) if columns is not None else None
+    return _load_filtered(dataset_version(path), columns, pd.Timestamp(date_cutoff), tuple(sorted(traffic_options)))
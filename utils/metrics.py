@@ -0,0 +1,311 @@
+"""
+Métricas do dashboard, sem Streamlit e sem gráficos
+
+Cada função recebe o dataset filtrado (df1) e/ou o cubo filtrado e devolve
+Dataframes, dicionários ou números. As páginas desenham os gráficos a partir
+destes resultados e a API (api.py) serve os mesmos números em JSON; o
+dicionário METRICS reúne todas com a mesma assinatura função(df1, cube).
+Os agrupamentos saem ordenados pelas chaves (categorias em ordem alfabética),
+independente da ordem das linhas do dataset, e só com as categorias presentes.
+
+Com CURRY_BACKEND=sqlite as páginas passam um SqlSelection
+(utils/sql_backend.py) no lugar do cubo ou do df1 das métricas que têm
+pushdown; o agrupamento roda no SQLite e o resultado tem o mesmo formato.
+As métricas reconhecem a seleção pelos métodos (rollup, order_share_by_week,
+courier_ratings), sem importar o backend.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cleaning import drop_unused_categories, period_column, time_buckets
+from utils.cube import rollup as cube_rollup
+from utils.hll import nunique, nunique_by
+from utils.profiling import profiled
+from utils.topk import top_k_per_group
+
+
+def rollup(cube, by):
+    """ utils/cube.rollup no cubo filtrado, ou o mesmo agrupamento feito pela seleção (SqlSelection) """
+    if hasattr(cube, 'rollup'):
+        return cube.rollup(by)
+    return cube_rollup(cube, by)
+
+
+#---------------------------------
+# Visão Empresa
+#---------------------------------
+@profiled()
+def orders_by_day(cube):
+    """ Total de pedidos por dia (colunas Order_Date e ID) """
+    return rollup(cube, ['Order_Date']).loc[:, ['Order_Date', 'orders']].rename(columns={'orders': 'ID'})
+
+
+@profiled()
+def traffic_order_share(cube):
+    """ Total de pedidos e porcentagem de pedidos por densidade de tráfego """
+    df_aux = rollup(cube, ['Road_traffic_density']).loc[:, ['Road_traffic_density', 'orders']].rename(columns={'orders': 'ID'})
+    df_aux['Delivery_perc'] = df_aux['ID'] / df_aux['ID'].sum()
+    return df_aux
+
+
+@profiled()
+def traffic_order_city(cube):
+    """ Total de pedidos por cidade e por densidade de tráfego """
+    df_aux = rollup(cube, ['City', 'Road_traffic_density'])
+    return df_aux.loc[:, ['City', 'Road_traffic_density', 'orders']].rename(columns={'orders': 'ID'})
+
+
+@profiled()
+def orders_by_period(df1, bucket='Week_of_year', distinct=None):
+    """
+    Agregação genérica por período (dia do ano, semana, semana ISO, mês ou hora do pedido)
+
+    1. Total de pedidos por período (coluna ID)
+    2. Se `distinct` for uma coluna, quantidade de valores distintos dela por período
+       (exata ou HyperLogLog, ver utils/hll.nunique_by)
+
+    Não altera o df1 (que pode ser uma fatia do dataset em cache).
+
+    Input: Dataframe filtrado, nome do período (TIME_BUCKETS) e coluna para contar distintos
+    Output: Dataframe ordenado pelo período com as colunas bucket, ID e, se pedido, `distinct`
+    """
+    period = period_column(df1, bucket).rename(bucket)
+    df_aux = period.groupby(period).size().rename('ID').reset_index()
+
+    if distinct is not None:
+        df_distinct = nunique_by(period, df1[distinct]).rename(distinct).reset_index()
+        df_aux = pd.merge(df_aux, df_distinct, how='inner')
+
+    return df_aux
+
+
+@profiled()
+def orders_by_week(cube):
+    """
+    Total de pedidos por semana do ano (semanas começando no domingo, como o %U)
+
+    Sai do total por dia do cubo filtrado: a semana é calculada só nas datas distintas
+    e o filtro de data continua valendo no meio da semana.
+    """
+    df_aux = rollup(cube, ['Order_Date'])
+    week = time_buckets(df_aux['Order_Date'])['Week_of_year'].to_numpy()
+    return df_aux['orders'].groupby(week).sum().rename_axis('Week_of_year').rename('ID').reset_index()
+
+
+@profiled()
+def order_share_by_week(df1):
+    """
+    Pedidos, entregadores distintos e pedidos por entregador por semana
+
+    Entregadores distintos: exato ou HyperLogLog (CURRY_DISTINCT_MODE, ver utils/config.py)
+    """
+    if hasattr(df1, 'order_share_by_week'):
+        return df1.order_share_by_week()
+    df_aux = orders_by_period(df1, 'Week_of_year', distinct='Delivery_person_ID')
+    df_aux['Order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+    return df_aux
+
+
+@profiled()
+def city_centers(df1):
+    """ Localização central (mediana) das entregas de cada cidade por tipo de tráfego """
+    cols = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
+    df_aux = df1.loc[:, cols].groupby(['City', 'Road_traffic_density'], observed=True).median().sort_index().reset_index()
+    return drop_unused_categories(df_aux, ['City', 'Road_traffic_density'])
+
+
+#---------------------------------
+# Visão Entregadores
+#---------------------------------
+@profiled()
+def courier_extremes(df1):
+    """ Maior e menor idade dos entregadores e melhor e pior condição dos veículos """
+    return {
+        'age_max': df1['Delivery_person_Age'].max(),
+        'age_min': df1['Delivery_person_Age'].min(),
+        'vehicle_max': df1['Vehicle_condition'].max(),
+        'vehicle_min': df1['Vehicle_condition'].min(),
+    }
+
+
+@profiled()
+def courier_ratings(df1):
+    """ Avaliação média por entregador """
+    if hasattr(df1, 'courier_ratings'):
+        return df1.courier_ratings()
+    cols = ['Delivery_person_ID', 'Delivery_person_Ratings']
+    df_aux = df1.loc[:, cols].groupby(['Delivery_person_ID'], observed=True).mean().sort_index().reset_index()
+    return drop_unused_categories(df_aux, ['Delivery_person_ID'])
+
+
+@profiled()
+def courier_stats(cube):
+    """
+    Indicadores por entregador: pedidos, avaliação média e desvio padrão e tempo médio de entrega
+
+    Base da tabela paginada de entregadores (ver utils/courier_table.py).
+
+    Input: cubo por entregador filtrado (loader.load_courier_cube + filter_cube) ou SqlSelection
+    Output: Dataframe com Delivery_person_ID, orders, rating_mean, rating_std e time_mean
+    """
+    return rollup(cube, ['Delivery_person_ID']).loc[:, ['Delivery_person_ID', 'orders', 'rating_mean', 'rating_std', 'time_mean']]
+
+
+@profiled()
+def rating_by_traffic(cube):
+    """ Avaliação média e desvio padrão por tipo de tráfego (indexado por Road_traffic_density) """
+    df_aux = rollup(cube, ['Road_traffic_density']).set_index('Road_traffic_density')
+    df_aux = df_aux.loc[:, ['rating_mean', 'rating_std']]
+    df_aux.columns = ['Delivery_mean', 'Delivery_std']
+    return df_aux
+
+
+@profiled()
+def rating_by_weather(cube):
+    """ Avaliação média e desvio padrão por condição climática (indexado por Weatherconditions) """
+    df_aux = rollup(cube, ['Weatherconditions']).set_index('Weatherconditions')
+    df_aux = df_aux.loc[:, ['rating_mean', 'rating_std']]
+    df_aux.columns = ['Weather_mean', 'Weather_std']
+    return df_aux
+
+
+@profiled()
+def courier_max_time(df1):
+    """
+    Maior tempo de entrega de cada entregador em cada cidade
+
+    Calculado uma única vez e compartilhado pelas tabelas de mais rápidos e mais lentos.
+    """
+    cols = ['Delivery_person_ID', 'City', 'Time_taken(min)']
+    df_aux = df1.loc[:, cols].groupby(['City', 'Delivery_person_ID'], observed=True).max().sort_index().reset_index()
+    return drop_unused_categories(df_aux, ['City', 'Delivery_person_ID'])
+
+
+@profiled()
+def top_delivers(df_max_time, top_asc, k=10):
+    """
+    1. Recebe a tabela do courier_max_time, o top_asc (ver 3.) e o k
+    2. Retorna os k entregadores mais lentos ou rápidos de cada cidade (qualquer cidade presente nos dados)
+    3. O top_asc define o ascending, se for False pega os últimos (ou seja, os entregadores que possuem os maiores tempos de entrega, que são os mais lentos). Se for True, pega os com o menor tempo (mais rápidos)
+    """
+    df3 = top_k_per_group(df_max_time, 'City', 'Time_taken(min)', k, ascending=top_asc)
+    return df3.reset_index(drop=True)
+
+
+#---------------------------------
+# Visão Restaurantes
+#---------------------------------
+@profiled()
+def restaurant_kpis(df1, cube):
+    """
+    Calcula de uma vez todos os indicadores da linha "Overall Metrics"
+
+    1. Entregadores únicos (exato ou aproximado, ver utils/hll.nunique)
+    2. Distância média das entregas
+    3. Tempo médio e desvio padrão de entrega por flag de festival
+
+    Os itens 2 e 3 saem do cubo filtrado (somas + um único agrupamento por Festival).
+
+    Input: dataframe filtrado e cubo filtrado
+    Output: dicionário com delivery_unique, avg_distance e time_by_festival
+            (Dataframe indexado por Festival com as colunas avg_time e std_time)
+    """
+    df_aux = rollup(cube, ['Festival']).set_index('Festival')
+
+    # exato ou HyperLogLog (CURRY_DISTINCT_MODE, ver utils/config.py)
+    delivery_unique = nunique(df1['Delivery_person_ID'])
+    avg_distance = cube['distance_sum'].sum() / cube['distance_count'].sum() if len(cube) else np.nan
+
+    time_by_festival = df_aux.loc[:, ['time_mean', 'time_std']]
+    time_by_festival.columns = ['avg_time', 'std_time']
+
+    return {
+        'delivery_unique': delivery_unique,
+        'avg_distance': np.round(avg_distance, 2),
+        'time_by_festival': time_by_festival,
+    }
+
+
+def avg_std_time_delivery(kpis, festival, op):
+    """
+    Esta função devolve o tempo médio ou o desvio padrão do tempo de entrega
+    Parâmentros:
+        Input:
+            -kpis: dicionário calculado pelo restaurant_kpis
+            -festival: indica se há ou não festival
+                'Yes': há festival
+                'No': não há festival
+            -op: tipo de operação que precisa ser calculada
+                'avg_time': calcula o tempo médio
+                'std_time': calcula o desvio padrão do tempo
+        Output:
+            -valor arredondado em 2 casas (None se não houver pedidos com essa flag nos filtros)
+    """
+    time_by_festival = kpis['time_by_festival']
+    if festival not in time_by_festival.index:
+        return None
+
+    return np.round(time_by_festival.loc[festival, op], 2)
+
+
+@profiled()
+def time_by_city(cube):
+    """ Tempo médio e desvio padrão de entrega por cidade """
+    df_aux = rollup(cube, ['City']).rename(columns={'time_mean': 'avg_time', 'time_std': 'std_time'})
+    return df_aux.loc[:, ['City', 'avg_time', 'std_time']]
+
+
+@profiled()
+def time_by_city_traffic(cube):
+    """ Tempo médio e desvio padrão de entrega por cidade e tipo de tráfego """
+    df_aux = rollup(cube, ['City', 'Road_traffic_density']).rename(columns={'time_mean': 'avg_time', 'time_std': 'std_time'})
+    return df_aux.loc[:, ['City', 'Road_traffic_density', 'avg_time', 'std_time']]
+
+
+@profiled()
+def time_by_city_order_type(df1):
+    """ Tempo médio e desvio padrão de entrega por cidade e tipo de pedido """
+    cols = ['City', 'Time_taken(min)', 'Type_of_order']
+    df_aux = df1.loc[:, cols].groupby(['City', 'Type_of_order'], observed=True).agg({'Time_taken(min)': ['mean', 'std']}).sort_index()
+    df_aux.columns = ['avg_time', 'std_time']
+    return drop_unused_categories(df_aux.reset_index(), ['City', 'Type_of_order'])
+
+
+@profiled()
+def distance_by_city(df1):
+    """ Distância média entre restaurante e local de entrega por cidade """
+    df_aux = df1.loc[:, ['City', 'Distance']].groupby('City', observed=True).mean().sort_index().reset_index()
+    return drop_unused_categories(df_aux, ['City'])
+
+
+def restaurant_summary(df1, cube):
+    """ Indicadores do restaurant_kpis com os tempos por festival já separados (um número por indicador) """
+    kpis = restaurant_kpis(df1, cube)
+    return {
+        'delivery_unique': kpis['delivery_unique'],
+        'avg_distance': kpis['avg_distance'],
+        **{f'{op}_festival_{festival.lower()}': avg_std_time_delivery(kpis, festival, op)
+           for festival in ['Yes', 'No'] for op in ['avg_time', 'std_time']},
+    }
+
+
+# Todas as métricas das páginas com a mesma assinatura: nome -> função(df1, cube)
+METRICS = {
+    'orders_by_day': lambda df1, cube: orders_by_day(cube),
+    'traffic_order_share': lambda df1, cube: traffic_order_share(cube),
+    'traffic_order_city': lambda df1, cube: traffic_order_city(cube),
+    'orders_by_week': lambda df1, cube: orders_by_week(cube),
+    'order_share_by_week': lambda df1, cube: order_share_by_week(df1),
+    'city_centers': lambda df1, cube: city_centers(df1),
+    'courier_extremes': lambda df1, cube: courier_extremes(df1),
+    'courier_ratings': lambda df1, cube: courier_ratings(df1),
+    'rating_by_traffic': lambda df1, cube: rating_by_traffic(cube),
+    'rating_by_weather': lambda df1, cube: rating_by_weather(cube),
+    'top_fastest': lambda df1, cube: top_delivers(courier_max_time(df1), top_asc=True),
+    'top_slowest': lambda df1, cube: top_delivers(courier_max_time(df1), top_asc=False),
+    'restaurant_kpis': restaurant_summary,
+    'time_by_city': lambda df1, cube: time_by_city(cube),
+    'time_by_city_traffic': lambda df1, cube: time_by_city_traffic(cube),
+    'time_by_city_order_type': lambda df1, cube: time_by_city_order_type(df1),
+    'distance_by_city': lambda df1, cube: distance_by_city(df1),
+}
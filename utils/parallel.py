@@ -0,0 +1,169 @@
+"""
+Agregação paralela do dataset limpo em vários processos
+
+O dataset (já limpo e filtrado) é dividido em partes - faixas de datas ou
+cidades - e cada processo do ProcessPoolExecutor calcula o StreamAggregates
+(utils/streaming.py) da sua parte. Como o estado é mesclável, os estados
+parciais são somados com merge() e o resultado é o mesmo da execução em um
+único processo. O parallel_cube faz o mesmo só com o cubo (utils/cube.py); é
+o que a ingestão de lotes (utils/ingest.py) usa quando CURRY_WORKERS > 1.
+
+Só para linhas de comando (este módulo, utils.streaming e utils.ingest): o pool
+usa fork, e um fork feito a partir das threads das sessões do Streamlit pode
+herdar locks ocupados e travar. O loader monta o cubo no processo atual.
+
+O dataframe é entregue aos processos uma vez, no initializer do pool: no Linux
+(fork) ele é herdado sem cópia; as tarefas só carregam as posições das linhas.
+Com o dataset compartilhado (utils/shared.py), as colunas apontam para o
+arquivo Arrow mapeado, então os processos leem as mesmas páginas do arquivo.
+
+Uso:
+    python -m utils.parallel train.csv --workers 4 --partition city
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from utils import config
+from utils.cube import build_cube, merge_cubes
+from utils.streaming import StreamAggregates
+
+
+PARTITIONS = ('date', 'city')
+
+_FRAME = None
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def resolve_workers(workers=None):
+    """ Quantidade de processos: `workers`, ou CURRY_WORKERS; 0 = um por núcleo """
+    workers = config.WORKERS if workers is None else workers
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def partition_positions(df1, n_parts, by='date'):
+    """
+    Divide as linhas do dataset em partes
+
+    - date: `n_parts` faixas contínuas de datas (o dataset é ordenado por Order_Date,
+      então cada faixa é um slice); um mesmo dia nunca fica em duas partes
+    - city: uma parte por cidade
+
+    Input: Dataframe limpo, número de partes e critério
+    Output: lista de slices ou arrays de posições (no máximo `n_parts` faixas de datas;
+            partes vazias são descartadas)
+    """
+    if by == 'date':
+        dates = df1['Order_Date'].to_numpy()
+        if len(dates) == 0:
+            return []
+        # início de cada faixa (o fim da última é o fim do dataset, não entra no ajuste abaixo)
+        starts = np.linspace(0, len(dates), n_parts + 1).astype('int64')[:-1]
+        # desloca cada início para o começo do dia, para não quebrar um dia entre duas partes
+        starts = np.unique(np.searchsorted(dates, dates[starts], side='left'))
+        bounds = np.append(starts, len(dates))
+        return [slice(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    if by == 'city':
+        codes = pd.Categorical(df1['City']).codes
+        order = np.argsort(codes, kind='stable')
+        splits = np.flatnonzero(np.diff(codes[order])) + 1
+        return [part for part in np.split(order, splits) if len(part)]
+
+    raise ValueError(f'partição deve ser uma de {PARTITIONS}')
+
+
+def _init_worker(df1):
+    global _FRAME
+    _FRAME = df1
+
+
+def _aggregate_part(positions):
+    return StreamAggregates.from_frame(_FRAME.iloc[positions])
+
+
+def _cube_part(positions):
+    return build_cube(_FRAME.iloc[positions])
+
+
+def _map_parts(df1, parts, workers, func):
+    with ProcessPoolExecutor(max_workers=min(workers, len(parts)),
+                             initializer=_init_worker, initargs=(df1,)) as executor:
+        return list(executor.map(func, parts))
+
+
+def parallel_aggregates(df1, workers=None, partition=None):
+    """
+    Calcula o StreamAggregates do dataset dividindo o trabalho entre processos
+
+    1. Divide as linhas em partes (partition_positions)
+    2. Cada processo agrega as suas partes com StreamAggregates.from_frame
+    3. Os estados parciais são mesclados na ordem das partes
+
+    Com um único processo (ou uma única parte), tudo roda no processo atual.
+
+    Input: Dataframe limpo (e filtrado), número de processos (None = CURRY_WORKERS)
+           e critério de partição (None = CURRY_PARTITION)
+    Output: StreamAggregates
+    """
+    workers = resolve_workers(workers)
+    partition = partition or config.PARTITION
+    if len(df1) == 0:
+        return StreamAggregates()
+
+    parts = partition_positions(df1, workers, partition)
+    if workers == 1 or len(parts) == 1:
+        return StreamAggregates.from_frame(df1)
+
+    states = _map_parts(df1, parts, workers, _aggregate_part)
+    return reduce(StreamAggregates.merge, states, StreamAggregates())
+
+
+def parallel_cube(df1, workers=None, partition=None):
+    """
+    Monta o cubo (utils/cube.build_cube) do dataset dividindo o trabalho entre processos
+
+    Mesmas partes do parallel_aggregates; os cubos parciais são somados com merge_cubes.
+
+    Input: Dataframe limpo (precisa das CUBE_COLUMNS), número de processos (None = CURRY_WORKERS)
+           e critério de partição (None = CURRY_PARTITION)
+    Output: Dataframe do cubo
+    """
+    workers = resolve_workers(workers)
+    partition = partition or config.PARTITION
+    parts = partition_positions(df1, workers, partition) if len(df1) else []
+    if workers == 1 or len(parts) <= 1:
+        return build_cube(df1)
+
+    return merge_cubes(*_map_parts(df1, parts, workers, _cube_part))
+
+
+if __name__ == '__main__':
+    from utils.index import filter_orders
+    from utils.loader import load_data, load_index
+
+    parser = argparse.ArgumentParser(description='Calcula as métricas do dashboard em vários processos')
+    parser.add_argument('csv', nargs='?', default='train.csv')
+    parser.add_argument('--workers', type=int, help='processos (padrão: CURRY_WORKERS, 0 = um por núcleo)')
+    parser.add_argument('--partition', choices=PARTITIONS, help='padrão: CURRY_PARTITION')
+    parser.add_argument('--until', help='data limite (exclusiva), ex.: 2022-04-06')
+    parser.add_argument('--traffic', nargs='*', help='condições de trânsito, ex.: Low Jam')
+    args = parser.parse_args()
+
+    df1 = load_data(args.csv)
+    if args.until or args.traffic:
+        date_cutoff = pd.Timestamp(args.until) if args.until else df1['Order_Date'].max() + pd.Timedelta(days=1)
+        traffic_options = args.traffic or list(df1['Road_traffic_density'].cat.categories)
+        df1 = filter_orders(df1, load_index(args.csv), date_cutoff, traffic_options)
+
+    state = parallel_aggregates(df1, args.workers, args.partition)
+
+    print(f'{state.rows:,} pedidos | {state.delivery_unique():,} entregadores únicos')
+    print(state.rollup(['City']).round(2).to_string(index=False))
+    print(state.order_share_by_week().round(2).to_string(index=False))
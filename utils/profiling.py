@@ -0,0 +1,160 @@
+"""
+Medição de tempo por etapa de cada execução (rerun) das páginas
+
+As etapas (leitura, limpeza, filtros, métricas e figuras) são marcadas com
+timed() ou @profiled. Cada etapa gera um registro estruturado:
+
+    {'run': 'empresa', 'stage': 'metrics.orders_by_week', 'seconds': 0.0123,
+     'depth': 1, 'parent': 'figure.order_by_week', 'offset': 0.412, ...}
+
+(offset: segundos desde o início da execução)
+
+- os registros da execução atual ficam em uma lista (contextvars: cada sessão
+  do Streamlit roda em uma thread própria, então as execuções não se misturam)
+  e podem ser exibidos na barra lateral com timing_panel()
+- cada registro também vai para o logger 'utils.profiling' em nível DEBUG (JSON)
+- com CURRY_PROFILE_DIR definido (utils/config.py), as etapas de primeiro
+  nível são executadas sob o cProfile e salvas como .prof nesse diretório,
+  junto com um timings.jsonl com todos os registros
+
+Fora de uma execução (API, benchmarks) as medições continuam baratas: só o
+perf_counter e o log em DEBUG.
+"""
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import pandas as pd
+
+from utils import config
+
+
+logger = logging.getLogger(__name__)
+
+_run = contextvars.ContextVar('curry_timing_run', default=None)
+_stack = contextvars.ContextVar('curry_timing_stack', default=())
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def start_run(label):
+    """
+    Inicia a medição de uma execução da página e devolve a lista (vazia) de registros
+
+    Chamado no início do script de cada página, a cada rerun.
+    """
+    records = []
+    _run.set((label, records, time.perf_counter()))
+    _stack.set(())
+    return records
+
+
+def _dump_profile(profiler, label, stage):
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    name = f'{label or "processo"}-{stage}-{time.time_ns()}.prof'.replace('/', '_').replace(' ', '_')
+    profiler.dump_stats(os.path.join(config.PROFILE_DIR, name))
+
+
+def _emit(record):
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    logger.debug(line)
+    if config.PROFILE_DIR:
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(config.PROFILE_DIR, 'timings.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextmanager
+def timed(stage, **info):
+    """
+    Mede o bloco como a etapa `stage`
+
+    Input: nome da etapa e informações extras para o registro (ex.: rows=len(df1))
+    """
+    run = _run.get()
+    label, records, run_start = run if run is not None else (None, None, None)
+    stack = _stack.get()
+    token = _stack.set(stack + (stage,))
+
+    # o cProfile não aceita perfis aninhados: só as etapas de primeiro nível são perfiladas
+    profiler = cProfile.Profile() if config.PROFILE_DIR and not stack else None
+    if profiler is not None:
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _dump_profile(profiler, label, stage)
+        _stack.reset(token)
+
+        record = {'run': label, 'stage': stage, 'seconds': seconds, 'depth': len(stack),
+                  'parent': stack[-1] if stack else None,
+                  'offset': start - run_start if run_start is not None else None, **info}
+        if records is not None:
+            records.append(record)
+        _emit(record)
+
+
+def profiled(stage=None):
+    """
+    Decorator: mede cada chamada da função como uma etapa
+
+    O nome padrão da etapa é modulo.funcao (sem o prefixo utils.).
+    """
+    def decorator(func):
+        name = stage or f"{func.__module__.rpartition('.')[2]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timing_table(records):
+    """
+    Tabela dos registros de uma execução, na ordem em que as etapas começaram
+
+    Output: Dataframe com stage (um '· ' por nível de profundidade), ms e % do tempo total medido
+    """
+    if not records:
+        return pd.DataFrame(columns=['stage', 'ms', '%'])
+
+    # os registros são gravados no fim de cada etapa: reordena pelo início
+    df_aux = pd.DataFrame(records).sort_values(['offset', 'depth'], kind='stable')
+    total = df_aux.loc[df_aux['depth'] == 0, 'seconds'].sum()
+
+    df_aux = pd.DataFrame({
+        'stage': ['· ' * depth + stage for depth, stage in zip(df_aux['depth'], df_aux['stage'])],
+        'ms': (df_aux['seconds'] * 1000).round(1),
+        '%': (df_aux['seconds'] / total * 100).round(1) if total else 0.0,
+    })
+    return df_aux
+
+
+def timing_panel(records):
+    """
+    Painel opcional na barra lateral com o tempo de cada etapa do rerun atual
+
+    Só aparece se o usuário marcar a opção (desmarcada por padrão).
+    """
+    import streamlit as st
+
+    if not st.sidebar.checkbox('Mostrar tempos desta execução', value=False):
+        return
+
+    with st.sidebar.expander('Tempo por etapa', expanded=True):
+        df_aux = timing_table(records)
+        st.markdown(f"**Total medido:** {df_aux.loc[~df_aux['stage'].str.startswith('·'), 'ms'].sum():.1f} ms")
+        st.dataframe(df_aux, use_container_width=True)
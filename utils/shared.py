@@ -0,0 +1,175 @@
+"""
+Dataset limpo compartilhado por memória mapeada (Arrow IPC)
+
+O dataset limpo é publicado uma única vez como um arquivo Arrow IPC (formato
+Feather v2, sem compressão e em um único lote) ao lado do csv. Cada processo
+(o servidor do Streamlit, a API e os processos da agregação paralela) mapeia
+o arquivo em modo somente leitura: as colunas numéricas e de data sem nulos
+viram arrays do pandas que apontam direto para as páginas do arquivo, então
+as sessões e os processos dividem o mesmo cache de páginas do sistema em vez
+de cada um manter a sua cópia do dataset. Só as colunas com nulos e os
+códigos das categorias são copiados na conversão.
+
+Os arrays mapeados são somente leitura: alterar o dataframe in place gera
+erro (o que o loader já pede para nunca fazer).
+
+O arquivo é gerado a partir do snapshot Parquet (utils/snapshot.py) mais os
+lotes ingeridos no store (utils/ingest.py), já ordenado por Order_Date: é o
+mesmo dataset que o loader.load_data devolve. Os metadados guardam a versão
+do dataset (assinatura do csv + assinatura do store), então o arquivo só é
+refeito quando o csv muda ou um lote é ingerido. A troca é atômica
+(os.replace): processos que ainda mapeiam a versão antiga continuam lendo o
+arquivo antigo até recarregarem.
+
+Uso:
+    python -m utils.shared train.csv
+    python -m utils.shared train.csv --store orders_store
+"""
+import argparse
+import json
+import os
+import threading
+
+import pandas as pd
+
+from utils import ingest, snapshot
+from utils.cleaning import to_compact_dtypes
+from utils.profiling import profiled
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow o loader lê direto do csv
+    pa = None
+    ipc = None
+    pq = None
+
+
+# Sessões que carregam o dataset ao mesmo tempo esperam uma única publicação
+_publish_lock = threading.Lock()
+
+#---------------------------------
+# Funções
+#---------------------------------
+def shared_path(csv_path):
+    """ train.csv -> train.arrow (no mesmo diretório) """
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+def _read_table(arrow_path):
+    """ Abre o arquivo mapeado em memória (nenhum dado é lido até ser acessado) """
+    return ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+
+
+def _source_info(csv_path, store_dir):
+    """ Versão do dataset publicado: assinatura do csv + assinatura do store de lotes (None sem lotes) """
+    store = ingest.store_signature(store_dir) if store_dir else None
+    return {'csv': snapshot._source_info(csv_path), 'store': list(store) if store else None}
+
+
+def is_up_to_date(csv_path, arrow_path, store_dir=None):
+    """
+    Verifica se o arquivo compartilhado existe e foi gerado a partir da versão atual do csv e do store
+
+    Input: caminho do csv, do arquivo Arrow e do store de lotes (None = sem lotes)
+    Output: True se o arquivo pode ser usado, False se precisa ser refeito
+    """
+    if not os.path.exists(arrow_path):
+        return False
+
+    metadata = ipc.open_file(pa.memory_map(arrow_path, 'r')).schema.metadata or {}
+    if snapshot.METADATA_KEY not in metadata:
+        return False
+
+    return json.loads(metadata[snapshot.METADATA_KEY]) == _source_info(csv_path, store_dir)
+
+
+def _merged_table(parquet_path, store_dir):
+    """ Tabela do snapshot com os lotes do store, na mesma ordem de linhas do loader """
+    table = pq.read_table(parquet_path)
+    batches = ingest.read_batches(store_dir) if store_dir else []
+    if not batches:
+        return table
+
+    # histórico antes dos lotes e ordenação estável: as linhas do histórico mantêm a ordem relativa
+    df1 = to_compact_dtypes(pd.concat([table.to_pandas(), *batches], ignore_index=True))
+    df1 = df1.sort_values('Order_Date', kind='stable', ignore_index=True)
+    return pa.Table.from_pandas(df1, preserve_index=False)
+
+
+@profiled()
+def publish(csv_path, arrow_path=None, force=False, store_dir=None):
+    """
+    Publica o dataset limpo (histórico + lotes ingeridos) como arquivo Arrow IPC, apenas se o dataset mudou
+
+    1. Confere a versão (csv + store) gravada no arquivo existente
+    2. Se estiver desatualizada (ou force=True): atualiza o snapshot Parquet, lê a tabela dele
+       e junta os lotes do store, ordenando por Order_Date
+    3. Junta os pedaços de cada coluna em um único bloco contínuo (é o que permite
+       a conversão para o pandas sem cópia) e grava em um único lote, sem compressão
+
+    Input: caminho do csv, caminho do arquivo Arrow (opcional), force e diretório do store (None = sem lotes)
+    Output: caminho do arquivo Arrow
+    """
+    if not snapshot.has_pyarrow():
+        raise ImportError('pyarrow é necessário para publicar o dataset compartilhado')
+
+    arrow_path = arrow_path or shared_path(csv_path)
+    if not force and is_up_to_date(csv_path, arrow_path, store_dir):
+        return arrow_path
+
+    with _publish_lock:
+        # outra sessão pode ter publicado enquanto esta esperava o lock
+        if not force and is_up_to_date(csv_path, arrow_path, store_dir):
+            return arrow_path
+
+        source_info = _source_info(csv_path, store_dir)
+        table = _merged_table(snapshot.build_snapshot(csv_path), store_dir).combine_chunks()
+        metadata = dict(table.schema.metadata or {})
+        metadata[snapshot.METADATA_KEY] = json.dumps(source_info).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        def write(path):
+            with pa.OSFile(path, 'wb') as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table, max_chunksize=max(len(table), 1))
+
+        # arquivo temporário exclusivo trocado no final: nunca fica um arquivo pela metade
+        snapshot.write_atomic(arrow_path, write)
+
+    return arrow_path
+
+
+@profiled()
+def open_shared(arrow_path, columns=None):
+    """
+    Mapeia o arquivo compartilhado e devolve o dataframe apoiado nele
+
+    Input: caminho do arquivo Arrow e lista de colunas (None = todas)
+    Output: Dataframe limpo (somente leitura; colunas sem nulos apontam para o arquivo mapeado)
+    """
+    table = _read_table(arrow_path)
+    if columns is not None:
+        table = table.select(list(columns))
+    # split_blocks: uma coluna por bloco, sem consolidar (consolidar copiaria os arrays)
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == '__main__':
+    from utils.loader import default_store
+
+    parser = argparse.ArgumentParser(description='Publica o dataset limpo como arquivo Arrow mapeado em memória')
+    parser.add_argument('csv', nargs='?', default='train.csv', help='csv de origem (padrão: train.csv)')
+    parser.add_argument('--output', help='caminho do arquivo Arrow (padrão: mesmo nome do csv)')
+    parser.add_argument('--store', help='diretório do store de lotes (padrão: orders_store ao lado do csv)')
+    parser.add_argument('--force', action='store_true', help='refaz o arquivo mesmo se estiver atualizado')
+    args = parser.parse_args()
+
+    output = args.output or shared_path(args.csv)
+    store = args.store or default_store(args.csv)
+    if not args.force and is_up_to_date(args.csv, output, store):
+        print(f'{output} já está atualizado')
+    else:
+        publish(args.csv, output, force=True, store_dir=store)
+        print(f'{output} publicado a partir de {args.csv}')
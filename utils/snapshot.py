@@ -0,0 +1,157 @@
+"""
+Snapshot colunar (Parquet) do dataset já limpo
+
+O csv bruto é lido e limpo uma única vez e salvo em Parquet com os tipos
+finais (categorias e datas). Os metadados do arquivo guardam a assinatura do
+csv de origem, então o snapshot só é refeito quando o csv muda.
+
+Uso:
+    python -m utils.snapshot train.csv
+    python -m utils.snapshot train.csv --output dados/train.parquet --force
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from utils.cleaning import clean_code, read_orders
+from utils.profiling import profiled
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # o dashboard continua funcionando direto do csv
+    pa = None
+    pq = None
+
+
+# Muda sempre que o formato do dataset limpo mudar, forçando a recriação dos snapshots
+SNAPSHOT_VERSION = 5
+
+METADATA_KEY = b'curry_snapshot'
+
+# Sessões que carregam o dataset ao mesmo tempo esperam um único build
+_build_lock = threading.Lock()
+
+#---------------------------------
+# Funções
+#---------------------------------
+def has_pyarrow():
+    return pq is not None
+
+
+def snapshot_path(csv_path):
+    """ train.csv -> train.parquet (no mesmo diretório) """
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def _source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {'version': SNAPSHOT_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_atomic(path, write):
+    """
+    Grava um arquivo de uma vez: `write(tmp_path)` escreve em um arquivo temporário
+    exclusivo no mesmo diretório, que depois substitui `path` (os.replace)
+
+    Quem lê nunca vê um arquivo pela metade, e dois builds simultâneos não
+    escrevem no mesmo temporário.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        # o mkstemp cria o arquivo só com permissão para o dono
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def is_up_to_date(csv_path, parquet_path):
+    """
+    Verifica se o snapshot existe e foi gerado a partir da versão atual do csv
+    
+    Input: caminho do csv e do parquet
+    Output: True se o snapshot pode ser usado, False se precisa ser refeito
+    """
+    if not os.path.exists(parquet_path):
+        return False
+
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    if METADATA_KEY not in metadata:
+        return False
+
+    return json.loads(metadata[METADATA_KEY]) == _source_info(csv_path)
+
+
+@profiled()
+def build_snapshot(csv_path, parquet_path=None, force=False):
+    """
+    Gera o snapshot Parquet do dataset limpo, apenas se o csv mudou
+    
+    1. Confere a assinatura do csv gravada no snapshot existente
+    2. Se estiver desatualizado (ou force=True): lê, limpa e tipa o csv
+    3. Grava o Parquet com a assinatura do csv nos metadados
+
+    Um build por vez no processo: quem chega durante um build espera e usa o snapshot pronto.
+    
+    Input: caminho do csv, caminho do parquet (opcional) e force
+    Output: caminho do parquet
+    """
+    if not has_pyarrow():
+        raise ImportError('pyarrow é necessário para gerar o snapshot Parquet')
+
+    parquet_path = parquet_path or snapshot_path(csv_path)
+    if not force and is_up_to_date(csv_path, parquet_path):
+        return parquet_path
+
+    with _build_lock:
+        # outra sessão pode ter terminado o build enquanto esta esperava o lock
+        if not force and is_up_to_date(csv_path, parquet_path):
+            return parquet_path
+
+        source_info = _source_info(csv_path)
+        df1 = clean_code(read_orders(csv_path))
+
+        table = pa.Table.from_pandas(df1, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[METADATA_KEY] = json.dumps(source_info).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        write_atomic(parquet_path, lambda path: pq.write_table(table, path))
+
+    return parquet_path
+
+
+@profiled()
+def read_snapshot(parquet_path, columns=None):
+    """
+    Lê o snapshot, opcionalmente apenas com as colunas pedidas
+    
+    Input: caminho do parquet e lista de colunas (None = todas)
+    Output: Dataframe limpo
+    """
+    return pd.read_parquet(parquet_path, columns=list(columns) if columns is not None else None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera o snapshot Parquet do dataset limpo')
+    parser.add_argument('csv', nargs='?', default='train.csv', help='csv de origem (padrão: train.csv)')
+    parser.add_argument('--output', help='caminho do parquet (padrão: mesmo nome do csv)')
+    parser.add_argument('--force', action='store_true', help='refaz o snapshot mesmo se estiver atualizado')
+    args = parser.parse_args()
+
+    output = args.output or snapshot_path(args.csv)
+    if not args.force and is_up_to_date(args.csv, output):
+        print(f'{output} já está atualizado')
+    else:
+        build_snapshot(args.csv, output, force=True)
+        print(f'{output} gerado a partir de {args.csv}')
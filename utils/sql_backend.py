@@ -0,0 +1,206 @@
+"""
+Backend SQL embutido (SQLite) para as agregações das páginas
+
+O dataset limpo (com os lotes ingeridos) é gravado uma vez por versão em um
+arquivo SQLite ao lado do csv, em uma tabela `orders` com índices em
+Order_Date, Road_traffic_density, City e Delivery_person_ID. Com
+CURRY_BACKEND=sqlite (utils/config.py) os filtros da barra lateral viram um
+WHERE e os agrupamentos abaixo rodam dentro do SQLite; só o resultado
+agregado volta para o pandas:
+
+- agrupamentos do cubo (rollup): pedidos por dia, por tráfego e por
+  cidade/tráfego, avaliação por tráfego e por clima e tempo por cidade/tráfego
+- order_share_by_week: pedidos e entregadores distintos por semana
+- courier_ratings: avaliação média por entregador
+
+As funções de utils/metrics.py recebem um SqlSelection no lugar do cubo ou
+do df1 e devolvem os mesmos Dataframes do caminho em pandas. A contagem de
+entregadores distintos no SQL é sempre exata (COUNT DISTINCT), mesmo com
+CURRY_DISTINCT_MODE=hll.
+
+Uso:
+    python -m utils.sql_backend train.csv
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from functools import lru_cache
+
+import pandas as pd
+
+from utils import config
+from utils.cube import CUBE_KEYS, MEASURES, rollup
+from utils.loader import dataset_version, load_data
+from utils.profiling import profiled
+
+
+SQL_COLUMNS = list(dict.fromkeys(CUBE_KEYS + list(MEASURES.values()) + ['Week_of_year', 'Delivery_person_ID']))
+
+INDEXED_COLUMNS = ['Order_Date', 'Road_traffic_density', 'City', 'Delivery_person_ID']
+
+_build_lock = threading.Lock()
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def database_path(csv_path):
+    """ train.csv -> train.sqlite (no mesmo diretório) """
+    return os.path.splitext(csv_path)[0] + '.sqlite'
+
+
+def _quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _connect(db_path):
+    """ Conexão somente leitura (uma por consulta: as sessões do Streamlit rodam em threads diferentes) """
+    return closing(sqlite3.connect(f'file:{os.path.abspath(db_path)}?mode=ro', uri=True))
+
+
+def _stored_version(db_path):
+    if not os.path.exists(db_path):
+        return None
+    with _connect(db_path) as conn:
+        try:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        except (sqlite3.DatabaseError, TypeError):
+            return None
+
+
+@profiled()
+def build_database(csv_path, db_path=None, force=False):
+    """
+    Grava o dataset limpo no SQLite, apenas se o dataset mudou
+
+    1. Confere a versão do dataset (csv + lotes ingeridos) gravada no banco existente
+    2. Se estiver desatualizado (ou force=True): grava a tabela orders com as SQL_COLUMNS
+       (Order_Date em segundos desde 1970, para comparar e indexar como inteiro)
+    3. Cria os índices e grava a versão na tabela meta
+
+    Input: caminho do csv, caminho do banco (opcional) e force
+    Output: caminho do banco
+    """
+    db_path = db_path or database_path(csv_path)
+    version = json.dumps(dataset_version(csv_path))
+
+    with _build_lock:
+        if not force and _stored_version(db_path) == version:
+            return db_path
+
+        df_aux = load_data(csv_path, columns=SQL_COLUMNS).copy()
+        df_aux['Order_Date'] = df_aux['Order_Date'].to_numpy().astype('datetime64[s]').astype('int64')
+
+        # grava em um arquivo temporário e troca no final, para nunca deixar um banco pela metade
+        tmp_path = db_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with closing(sqlite3.connect(tmp_path)) as conn:
+            df_aux.to_sql('orders', conn, index=False, chunksize=100_000)
+            for col in INDEXED_COLUMNS:
+                conn.execute(f'CREATE INDEX "idx_orders_{col}" ON orders ({_quote(col)})')
+            conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+            conn.execute('ANALYZE')
+            conn.commit()
+        os.replace(tmp_path, db_path)
+
+    return db_path
+
+
+@lru_cache(maxsize=4)
+def _database(csv_path, version):
+    return build_database(csv_path)
+
+
+class SqlSelection:
+    """
+    Pedidos do banco SQLite que passam nos filtros da barra lateral
+
+    Não lê nenhuma linha: cada método monta uma consulta com o WHERE dos filtros
+    e devolve apenas o resultado agregado.
+
+    Input: caminho do banco, data limite e lista de condições de trânsito
+    """
+
+    def __init__(self, db_path, date_cutoff, traffic_options):
+        self.db_path = db_path
+        cutoff = int(pd.Timestamp(date_cutoff).to_datetime64().astype('datetime64[s]').astype('int64'))
+        traffic_options = list(traffic_options)
+        self.where = (f'WHERE "Order_Date" < ? AND "Road_traffic_density" IN ({", ".join("?" * len(traffic_options))})'
+                      if traffic_options else 'WHERE 0')
+        self.params = [cutoff, *traffic_options] if traffic_options else []
+
+    def query(self, select, group_by):
+        """ SELECT `select` dos pedidos filtrados agrupados (e ordenados) por `group_by` """
+        group = ', '.join(_quote(col) for col in group_by)
+        sql = f'SELECT {group}, {select} FROM orders {self.where} GROUP BY {group} ORDER BY {group}'
+        with _connect(self.db_path) as conn:
+            df_aux = pd.read_sql_query(sql, conn, params=self.params)
+        if 'Order_Date' in group_by:
+            df_aux['Order_Date'] = pd.to_datetime(df_aux['Order_Date'], unit='s')
+        return df_aux
+
+    def cube(self, by):
+        """ Cubo (mesmas colunas de utils/cube.build_cube) já agrupado pelas dimensões `by` """
+        select = ['COUNT(*) AS orders']
+        for name, col in MEASURES.items():
+            select += [f'COUNT({_quote(col)}) AS {name}_count', f'TOTAL({_quote(col)}) AS {name}_sum',
+                       f'TOTAL(1.0 * {_quote(col)} * {_quote(col)}) AS {name}_sumsq']
+        df_aux = self.query(', '.join(select), by)
+        # mesmos tipos do cubo (sem linhas, o read_sql devolve object e o rollup descartaria as somas)
+        for col in df_aux.columns.drop(by):
+            df_aux[col] = df_aux[col].astype('int64' if col == 'orders' or col.endswith('_count') else 'float64')
+        return df_aux
+
+    def rollup(self, by):
+        """ Mesmo resultado do utils/cube.rollup no cubo filtrado """
+        return rollup(self.cube(by), by)
+
+    def order_share_by_week(self):
+        """ Pedidos, entregadores distintos e pedidos por entregador por semana """
+        df_aux = self.query('COUNT(*) AS ID, COUNT(DISTINCT "Delivery_person_ID") AS Delivery_person_ID', ['Week_of_year'])
+        df_aux['Order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+        return df_aux
+
+    def courier_ratings(self):
+        """ Avaliação média por entregador """
+        return self.query('AVG("Delivery_person_Ratings") AS Delivery_person_Ratings', ['Delivery_person_ID'])
+
+
+def select_orders(path, date_cutoff, traffic_options):
+    """
+    Seleção dos filtros da barra lateral no banco SQLite (montado uma vez por versão do dataset)
+
+    Input: caminho do csv, data limite e lista de condições de trânsito
+    Output: SqlSelection
+    """
+    return SqlSelection(_database(path, dataset_version(path)), date_cutoff, traffic_options)
+
+
+def pushdown(path, date_cutoff, traffic_options):
+    """
+    Seleção para as agregações com pushdown, conforme CURRY_BACKEND
+
+    Output: SqlSelection com o backend sqlite; None com o backend pandas
+            (a página usa o cubo ou o df1 filtrado: `pushdown(...) or cube`)
+    """
+    if config.BACKEND == 'sqlite':
+        return select_orders(path, date_cutoff, traffic_options)
+    return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grava o dataset limpo no banco SQLite do backend sql')
+    parser.add_argument('csv', nargs='?', default='train.csv', help='csv de origem (padrão: train.csv)')
+    parser.add_argument('--output', help='caminho do banco (padrão: mesmo nome do csv)')
+    parser.add_argument('--force', action='store_true', help='refaz o banco mesmo se estiver atualizado')
+    args = parser.parse_args()
+
+    output = build_database(args.csv, args.output, force=args.force)
+    with _connect(output) as conn:
+        rows = conn.execute('SELECT COUNT(*) FROM orders').fetchone()[0]
+    print(f'{output}: {rows:,} pedidos')
@@ -0,0 +1,246 @@
+"""
+Processamento em blocos para arquivos de pedidos maiores que a memória
+
+O csv é lido em blocos de tamanho limitado; cada bloco passa pelas regras do
+clean_code, pelos filtros da barra lateral e é "dobrado" em um estado de
+agregados (StreamAggregates). O estado só guarda somas, contagens, mínimos,
+máximos e pares distintos, então o tamanho dele depende da quantidade de
+dias/entregadores/cidades, e não da quantidade de pedidos. Estados de partes
+diferentes do arquivo podem ser somados com merge().
+
+Uso:
+    python -m utils.streaming pedidos_grande.csv --chunksize 500000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from utils import config
+from utils.cleaning import clean_code, period_column, read_orders, sort_categories
+from utils.hll import estimate_by, registers_by
+from utils.cube import CUBE_KEYS, MEASURES, build_cube, merge_cubes, merge_sums, rollup
+
+
+CHUNKSIZE = 500_000
+
+
+def _merge_max(frames, keys):
+    frames = [frame for frame in frames if frame is not None]
+    df_aux = pd.concat(frames, ignore_index=True)
+    return sort_categories(df_aux.groupby(keys, observed=True, sort=False).max().reset_index(), keys)
+
+
+def _merge_distinct(frames, keys):
+    frames = [frame for frame in frames if frame is not None]
+    return pd.concat(frames, ignore_index=True).drop_duplicates(keys, ignore_index=True)
+
+
+def _empty(dtypes):
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+
+
+EXTREMES = ['age_min', 'age_max', 'vehicle_min', 'vehicle_max']
+
+
+class StreamAggregates:
+    """
+    Estado de agregados mesclável com tudo que as três páginas precisam
+    
+    - cube: cubo pré-agregado (pedidos, tempos, avaliações e distâncias por dia/tráfego/cidade/...)
+    - week_couriers: pares distintos (Week_of_year, Delivery_person_ID), ou, com
+      CURRY_DISTINCT_MODE=hll, week_registers: registradores HyperLogLog por semana
+      (tamanho fixo por semana, independente do número de entregadores)
+    - week_orders: pedidos por semana
+    - couriers: pedidos e somas de avaliação por entregador
+    - courier_max_time: maior tempo por (City, Delivery_person_ID)
+    - locations: somas das coordenadas de entrega por (City, Road_traffic_density)
+    - extremes: mínimo/máximo de idade e de condição do veículo
+    """
+
+    def __init__(self):
+        # estado vazio (nenhum bloco, ou filtros sem pedidos): tabelas sem linhas, então as
+        # métricas devolvem resultados vazios e os extremos ficam vazios (NaN), como no pandas
+        self.rows = 0
+        self.cube = _empty({**dict.fromkeys(CUBE_KEYS, 'object'), 'Order_Date': 'datetime64[ns]', 'orders': 'int64',
+                            **{f'{name}_{stat}': 'int64' if stat == 'count' else 'float64'
+                               for name in MEASURES for stat in ['count', 'sum', 'sumsq']}})
+        self.week_couriers = _empty({'Week_of_year': 'int8', 'Delivery_person_ID': 'object'})
+        self.week_registers = None
+        self.week_orders = _empty({'Week_of_year': 'int64', 'orders': 'int64'})
+        self.couriers = _empty({'Delivery_person_ID': 'object', 'orders': 'int64', 'rating_sum': 'float64',
+                                'rating_count': 'int64', 'time_sum': 'float64'})
+        self.courier_max_time = _empty({'City': 'object', 'Delivery_person_ID': 'object', 'Time_taken(min)': 'int16'})
+        self.locations = _empty({'City': 'object', 'Road_traffic_density': 'object', 'orders': 'int64',
+                                 'lat_sum': 'float64', 'lon_sum': 'float64'})
+        self.extremes = pd.DataFrame({name: [np.nan] for name in EXTREMES})
+
+    @classmethod
+    def from_frame(cls, df1):
+        """ Estado de um pedaço do dataset já limpo (e filtrado) """
+        state = cls()
+        state.update(df1)
+        return state
+
+    def update(self, df1):
+        """ Dobra um bloco limpo no estado """
+        if len(df1) == 0:
+            return self
+        return self.merge(self._partial(df1))
+
+    @classmethod
+    def _partial(cls, df1):
+        state = cls()
+        state.rows = len(df1)
+        state.cube = build_cube(df1)
+
+        week = period_column(df1, 'Week_of_year')
+        ratings = df1['Delivery_person_Ratings'].astype('float64')
+        df_aux = pd.DataFrame({
+            'Week_of_year': week,
+            'Delivery_person_ID': df1['Delivery_person_ID'],
+            'City': df1['City'],
+            'Road_traffic_density': df1['Road_traffic_density'],
+            'orders': 1,
+            'rating_sum': ratings,
+            'rating_count': ratings.notna().astype('int64'),
+            'time_sum': df1['Time_taken(min)'].astype('float64'),
+            'Time_taken(min)': df1['Time_taken(min)'],
+            'lat_sum': df1['Delivery_location_latitude'].astype('float64'),
+            'lon_sum': df1['Delivery_location_longitude'].astype('float64'),
+        })
+
+        if config.DISTINCT_MODE == 'hll':
+            state.week_couriers = None
+            state.week_registers = registers_by(week, df1['Delivery_person_ID'], config.HLL_PRECISION)
+        else:
+            state.week_couriers = df_aux.loc[:, ['Week_of_year', 'Delivery_person_ID']].drop_duplicates(ignore_index=True)
+        state.week_orders = df_aux.groupby('Week_of_year')[['orders']].sum().reset_index()
+        state.couriers = (df_aux.groupby('Delivery_person_ID', observed=True)[['orders', 'rating_sum', 'rating_count', 'time_sum']]
+                                .sum().reset_index())
+        state.courier_max_time = (df_aux.groupby(['City', 'Delivery_person_ID'], observed=True)[['Time_taken(min)']]
+                                        .max().reset_index())
+        state.locations = (df_aux.groupby(['City', 'Road_traffic_density'], observed=True)[['orders', 'lat_sum', 'lon_sum']]
+                                 .sum().reset_index())
+        state.extremes = pd.DataFrame({
+            'age_min': [df1['Delivery_person_Age'].min()], 'age_max': [df1['Delivery_person_Age'].max()],
+            'vehicle_min': [df1['Vehicle_condition'].min()], 'vehicle_max': [df1['Vehicle_condition'].max()],
+        })
+        return state
+
+    def merge(self, other):
+        """ Soma outro estado a este (em place) e devolve este estado """
+        if other.rows == 0:
+            return self
+        if self.rows == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        self.rows += other.rows
+        self.cube = merge_cubes(self.cube, other.cube)
+        if self.week_registers is not None:
+            self.week_registers = _merge_max([self.week_registers, other.week_registers], ['key', 'idx'])
+        else:
+            self.week_couriers = _merge_distinct([self.week_couriers, other.week_couriers], ['Week_of_year', 'Delivery_person_ID'])
+        self.week_orders = merge_sums([self.week_orders, other.week_orders], ['Week_of_year'])
+        self.couriers = merge_sums([self.couriers, other.couriers], ['Delivery_person_ID'])
+        self.courier_max_time = _merge_max([self.courier_max_time, other.courier_max_time], ['City', 'Delivery_person_ID'])
+        self.locations = merge_sums([self.locations, other.locations], ['City', 'Road_traffic_density'])
+
+        extremes = pd.concat([self.extremes, other.extremes])
+        self.extremes = pd.DataFrame({name: [extremes[name].min() if name.endswith('_min') else extremes[name].max()]
+                                      for name in EXTREMES})
+        return self
+
+    #---------------------------------
+    # Métricas das páginas
+    #---------------------------------
+    def order_share_by_week(self):
+        """ Pedidos, entregadores distintos e pedidos por entregador por semana """
+        if self.week_registers is not None:
+            counts = estimate_by(self.week_registers, config.HLL_PRECISION).rename_axis('Week_of_year')
+        else:
+            counts = self.week_couriers.groupby('Week_of_year').size()
+        df_aux = counts.rename('Delivery_person_ID').reset_index()
+        df_aux = pd.merge(self.week_orders.rename(columns={'orders': 'ID'}), df_aux, how='inner')
+        # o merge de tabelas vazias muda a ordem das colunas
+        df_aux = df_aux.loc[:, ['Week_of_year', 'ID', 'Delivery_person_ID']]
+        df_aux['Order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+        return df_aux.sort_values('Week_of_year', ignore_index=True)
+
+    def delivery_unique(self):
+        return len(self.couriers)
+
+    def courier_ratings(self):
+        """ Avaliação média por entregador """
+        df_aux = self.couriers.loc[:, ['Delivery_person_ID']].copy()
+        df_aux['Delivery_person_Ratings'] = self.couriers['rating_sum'] / self.couriers['rating_count']
+        return df_aux.sort_values('Delivery_person_ID', ignore_index=True)
+
+    def city_centers(self):
+        """
+        Localização central de cada cidade por tipo de tráfego
+        
+        Mediana não é mesclável entre blocos, então aqui o centro é a média das coordenadas.
+        """
+        df_aux = self.locations.loc[:, ['City', 'Road_traffic_density']].copy()
+        df_aux['Delivery_location_latitude'] = self.locations['lat_sum'] / self.locations['orders']
+        df_aux['Delivery_location_longitude'] = self.locations['lon_sum'] / self.locations['orders']
+        return df_aux.sort_values(['City', 'Road_traffic_density'], ignore_index=True)
+
+    def extreme(self, name):
+        """ age_min, age_max, vehicle_min ou vehicle_max (NaN no estado vazio) """
+        return self.extremes[name].iloc[0]
+
+    def rollup(self, by):
+        """ Métricas do cubo agrupadas por `by` (ver utils/cube.rollup) """
+        return rollup(self.cube, by)
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def iter_clean_chunks(path, chunksize=CHUNKSIZE):
+    """
+    Lê o csv em blocos de `chunksize` linhas e devolve cada bloco já limpo pelo clean_code
+    """
+    for chunk in read_orders(path, chunksize=chunksize):
+        yield clean_code(chunk)
+
+
+def stream_aggregates(path, date_cutoff=None, traffic_options=None, chunksize=CHUNKSIZE):
+    """
+    Calcula o StreamAggregates de um csv com memória limitada
+    
+    1. Lê e limpa o arquivo em blocos
+    2. Aplica os filtros de data e tráfego em cada bloco (None = sem filtro)
+    3. Dobra cada bloco no estado; o bloco é descartado em seguida
+    
+    Input: caminho do csv, data limite, lista de tráfegos e tamanho do bloco
+    Output: StreamAggregates
+    """
+    state = StreamAggregates()
+    for df1 in iter_clean_chunks(path, chunksize):
+        if date_cutoff is not None:
+            df1 = df1.loc[df1['Order_Date'] < date_cutoff, :]
+        if traffic_options is not None:
+            df1 = df1.loc[df1['Road_traffic_density'].isin(traffic_options), :]
+        state.update(df1)
+    return state
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Calcula as métricas do dashboard lendo o csv em blocos')
+    parser.add_argument('csv', nargs='?', default='train.csv')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--until', help='data limite (exclusiva), ex.: 2022-04-06')
+    parser.add_argument('--traffic', nargs='*', help='condições de trânsito, ex.: Low Jam')
+    args = parser.parse_args()
+
+    state = stream_aggregates(args.csv, pd.Timestamp(args.until) if args.until else None, args.traffic, args.chunksize)
+
+    print(f'{state.rows:,} pedidos | {state.delivery_unique():,} entregadores únicos')
+    print(f"idade: {state.extreme('age_min')} - {state.extreme('age_max')} | "
+          f"condição do veículo: {state.extreme('vehicle_min')} - {state.extreme('vehicle_max')}")
+    print(state.rollup(['City']).round(2).to_string(index=False))
+    print(state.order_share_by_week().round(2).to_string(index=False))
@@ -0,0 +1,26 @@
+"""
+Abas "preguiçosas" para as páginas
+
+O st.tabs executa o corpo de todas as abas a cada rerun (só a exibição é
+escondida no navegador). Com lazy_tabs a página recebe apenas o nome da aba
+ativa e executa só o bloco dela: as métricas e figuras das outras abas não
+são calculadas. Ao voltar para uma aba já vista com os mesmos filtros, as
+figuras saem do cache (utils/figure_cache.py).
+"""
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def lazy_tabs(labels, key):
+    """
+    Seletor de abas (botões horizontais) que devolve a aba ativa
+
+    A seleção é guardada no session_state pela `key`, então continua a mesma entre reruns.
+
+    Input: nomes das abas e chave única do seletor na página
+    Output: nome da aba ativa
+    """
+    import streamlit as st
+
+    return st.radio('Aba', labels, horizontal=True, key=key, label_visibility='collapsed')
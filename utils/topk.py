@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+
+#---------------------------------
+# Funções
+#---------------------------------
+def top_k_per_group(df, group, value, k, ascending=True):
+    """
+    Seleciona as k linhas com os menores (ascending=True) ou maiores valores de `value` em cada grupo
+    
+    Usa seleção parcial (np.argpartition) dentro de cada grupo, então o custo é
+    linear no tamanho do grupo; só os k escolhidos são ordenados. Funciona para
+    qualquer conjunto de grupos (nenhuma lista fixa de cidades).
+    
+    Input: Dataframe, coluna do grupo, coluna do valor, k e ascending
+    Output: Dataframe com até k linhas por grupo, grupos em ordem e valores ordenados dentro do grupo
+    """
+    # em float64 o valor pode ser negado sem estourar tipos inteiros pequenos (int8/int16)
+    values = df[value].to_numpy(dtype='float64')
+    if not ascending:
+        values = -values
+
+    # agrupa pelos códigos inteiros do grupo (no menor tipo inteiro possível:
+    # o argsort estável do NumPy vira radix sort para inteiros de 8/16 bits)
+    col = df[group]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes, groups = col.cat.codes.to_numpy(), col.cat.categories
+    else:
+        codes, groups = pd.factorize(col, sort=True)
+    codes = codes.astype(np.result_type(np.min_scalar_type(-1), np.min_scalar_type(len(groups))))
+
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+
+    parts = []
+    for i in range(len(groups)):
+        positions = order[bounds[i]:bounds[i + 1]]
+        if len(positions) > k:
+            positions = positions[np.argpartition(values[positions], k - 1)[:k]]
+        parts.append(positions[np.argsort(values[positions], kind='stable')])
+
+    if not parts:
+        return df.iloc[:0]
+    return df.take(np.concatenate(parts))